@@ -0,0 +1,34 @@
+"""add partial indexes for open and completed tasks
+
+Revision ID: 2f7c5d1b9e48
+Revises: 9a4e6b2d8c13
+Create Date: 2026-10-18 15:24:41.370815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '2f7c5d1b9e48'
+down_revision: Union[str, Sequence[str], None] = '9a4e6b2d8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    # SLA breaches / overdue counts: status <> 'completed' AND due_date < now
+    'ix_tasks_open_due_date': "tasks (due_date) WHERE status <> 'completed'",
+    # Monthly completions: status = 'completed' AND updated_at in a window
+    'ix_tasks_completed_updated_at': "tasks (updated_at) WHERE status = 'completed'",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
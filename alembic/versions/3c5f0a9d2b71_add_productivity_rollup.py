@@ -0,0 +1,37 @@
+"""add productivity rollup watermark and index
+
+Revision ID: 3c5f0a9d2b71
+Revises: 8e1797e0de7f
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '3c5f0a9d2b71'
+down_revision: Union[str, Sequence[str], None] = '8e1797e0de7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pipeline_watermarks',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # One rollup row per user per period; also serves the per-user SUM reads
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_productivity_scores_user_period "
+        "ON productivity_scores (user_id, period_start)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_productivity_scores_user_period")
+    op.drop_table('pipeline_watermarks')
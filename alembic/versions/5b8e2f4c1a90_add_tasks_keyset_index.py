@@ -0,0 +1,28 @@
+"""add tasks (created_at, id) index for keyset pagination
+
+Revision ID: 5b8e2f4c1a90
+Revises: 3c5f0a9d2b71
+Create Date: 2026-10-18 11:02:17.554310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '5b8e2f4c1a90'
+down_revision: Union[str, Sequence[str], None] = '3c5f0a9d2b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backward scans serve ORDER BY created_at DESC, id DESC and the
+    # (created_at, id) < (:c, :i) cursor predicate
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_created_at_id "
+        "ON tasks (created_at, id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_created_at_id")
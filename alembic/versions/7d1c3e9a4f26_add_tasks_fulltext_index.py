@@ -0,0 +1,32 @@
+"""add GIN full-text index on tasks title/description
+
+Revision ID: 7d1c3e9a4f26
+Revises: 5b8e2f4c1a90
+Create Date: 2026-10-18 13:40:52.208117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '7d1c3e9a4f26'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f4c1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expression index rather than a stored column: nothing to keep in sync
+    # on writes, and tables created by create_all() search correctly (just
+    # unindexed) before this runs. Must match SEARCH_DOCUMENT_SQL in
+    # app/services/task_search.py.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin (("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        "))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_search")
@@ -0,0 +1,37 @@
+"""add composite indexes for analytics predicates on tasks
+
+Revision ID: 9a4e6b2d8c13
+Revises: 7d1c3e9a4f26
+Create Date: 2026-10-18 15:21:06.930442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '9a4e6b2d8c13'
+down_revision: Union[str, Sequence[str], None] = '7d1c3e9a4f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    # Per-assignee counters: WHERE assigned_to IN (...) GROUP BY assigned_to
+    # with FILTER (WHERE status = ...)
+    'ix_tasks_assigned_to_status': 'tasks (assigned_to, status)',
+    # Rollup watermark scans: updated_at > :since
+    'ix_tasks_updated_at': 'tasks (updated_at)',
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps tasks writable while the indexes build; it cannot
+    # run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
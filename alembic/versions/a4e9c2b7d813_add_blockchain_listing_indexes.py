@@ -0,0 +1,39 @@
+"""add blockchain listing indexes
+
+Revision ID: a4e9c2b7d813
+Revises: f1c7a3d9b285
+Create Date: 2026-10-18 20:31:17.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'a4e9c2b7d813'
+down_revision: Union[str, Sequence[str], None] = 'f1c7a3d9b285'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blockchain_audit_entity_timestamp "
+        "ON blockchain_audit (entity_type, entity_id, timestamp, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blockchain_audit_user_timestamp "
+        "ON blockchain_audit (user_id, timestamp, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blockchain_audit_timestamp "
+        "ON blockchain_audit (timestamp, id)"
+    )
+    # Covered by the (user_id, timestamp, id) prefix; one less index per append
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_audit_user_id")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_blockchain_audit_user_id ON blockchain_audit (user_id)")
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_audit_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_audit_user_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_audit_entity_timestamp")
@@ -0,0 +1,25 @@
+"""add blockchain pow difficulty
+
+Revision ID: a4e9c2d7b816
+Revises: b2d6f8a4c319
+Create Date: 2026-10-18 21:02:41.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'a4e9c2d7b816'
+down_revision: Union[str, Sequence[str], None] = 'b2d6f8a4c319'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL for existing rows: they are verified against BLOCKCHAIN_LEGACY_POW_DIFFICULTY
+    op.add_column('blockchain_audit', sa.Column('pow_difficulty', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('blockchain_audit', 'pow_difficulty')
@@ -0,0 +1,48 @@
+"""add fraud alerts
+
+Revision ID: b2d6f8a4c319
+Revises: d5b8e3f1a627
+Create Date: 2026-10-18 23:12:40.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'b2d6f8a4c319'
+down_revision: Union[str, Sequence[str], None] = 'd5b8e3f1a627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fraud_alerts',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('audit_log_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=50), nullable=True),
+        sa.Column('resource_type', sa.String(length=50), nullable=True),
+        sa.Column('resource_id', sa.String(length=100), nullable=True),
+        sa.Column('ip_address', sa.String(length=50), nullable=True),
+        sa.Column('anomaly_score', sa.Float(), nullable=False),
+        sa.Column('model_version', sa.String(length=50), nullable=True),
+        sa.Column('detected_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_fraud_alerts_audit_log "
+        "ON fraud_alerts (audit_log_id, \"timestamp\")"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fraud_alerts_timestamp ON fraud_alerts (\"timestamp\", id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fraud_alerts_user_timestamp ON fraud_alerts (user_id, \"timestamp\")")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_fraud_alerts_user_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_fraud_alerts_timestamp")
+    op.execute("DROP INDEX IF EXISTS ux_fraud_alerts_audit_log")
+    op.drop_table('fraud_alerts')
@@ -0,0 +1,57 @@
+"""add background jobs table
+
+Revision ID: b6d2e8f41c57
+Revises: 2f7c5d1b9e48
+Create Date: 2026-10-18 17:02:15.640912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'b6d2e8f41c57'
+down_revision: Union[str, Sequence[str], None] = '2f7c5d1b9e48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('artifact_path', sa.String(length=500), nullable=True),
+        sa.Column('artifact_name', sa.String(length=255), nullable=True),
+        sa.Column('artifact_media_type', sa.String(length=100), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('run_after', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Dequeue scan only ever looks at queued rows; keeps the index tiny
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_queued_run_after "
+        "ON jobs (run_after) WHERE status = 'queued'"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_created_by ON jobs (created_by)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_jobs_created_by")
+    op.execute("DROP INDEX IF EXISTS ix_jobs_queued_run_after")
+    op.drop_table('jobs')
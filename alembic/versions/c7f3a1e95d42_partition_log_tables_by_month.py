@@ -0,0 +1,166 @@
+"""partition audit_logs and api_access_logs by month
+
+Revision ID: c7f3a1e95d42
+Revises: a4e9c2b7d813
+Create Date: 2026-10-18 21:02:44.518730
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+revision: str = 'c7f3a1e95d42'
+down_revision: Union[str, Sequence[str], None] = 'a4e9c2b7d813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created ahead of today (scripts/maintain_partitions.py keeps this up)
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    'audit_logs': {
+        'columns': """
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id integer REFERENCES users (id),
+            action varchar(50),
+            resource_type varchar(50),
+            resource_id varchar(100),
+            details jsonb,
+            ip_address varchar(50),
+            "timestamp" timestamp without time zone NOT NULL,
+            PRIMARY KEY (id, "timestamp")
+        """,
+        'plain_columns': """
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            user_id integer REFERENCES users (id),
+            action varchar(50),
+            resource_type varchar(50),
+            resource_id varchar(100),
+            details jsonb,
+            ip_address varchar(50),
+            "timestamp" timestamp without time zone
+        """,
+        'copy': 'id, user_id, action, resource_type, resource_id, details, ip_address',
+        'now': "now() AT TIME ZONE 'utc'",
+        'id_type': 'integer',
+        'old_indexes': [],
+        'plain_indexes': [],
+        'indexes': [
+            'CREATE INDEX ix_audit_logs_timestamp ON audit_logs ("timestamp")',
+            'CREATE INDEX ix_audit_logs_user_timestamp ON audit_logs (user_id, "timestamp")',
+            'CREATE INDEX ix_audit_logs_resource_timestamp ON audit_logs (resource_type, resource_id, "timestamp")',
+        ],
+    },
+    'api_access_logs': {
+        'columns': """
+            id bigint NOT NULL DEFAULT nextval('api_access_logs_id_seq'),
+            user_role varchar,
+            path varchar,
+            method varchar,
+            "timestamp" timestamp with time zone NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, "timestamp")
+        """,
+        'plain_columns': """
+            id integer NOT NULL DEFAULT nextval('api_access_logs_id_seq') PRIMARY KEY,
+            user_role varchar,
+            path varchar,
+            method varchar,
+            "timestamp" timestamp with time zone DEFAULT now()
+        """,
+        'copy': 'id, user_role, path, method',
+        'now': 'now()',
+        'id_type': 'bigint',
+        'old_indexes': ['ix_api_access_logs_id', 'ix_api_access_logs_user_role', 'ix_api_access_logs_path'],
+        'plain_indexes': [
+            'CREATE INDEX ix_api_access_logs_id ON api_access_logs (id)',
+            'CREATE INDEX ix_api_access_logs_user_role ON api_access_logs (user_role)',
+            'CREATE INDEX ix_api_access_logs_path ON api_access_logs (path)',
+        ],
+        'indexes': [
+            'CREATE INDEX ix_api_access_logs_timestamp ON api_access_logs ("timestamp")',
+            'CREATE INDEX ix_api_access_logs_role_timestamp ON api_access_logs (user_role, "timestamp")',
+        ],
+    },
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _relkind(table: str):
+    return op.get_bind().execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {'table': table}
+    ).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, spec in TABLES.items():
+        kind = _relkind(table)
+        if kind == 'p':
+            continue
+        old = f'{table}_unpartitioned'
+        if kind is not None:
+            op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+            op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+            for index in spec['old_indexes']:
+                op.execute(f'DROP INDEX IF EXISTS {index}')
+
+        op.execute(f"CREATE SEQUENCE IF NOT EXISTS {table}_id_seq AS {spec['id_type']}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq AS {spec['id_type']}")
+        op.execute(f"CREATE TABLE {table} ({spec['columns']}) PARTITION BY RANGE (\"timestamp\")")
+        # Keeps the sequence (and its position) when the old table is dropped
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+        first = date.today().replace(day=1)
+        if kind is not None:
+            oldest = bind.execute(text(f'SELECT min("timestamp") FROM {old}')).scalar()
+            if oldest is not None:
+                first = min(first, oldest.date().replace(day=1))
+        month = first
+        last = _add_months(date.today().replace(day=1), PREMAKE_MONTHS)
+        while month <= last:
+            end = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{end} 00:00:00+00')"
+            )
+            month = end
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        for statement in spec['indexes']:
+            op.execute(statement)
+
+        if kind is not None:
+            op.execute(
+                f"INSERT INTO {table} ({spec['copy']}, \"timestamp\") "
+                f"SELECT {spec['copy']}, COALESCE(\"timestamp\", {spec['now']}) FROM {old}"
+            )
+            op.execute(f'DROP TABLE {old}')
+
+
+def downgrade() -> None:
+    for table, spec in TABLES.items():
+        if _relkind(table) != 'p':
+            continue
+        partitioned = f'{table}_partitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey')
+        for statement in spec['indexes']:
+            op.execute(f'DROP INDEX IF EXISTS {statement.split()[2]}')
+
+        op.execute(f"CREATE TABLE {table} ({spec['plain_columns']})")
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f"ALTER SEQUENCE {table}_id_seq AS integer")
+        for statement in spec['plain_indexes']:
+            op.execute(statement)
+        op.execute(
+            f"INSERT INTO {table} ({spec['copy']}, \"timestamp\") "
+            f"SELECT {spec['copy']}, \"timestamp\" FROM {partitioned}"
+        )
+        # Drops every partition with it
+        op.execute(f'DROP TABLE {partitioned}')
@@ -0,0 +1,33 @@
+"""add blockchain verification checkpoints
+
+Revision ID: d3a9c5e71f20
+Revises: b6d2e8f41c57
+Create Date: 2026-10-18 18:10:37.205118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd3a9c5e71f20'
+down_revision: Union[str, Sequence[str], None] = 'b6d2e8f41c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blockchain_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_block_id', sa.Integer(), nullable=False),
+        sa.Column('last_block_hash', sa.String(length=64), nullable=False),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('block_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('blockchain_checkpoints')
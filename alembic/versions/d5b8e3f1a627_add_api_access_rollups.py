@@ -0,0 +1,47 @@
+"""add api access rollups and status code
+
+Revision ID: d5b8e3f1a627
+Revises: c7f3a1e95d42
+Create Date: 2026-10-18 21:47:05.226914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd5b8e3f1a627'
+down_revision: Union[str, Sequence[str], None] = 'c7f3a1e95d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'api_access_rollups',
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_role', sa.String(length=50), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('method', sa.String(length=10), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'user_role', 'path', 'method', 'status_code')
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_api_access_rollups_bucket ON api_access_rollups (bucket)")
+
+    # Backfill from the raw log (status was never recorded: 0)
+    op.execute(
+        "INSERT INTO api_access_rollups (bucket, user_role, path, method, status_code, count) "
+        "SELECT date_trunc('minute', \"timestamp\"), left(coalesce(user_role, 'anonymous'), 50), "
+        "left(coalesce(path, ''), 255), left(coalesce(method, ''), 10), 0, count(*) "
+        "FROM api_access_logs GROUP BY 1, 2, 3, 4"
+    )
+
+    # Added to the partitioned parent, so every partition gets it
+    op.add_column('api_access_logs', sa.Column('status_code', sa.SmallInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('api_access_logs', 'status_code')
+    op.execute("DROP INDEX IF EXISTS ix_api_access_rollups_bucket")
+    op.drop_table('api_access_rollups')
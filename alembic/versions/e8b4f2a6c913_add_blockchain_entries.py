@@ -0,0 +1,53 @@
+"""add merkle-batched blockchain entries
+
+Revision ID: e8b4f2a6c913
+Revises: d3a9c5e71f20
+Create Date: 2026-10-18 19:03:52.771406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'e8b4f2a6c913'
+down_revision: Union[str, Sequence[str], None] = 'd3a9c5e71f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blockchain_audit', sa.Column('merkle_root', sa.String(length=64), nullable=True))
+
+    op.create_table(
+        'blockchain_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('block_id', sa.Integer(), nullable=True),
+        sa.Column('leaf_index', sa.Integer(), nullable=True),
+        sa.Column('leaf_hash', sa.String(length=64), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('details', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['block_id'], ['blockchain_audit.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blockchain_entries_pending "
+        "ON blockchain_entries (id) WHERE block_id IS NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_blockchain_entries_block_leaf "
+        "ON blockchain_entries (block_id, leaf_index)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_entries_block_leaf")
+    op.execute("DROP INDEX IF EXISTS ix_blockchain_entries_pending")
+    op.drop_table('blockchain_entries')
+    op.drop_column('blockchain_audit', 'merkle_root')
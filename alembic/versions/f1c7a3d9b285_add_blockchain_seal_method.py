@@ -0,0 +1,25 @@
+"""add blockchain seal method
+
+Revision ID: f1c7a3d9b285
+Revises: e8b4f2a6c913
+Create Date: 2026-10-18 19:48:09.331574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'f1c7a3d9b285'
+down_revision: Union[str, Sequence[str], None] = 'e8b4f2a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL for existing rows: they were all sealed with proof-of-work
+    op.add_column('blockchain_audit', sa.Column('seal_method', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('blockchain_audit', 'seal_method')
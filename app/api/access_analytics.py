@@ -1,15 +1,30 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app.core.config import settings
+from app.core.security import get_current_user
 from app.db.session import get_db
 from app.db.models.access_log import APIAccessLog
-from typing import List
+from app.db.models.access_rollup import APIAccessRollup
+from app.services.traffic_analyzer import traffic_analyzer
+from app.utils.pagination import paginate_keyset
+from typing import List, Optional
 from pydantic import BaseModel
 
 
 router = APIRouter(prefix="/api/analytics", tags=["Access Analytics"])
 
 
+def _in_window(query, since: Optional[datetime], until: Optional[datetime]):
+    """Time bounds; api_access_logs is partitioned by month, so these prune partitions"""
+    if since:
+        query = query.filter(APIAccessLog.timestamp >= since)
+    if until:
+        query = query.filter(APIAccessLog.timestamp < until)
+    return query
+
+
 class AccessUsageResponse(BaseModel):
     role: str
     path: str
@@ -17,17 +32,28 @@ class AccessUsageResponse(BaseModel):
 
 
 @router.get("/access-usage", response_model=List[AccessUsageResponse])
-def access_usage(db: Session = Depends(get_db)):
-    """Get API access statistics grouped by role and path"""
-    results = (
-        db.query(
-            APIAccessLog.user_role,
-            APIAccessLog.path,
-            func.count(APIAccessLog.id).label("count")
-        )
-        .group_by(APIAccessLog.user_role, APIAccessLog.path)
-        .all()
+def access_usage(
+    since: Optional[datetime] = Query(None, description="Only requests at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only requests before this time"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get API access statistics grouped by role and path
+
+    Reads the per-minute api_access_rollups (paths are route templates),
+    so the cost depends on the window, not on raw request volume. Counts
+    lag by up to ACCESS_LOG_FLUSH_SECONDS.
+    """
+    query = db.query(
+        APIAccessRollup.user_role,
+        APIAccessRollup.path,
+        func.sum(APIAccessRollup.count).label("count")
     )
+    if since:
+        query = query.filter(APIAccessRollup.bucket >= since)
+    if until:
+        query = query.filter(APIAccessRollup.bucket < until)
+    results = query.group_by(APIAccessRollup.user_role, APIAccessRollup.path).all()
     
     return [
         {"role": r.user_role, "path": r.path, "count": r.count}
@@ -36,7 +62,49 @@ def access_usage(db: Session = Depends(get_db)):
 
 
 @router.get("/access-by-role/{role}")
-def access_by_role(role: str, db: Session = Depends(get_db)):
-    """Get all access logs for a specific role"""
-    logs = db.query(APIAccessLog).filter(APIAccessLog.user_role == role).all()
-    return {"role": role, "total_requests": len(logs), "logs": logs}
+def access_by_role(
+    role: str,
+    since: Optional[datetime] = Query(None, description="Only requests at or after this time (default: LOG_QUERY_DEFAULT_HOURS before `until`)"),
+    until: Optional[datetime] = Query(None, description="Only requests before this time"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Access logs for a specific role, newest first
+
+    Without `since` only the last LOG_QUERY_DEFAULT_HOURS are read, and
+    results come in keyset pages of `limit`; pass `cursor` (next_cursor)
+    for the next page. `total_requests` counts the rows on this page.
+    """
+    if since is None:
+        since = (until or datetime.now(timezone.utc)) - timedelta(hours=settings.LOG_QUERY_DEFAULT_HOURS)
+    query = _in_window(db.query(APIAccessLog), since, until).filter(APIAccessLog.user_role == role)
+    try:
+        logs, next_cursor = paginate_keyset(query, APIAccessLog.timestamp, APIAccessLog.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "role": role,
+        "total_requests": len(logs),
+        "logs": logs,
+        "since": since.isoformat(),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/traffic-anomalies")
+def traffic_anomalies(
+    top: int = Query(10, ge=1, le=100, description="Heavy hitters to list per dimension"),
+    current_user=Depends(get_current_user)
+):
+    """
+    Request bursts per user and per client IP, detected as traffic arrives (admin only)
+
+    Served from the in-memory sketches of app/services/traffic_analyzer.py,
+    without a database query. State is per worker process, so each answers
+    for the share of traffic it has seen (thresholds are scaled to match).
+    """
+    if current_user.role.value != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return traffic_analyzer.snapshot(top)
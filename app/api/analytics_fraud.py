@@ -1,50 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.ml.anomaly_detector import AnomalyDetector
-import numpy as np
-from app.db.models.audit_log import AuditLog
+from app.db.models.fraud_alert import FraudAlert
+from app.db.models.watermark import Watermark
+from app.services.fraud_scoring import WATERMARK_NAME
+from app.utils.pagination import paginate_keyset
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
-# Instantiate detector (train on startup or in background in production)
-detector = AnomalyDetector()
-
-# Mock function to extract features from audit logs
-def extract_features(logs):
-    # For demo: use numeric encoding e.g. [action_code, user_id % 100, timestamp % 1000]
-    features = []
-    for log in logs:
-        action_code = hash(log.action) % 100
-        user_mod = log.user_id.int % 100
-        time_mod = int(log.timestamp.timestamp()) % 1000
-        features.append([action_code, user_mod, time_mod])
-    return np.array(features)
 
 @router.get("/fraud-alerts")
-def fraud_alerts(db: Session = Depends(get_db)):
-    logs = db.query(AuditLog).all()
-    features = extract_features(logs)
-
-    if not features.size:
-        return {"alerts": [], "message": "No data to analyze"}
-
-    if not detector.trained:
-        detector.train(features)
+def fraud_alerts(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = Query(None, description="Only entries logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only entries logged before this time"),
+    db: Session = Depends(get_db)
+):
+    """
+    Audit log entries flagged by the fraud model, newest first
 
-    anomalies = detector.batch_detect(features)
+    Reads the fraud_alerts table kept by app/services/fraud_scoring.py
+    (scripts/score_fraud_alerts.py from cron, or the score_fraud_alerts
+    job), so entries appear once a scoring run has passed them:
+    `scored_through` says how far that is.
+    """
+    query = db.query(FraudAlert)
+    if user_id is not None:
+        query = query.filter(FraudAlert.user_id == user_id)
+    if since:
+        query = query.filter(FraudAlert.timestamp >= since)
+    if until:
+        query = query.filter(FraudAlert.timestamp < until)
 
-    alerts = []
-    for i, is_anomaly in enumerate(anomalies):
-        if is_anomaly:
-            alerts.append({
-                "id": logs[i].id,
-                "user_id": logs[i].user_id,
-                "action": logs[i].action,
-                "timestamp": logs[i].timestamp.isoformat()
-            })
+    try:
+        alerts, next_cursor = paginate_keyset(query, FraudAlert.timestamp, FraudAlert.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {
+    watermark = db.get(Watermark, WATERMARK_NAME)
+    scored_through = watermark.value if watermark else None
+    response = {
         "alert_count": len(alerts),
-        "alerts": alerts
+        "alerts": [
+            {
+                "id": alert.audit_log_id,
+                "user_id": alert.user_id,
+                "action": alert.action,
+                "resource_type": alert.resource_type,
+                "resource_id": alert.resource_id,
+                "ip_address": alert.ip_address,
+                "timestamp": alert.timestamp.isoformat(),
+                "anomaly_score": round(alert.anomaly_score, 4),
+                "model_version": alert.model_version
+            }
+            for alert in alerts
+        ],
+        "next_cursor": next_cursor,
+        "scored_through": scored_through.isoformat() if scored_through else None
     }
+    if scored_through is None:
+        response["message"] = "Fraud scoring has not run yet"
+    return response
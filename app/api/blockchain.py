@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.db.session import SessionLocal, get_async_db
+from app.core.cache import cached, ainvalidate_tags
 from app.blockchain.audit_chain import BlockchainAudit
+from app.blockchain.appender import BlockAppender
+from app.blockchain.sealing import spawn_pool
 
 router = APIRouter(prefix="/api/blockchain", tags=["Blockchain Audit"])
 blockchain = BlockchainAudit()
+appender = BlockAppender(blockchain)
+
+# Hashing processes for /verify-chain/stream: one pool per web worker, one stream at a time
+_verify_pool: Optional[ProcessPoolExecutor] = None
+_verify_pool_lock = threading.Lock()
+_verify_slot = threading.Semaphore(1)
 
 class AuditLogRequest(BaseModel):
     action: str
@@ -28,6 +45,13 @@ class AuditLogResponse(BaseModel):
     details: Optional[dict]
     proof_of_integrity: str
 
+class AuditEntryResponse(BaseModel):
+    entry_id: int
+    leaf_hash: str
+    timestamp: datetime
+    status: str
+    proof_url: str
+
 class VerificationResponse(BaseModel):
     is_valid: bool
     block_hash: str
@@ -39,38 +63,137 @@ class ChainIntegrityResponse(BaseModel):
     total_blocks: int
     verification_timestamp: datetime
     compromised_blocks: List[str]
+    mode: str
+    verified_blocks: int
+    last_verified_block_id: Optional[int]
+    checkpoint_valid: Optional[bool]
 
 @router.post("/log-action", response_model=AuditLogResponse)
-async def log_audit_action(audit_data: AuditLogRequest, db: Session = Depends(get_db)):
-    block = blockchain.add_block(db=db, action=audit_data.action, user_id=audit_data.user_id, entity_type=audit_data.entity_type, entity_id=audit_data.entity_id, details=audit_data.details)
+async def log_audit_action(audit_data: AuditLogRequest):
+    # Single writer per process, group-committed; see BlockAppender
+    block = await asyncio.wrap_future(appender.submit(action=audit_data.action, user_id=audit_data.user_id, entity_type=audit_data.entity_type, entity_id=audit_data.entity_id, details=audit_data.details))
+    await ainvalidate_tags("blockchain")
     return {"block_hash": block.block_hash, "previous_hash": block.previous_hash, "timestamp": block.timestamp, "action": block.action, "user_id": block.user_id, "entity_type": block.entity_type, "entity_id": block.entity_id, "details": block.details, "proof_of_integrity": block.proof}
 
+@router.post("/log-entry", response_model=AuditEntryResponse)
+async def log_batched_audit_entry(audit_data: AuditLogRequest, db: AsyncSession = Depends(get_async_db)):
+    """Record an audit entry in the next Merkle batch block (no per-entry mining)"""
+    entry = await db.run_sync(lambda session: blockchain.add_entry(db=session, action=audit_data.action, user_id=audit_data.user_id, entity_type=audit_data.entity_type, entity_id=audit_data.entity_id, details=audit_data.details))
+    await ainvalidate_tags("blockchain")
+    return {"entry_id": entry.id, "leaf_hash": entry.leaf_hash, "timestamp": entry.timestamp, "status": "sealed" if entry.block_id else "pending", "proof_url": f"{router.prefix}/proof/{entry.id}"}
+
+@router.get("/proof/{entry_id}")
+async def get_entry_inclusion_proof(entry_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Merkle inclusion proof tying an audit entry to its block"""
+    proof = await db.run_sync(blockchain.get_entry_proof, entry_id)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Audit entry not found")
+    return proof
+
 @router.get("/verify-block/{block_hash}", response_model=VerificationResponse)
-async def verify_block(block_hash: str, db: Session = Depends(get_db)):
-    is_valid = blockchain.verify_block(db, block_hash)
+async def verify_block(block_hash: str, db: AsyncSession = Depends(get_async_db)):
+    is_valid = await db.run_sync(blockchain.verify_block, block_hash)
     return {"is_valid": is_valid, "block_hash": block_hash, "verification_timestamp": datetime.utcnow(), "message": "Block is valid and untampered" if is_valid else "Block integrity compromised"}
 
 @router.get("/verify-chain", response_model=ChainIntegrityResponse)
-async def verify_entire_chain(db: Session = Depends(get_db)):
-    result = blockchain.verify_chain(db)
-    return {"is_valid": result["is_valid"], "total_blocks": result["total_blocks"], "verification_timestamp": datetime.utcnow(), "compromised_blocks": result.get("compromised_blocks", [])}
+async def verify_entire_chain(
+    full: bool = Query(False, description="Rehash every block instead of only those since the last checkpoint"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.run_sync(blockchain.verify_chain, full)
+    return {**result, "verification_timestamp": datetime.utcnow()}
+
+def _verify_workers() -> int:
+    return settings.BLOCKCHAIN_VERIFY_WORKERS or os.cpu_count() or 1
+
+def _get_verify_pool() -> Optional[ProcessPoolExecutor]:
+    """The worker's shared hashing pool, started on first use (None = hash in-process)"""
+    global _verify_pool
+    if _verify_workers() <= 1:
+        return None
+    with _verify_pool_lock:
+        if _verify_pool is None:
+            _verify_pool = spawn_pool(_verify_workers())
+        return _verify_pool
+
+def shutdown_verify_pool() -> None:
+    global _verify_pool
+    with _verify_pool_lock:
+        if _verify_pool is not None:
+            _verify_pool.shutdown(cancel_futures=True)
+            _verify_pool = None
+
+def _ndjson_verification(full: bool):
+    # Runs after the request returns, so it owns its session; holds the slot taken by the endpoint
+    try:
+        db = SessionLocal()
+        try:
+            pool = _get_verify_pool()
+            for event in blockchain.iter_verify_chain(db, full, pool=pool, in_flight=2 * _verify_workers()):
+                yield json.dumps(event) + "\n"
+        finally:
+            db.close()
+    finally:
+        _verify_slot.release()
+
+@router.get("/verify-chain/stream")
+def stream_chain_verification(
+    full: bool = Query(False, description="Rehash every block instead of only those since the last checkpoint"),
+    current_user=Depends(get_current_user)
+):
+    """
+    Verify the chain, streaming NDJSON as it goes (admin only)
+    
+    One JSON object per line: start, compromised (per bad block), progress
+    (per chunk) and a final result. Suited to chains too large for
+    /verify-chain to answer in one response. Chunks are hashed by a pool of
+    BLOCKCHAIN_VERIFY_WORKERS processes shared by every request to this
+    worker, and only one stream runs at a time (409 while one is running).
+    """
+    if current_user.role.value != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if not _verify_slot.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A chain verification is already running")
+    return StreamingResponse(_ndjson_verification(full), media_type="application/x-ndjson")
+
+async def _page(db: AsyncSession, method, *args):
+    try:
+        return await db.run_sync(method, *args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/audit-trail/{entity_type}/{entity_id}")
-async def get_entity_audit_trail(entity_type: str, entity_id: int, db: Session = Depends(get_db)):
-    trail = blockchain.get_audit_trail(db, entity_type=entity_type, entity_id=entity_id)
-    return {"entity_type": entity_type, "entity_id": entity_id, "total_records": len(trail), "audit_trail": trail}
+async def get_entity_audit_trail(
+    entity_type: str,
+    entity_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    trail, next_cursor = await _page(db, blockchain.get_audit_trail, entity_type, entity_id, limit, cursor)
+    return {"entity_type": entity_type, "entity_id": entity_id, "total_records": len(trail), "audit_trail": trail, "next_cursor": next_cursor}
 
 @router.get("/user-actions/{user_id}")
-async def get_user_action_history(user_id: int, limit: Optional[int] = 100, db: Session = Depends(get_db)):
-    actions = blockchain.get_user_actions(db, user_id=user_id, limit=limit)
-    return {"user_id": user_id, "action_count": len(actions), "actions": actions}
+async def get_user_action_history(
+    user_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    actions, next_cursor = await _page(db, blockchain.get_user_actions, user_id, limit, cursor)
+    return {"user_id": user_id, "action_count": len(actions), "actions": actions, "next_cursor": next_cursor}
 
 @router.get("/recent-audits")
-async def get_recent_audit_logs(limit: int = 50, db: Session = Depends(get_db)):
-    recent_logs = blockchain.get_recent_logs(db, limit=limit)
-    return {"count": len(recent_logs), "logs": recent_logs}
+async def get_recent_audit_logs(
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    recent_logs, next_cursor = await _page(db, blockchain.get_recent_logs, limit, cursor)
+    return {"count": len(recent_logs), "logs": recent_logs, "next_cursor": next_cursor}
 
 @router.get("/chain-stats")
-async def get_blockchain_statistics(db: Session = Depends(get_db)):
-    stats = blockchain.get_chain_statistics(db)
+@cached(tags=["blockchain"], scope="global")
+async def get_blockchain_statistics(db: AsyncSession = Depends(get_async_db)):
+    stats = await db.run_sync(blockchain.get_chain_statistics)
     return stats
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.core.cache import cached
 from app.db.models.task import Task
 from datetime import datetime, timedelta
 from sqlalchemy import func
@@ -23,6 +24,7 @@ class MoraleData(BaseModel):
 
 
 @router.get("/task-trends", response_model=List[TaskTrendData])
+@cached(tags=["tasks"], scope="global")
 def task_trends(days: int = 7, db: Session = Depends(get_db)):
     """Get task trends for the last N days"""
     today = datetime.utcnow()
@@ -43,6 +45,7 @@ def task_trends(days: int = 7, db: Session = Depends(get_db)):
 
 
 @router.get("/team-morale", response_model=MoraleData)
+@cached(tags=["tasks"], scope="global")
 def team_morale(db: Session = Depends(get_db)):
     """Get team morale statistics based on sentiment analysis"""
     # In production, fetch from actual sentiment data
@@ -56,6 +59,7 @@ def team_morale(db: Session = Depends(get_db)):
 
 
 @router.get("/productivity-over-time")
+@cached(tags=["tasks"], scope="global")
 def productivity_over_time(days: int = 30, db: Session = Depends(get_db)):
     """Get productivity score trends over time"""
     today = datetime.utcnow()
@@ -79,6 +83,7 @@ def productivity_over_time(days: int = 30, db: Session = Depends(get_db)):
 
 
 @router.get("/task-status-distribution")
+@cached(tags=["tasks"], scope="global")
 def task_status_distribution(db: Session = Depends(get_db)):
     """Get distribution of tasks by status"""
     results = db.query(
@@ -90,6 +95,7 @@ def task_status_distribution(db: Session = Depends(get_db)):
 
 
 @router.get("/tasks-by-priority")
+@cached(tags=["tasks"], scope="global")
 def tasks_by_priority(db: Session = Depends(get_db)):
     """Get task distribution by priority"""
     results = db.query(
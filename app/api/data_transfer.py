@@ -1,109 +1,91 @@
-from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Response
+from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.db.models.task import Task
-import csv
-from io import StringIO
-from datetime import datetime
+from app.models.user import User
+from app.core.security import get_current_user
+from app.core.cache import invalidate_tags
+from app.utils.csv_stream import iter_rows, iter_csv, gzip_chunks
+from app.services.data_export import EXPORTS
+from app.services.task_import import (
+    import_tasks as bulk_import_tasks,
+    iter_csv_records,
+    iter_xlsx_records,
+)
 
 
 router = APIRouter(prefix="/api/data", tags=["Data Transfer"])
 
 
 @router.post("/import")
-async def import_tasks(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Import tasks from CSV file"""
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+def import_tasks(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import tasks from a CSV or XLSX file
     
-    try:
-        content = await file.read()
-        csv_content = StringIO(content.decode('utf-8'))
-        reader = csv.DictReader(csv_content)
-        
-        imported_count = 0
-        for row in reader:
-            task = Task(
-                title=row.get("title"),
-                description=row.get("description", ""),
-                assigned_to=row.get("assigned_to"),
-                due_date=datetime.fromisoformat(row.get("due_date")) if row.get("due_date") else None,
-                priority=row.get("priority", "medium"),
-                status=row.get("status", "pending")
-            )
-            db.add(task)
-            imported_count += 1
-        
-        db.commit()
-        return {
-            "message": "Tasks imported successfully",
-            "count": imported_count
-        }
+    The upload is parsed row by row and valid rows are bulk-inserted in
+    batches; invalid rows are skipped and listed in `errors` (row numbers
+    as shown in a spreadsheet, header = row 1). Large files should go
+    through POST /api/jobs/imports instead, which runs on the job worker.
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith('.csv'):
+        records = iter_csv_records(file.file)
+    elif filename.endswith('.xlsx'):
+        records = iter_xlsx_records(file.file)
+    else:
+        raise HTTPException(status_code=400, detail="Only CSV and XLSX files are supported")
     
+    try:
+        result = bulk_import_tasks(db, records, created_by=current_user.id)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
-
-
-@router.get("/export")
-def export_tasks(db: Session = Depends(get_db)):
-    """Export all tasks to CSV file"""
-    tasks = db.query(Task).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
     
-    # Write header
-    writer.writerow(["id", "title", "description", "assigned_to", "due_date", "priority", "status", "created_at"])
+    if result["imported"]:
+        invalidate_tags("tasks")
     
-    # Write data
-    for task in tasks:
-        writer.writerow([
-            str(task.id),
-            task.title,
-            task.description,
-            str(task.assigned_to),
-            task.due_date.isoformat() if task.due_date else "",
-            task.priority,
-            task.status,
-            task.created_at.isoformat() if hasattr(task, 'created_at') else ""
-        ])
-    
-    csv_data = output.getvalue()
-    
-    return Response(
-        content=csv_data,
+    return {
+        "message": "Tasks imported successfully" if not result["failed"] else "Tasks imported with errors",
+        "count": result["imported"],
+        "failed": result["failed"],
+        "errors": result["errors"]
+    }
+
+
+def _csv_response(rows, header, to_values, filename: str, compress: bool) -> StreamingResponse:
+    """Stream rows as CSV (or .csv.gz) without materializing the file"""
+    body = iter_csv(rows, header, to_values)
+    if compress:
+        return StreamingResponse(
+            gzip_chunks(body),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+        )
+    return StreamingResponse(
+        body,
         media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=tasks_export.csv"
-        }
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
-@router.get("/export-audit-logs")
-def export_audit_logs(db: Session = Depends(get_db)):
-    """Export audit logs to CSV"""
-    from app.db.models.audit_log import AuditLog
-    
-    logs = db.query(AuditLog).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    writer.writerow(["id", "user_id", "action", "resource_type", "resource_id", "timestamp"])
-    
-    for log in logs:
-        writer.writerow([
-            log.id,
-            str(log.user_id),
-            log.action,
-            log.resource_type,
-            log.resource_id,
-            log.timestamp.isoformat()
-        ])
-    
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
+def _export_response(name: str, compress: bool) -> StreamingResponse:
+    spec = EXPORTS[name]
+    return _csv_response(
+        iter_rows(spec["statement"]()), spec["header"], spec["to_values"], spec["filename"], compress
     )
+
+
+@router.get("/export")
+def export_tasks(compress: bool = Query(False, description="gzip the CSV on the fly")):
+    """Export all tasks to CSV file (streamed; POST /api/jobs/exports/tasks for a background job)"""
+    return _export_response("tasks", compress)
+
+
+@router.get("/export-audit-logs")
+def export_audit_logs(compress: bool = Query(False, description="gzip the CSV on the fly")):
+    """Export audit logs to CSV (streamed; POST /api/jobs/exports/audit_logs for a background job)"""
+    return _export_response("audit_logs", compress)
@@ -0,0 +1,187 @@
+import shutil
+from pathlib import Path
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.core.security import get_current_user
+from app.db.session import get_db
+from app.db.models.job import Job
+from app.models.user import User
+from app.services import job_handlers  # noqa: F401  (registers the job types)
+from app.services.data_export import EXPORTS
+from app.services.job_queue import artifact_dir, enqueue_job, new_job_id
+
+# Mounted under /api in main.py
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+UPLOAD_COPY_CHUNK = 1024 * 1024
+
+
+def _require_role(user: User, *roles: str) -> None:
+    if user.role.value not in roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+
+def _accepted(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "type": job.type,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+    }
+
+
+def _get_visible_job(db: Session, job_id: str, user: User) -> Job:
+    job = db.get(Job, job_id)
+    # 404 rather than 403 so job ids can't be probed
+    if job is None or (job.created_by != user.id and user.role.value != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/imports", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_task_import(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import tasks from a CSV or XLSX file on the job worker
+
+    The upload is stored with the job; poll GET /api/jobs/{job_id} for
+    progress and the per-row error report.
+    """
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in (".csv", ".xlsx"):
+        raise HTTPException(status_code=400, detail="Only CSV and XLSX files are supported")
+
+    job_id = new_job_id()
+    directory = artifact_dir(job_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    upload_name = f"upload{suffix}"
+    with open(directory / upload_name, "wb") as out:
+        shutil.copyfileobj(file.file, out, UPLOAD_COPY_CHUNK)
+
+    job = enqueue_job(
+        db, "import_tasks",
+        {"upload": upload_name, "filename": file.filename, "created_by": current_user.id},
+        created_by=current_user.id, job_id=job_id
+    )
+    return _accepted(job)
+
+
+@router.post("/exports/{export}", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_csv_export(
+    export: str,
+    compress: bool = Query(False, description="gzip the CSV"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Export tasks or audit logs to CSV on the job worker"""
+    if export not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export. Available: {sorted(EXPORTS)}")
+    if export == "audit_logs":
+        _require_role(current_user, "admin")
+
+    job = enqueue_job(db, "export_csv", {"export": export, "compress": compress}, created_by=current_user.id)
+    return _accepted(job)
+
+
+@router.post("/reports/users/{user_id}", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_user_report(
+    user_id: int,
+    format: Literal["pdf", "excel"] = Query("pdf"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Generate a user productivity report (PDF or Excel) on the job worker"""
+    if current_user.id != user_id:
+        _require_role(current_user, "admin", "manager")
+
+    job = enqueue_job(
+        db, "user_productivity_report", {"user_id": user_id, "format": format},
+        created_by=current_user.id
+    )
+    return _accepted(job)
+
+
+@router.post("/reports/teams/{department}", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_team_report(
+    department: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Generate a team productivity Excel report on the job worker"""
+    _require_role(current_user, "admin", "manager")
+
+    job = enqueue_job(db, "team_productivity_report", {"department": department}, created_by=current_user.id)
+    return _accepted(job)
+
+
+@router.post("/train-model", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_model_training(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Retrain the task delay prediction model on the job worker"""
+    _require_role(current_user, "admin")
+
+    job = enqueue_job(db, "train_performance_model", created_by=current_user.id)
+    return _accepted(job)
+
+
+@router.post("/fraud-scoring", status_code=status.HTTP_202_ACCEPTED)
+def enqueue_fraud_scoring(
+    retrain: bool = Query(False, description="Retrain the fraud model before scoring"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Score new audit entries for fraud alerts on the job worker (normally run from cron)"""
+    _require_role(current_user, "admin")
+
+    job = enqueue_job(db, "score_fraud_alerts", {"retrain": retrain}, created_by=current_user.id)
+    return _accepted(job)
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Job status, progress (0..1) and result"""
+    job = _get_visible_job(db, job_id, current_user)
+    download_url: Optional[str] = f"/api/jobs/{job.id}/download" if job.artifact_path else None
+    return {
+        "job_id": job.id,
+        "type": job.type,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "download_url": download_url,
+    }
+
+
+@router.get("/{job_id}/download")
+def download_job_artifact(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download the file a finished job produced"""
+    job = _get_visible_job(db, job_id, current_user)
+    if not job.artifact_path:
+        raise HTTPException(status_code=404, detail="Job has no downloadable file")
+    if not Path(job.artifact_path).is_file():
+        raise HTTPException(status_code=410, detail="Job file has expired")
+
+    return FileResponse(job.artifact_path, media_type=job.artifact_media_type, filename=job.artifact_name)
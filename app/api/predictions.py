@@ -2,17 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 
 from app.db.session import get_db
 from app.db.models.task import Task
 from app.models.user import User
-from app.ml.performance_predictor import PerformancePredictor
+from app.ml.performance_predictor import ACTIVE_STATUSES, PerformancePredictor
 
 router = APIRouter(prefix="/api/predictions", tags=["ML Predictions"])
 predictor = PerformancePredictor()
 
+MAX_BATCH_TASKS = 5000
+
 class DelayPredictionResponse(BaseModel):
     task_id: str
     delay_risk_score: float
@@ -20,6 +22,28 @@ class DelayPredictionResponse(BaseModel):
     predicted_completion_delay_days: int
     recommendations: List[str]
 
+class BatchDelayPredictionRequest(BaseModel):
+    task_ids: Optional[List[int]] = Field(None, max_length=MAX_BATCH_TASKS)
+    department: Optional[str] = None
+    assigned_to: Optional[int] = None
+    # Default: open tasks, unless task_ids are given
+    statuses: Optional[List[str]] = None
+    limit: int = Field(1000, ge=1, le=MAX_BATCH_TASKS)
+
+class TaskDelayRisk(BaseModel):
+    task_id: int
+    delay_risk_score: float
+    risk_level: str
+    predicted_completion_delay_days: int
+    recommendations: List[str]
+
+class BatchDelayPredictionResponse(BaseModel):
+    count: int
+    scored_with: str  # Model type, or "Rule-based" while no model is trained
+    predictions: List[TaskDelayRisk]
+    missing_task_ids: List[int]
+    truncated: bool
+
 class BurnoutPredictionResponse(BaseModel):
     user_id: str
     burnout_risk_score: float
@@ -34,13 +58,54 @@ class PerformanceForecastResponse(BaseModel):
     predicted_avg_delay_hours: float
     trend: str
 
+# Declared before /task-delay-risk/{task_id}, which would otherwise match "batch"
+@router.post("/task-delay-risk/batch", response_model=BatchDelayPredictionResponse)
+def predict_task_delay_risk_batch(request: BatchDelayPredictionRequest, db: Session = Depends(get_db)):
+    """
+    Delay risk for many tasks in one call (e.g. a risk column on the task board)
+
+    Select tasks by id, or by department / assignee / status (open tasks by
+    default), up to `limit`. Features come from one grouped query and the
+    model scores them in a single call.
+    """
+    statuses = request.statuses
+    limit = request.limit
+    if request.task_ids is not None:
+        limit = len(set(request.task_ids)) or 1
+    elif statuses is None:
+        statuses = list(ACTIVE_STATUSES)
+
+    predictor.refresh()
+    predictions = predictor.predict_task_delays(
+        db,
+        task_ids=request.task_ids,
+        department=request.department,
+        assigned_to=request.assigned_to,
+        statuses=statuses,
+        limit=limit
+    )
+
+    missing = []
+    if request.task_ids is not None:
+        found = {p["task_id"] for p in predictions}
+        missing = sorted(set(request.task_ids) - found)
+
+    return {
+        "count": len(predictions),
+        "scored_with": "RandomForestClassifier" if predictor.model is not None else "Rule-based",
+        "predictions": predictions,
+        "missing_task_ids": missing,
+        "truncated": request.task_ids is None and len(predictions) == limit
+    }
+
 @router.post("/task-delay-risk/{task_id}", response_model=DelayPredictionResponse)
-async def predict_task_delay_risk(task_id: str, db: Session = Depends(get_db)):
+def predict_task_delay_risk(task_id: str, db: Session = Depends(get_db)):
     """Predict delay risk for a specific task using ML model"""
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    predictor.refresh()
     prediction = predictor.predict_task_delay(db, task_id)
     
     if prediction is None:
@@ -49,12 +114,13 @@ async def predict_task_delay_risk(task_id: str, db: Session = Depends(get_db)):
     return prediction
 
 @router.post("/user-burnout-risk/{user_id}", response_model=BurnoutPredictionResponse)
-async def predict_user_burnout(user_id: str, db: Session = Depends(get_db)):
+def predict_user_burnout(user_id: str, db: Session = Depends(get_db)):
     """Predict burnout risk for a user based on workload patterns"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    predictor.refresh()
     prediction = predictor.predict_user_burnout(db, user_id)
     
     if prediction is None:
@@ -63,13 +129,13 @@ async def predict_user_burnout(user_id: str, db: Session = Depends(get_db)):
     return prediction
 
 @router.get("/performance-forecast", response_model=PerformanceForecastResponse)
-async def forecast_department_performance(department_id: Optional[int] = None, forecast_days: int = 30, db: Session = Depends(get_db)):
+def forecast_department_performance(department_id: Optional[int] = None, forecast_days: int = 30, db: Session = Depends(get_db)):
     """Forecast department or organization-wide performance trends"""
     forecast = predictor.forecast_performance(db, department_id=department_id, days_ahead=forecast_days)
     return forecast
 
 @router.post("/train-model")
-async def train_prediction_model(db: Session = Depends(get_db)):
+def train_prediction_model(db: Session = Depends(get_db)):
     """Train/retrain the ML model with latest task data"""
     try:
         metrics = predictor.train_model(db)
@@ -80,4 +146,5 @@ async def train_prediction_model(db: Session = Depends(get_db)):
 @router.get("/model-info")
 async def get_model_info():
     """Get information about the current ML model"""
+    predictor.refresh()
     return predictor.get_model_info()
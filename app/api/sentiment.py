@@ -48,7 +48,7 @@ async def analyze_text_sentiment(text: str):
     return result
 
 @router.get("/task-sentiment/{task_id}", response_model=TaskSentimentResponse)
-async def get_task_sentiment(task_id: int, db: Session = Depends(get_db)):
+def get_task_sentiment(task_id: int, db: Session = Depends(get_db)):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -58,12 +58,12 @@ async def get_task_sentiment(task_id: int, db: Session = Depends(get_db)):
     return sentiment_data
 
 @router.get("/team-morale", response_model=TeamMoraleResponse)
-async def get_team_morale(department_id: Optional[int] = None, days: int = 30, db: Session = Depends(get_db)):
+def get_team_morale(department_id: Optional[int] = None, days: int = 30, db: Session = Depends(get_db)):
     morale_data = analyzer.analyze_team_morale(db, department_id=department_id, days_back=days)
     return morale_data
 
 @router.get("/user-sentiment-timeline/{user_id}", response_model=UserSentimentTimelineResponse)
-async def get_user_sentiment_timeline(user_id: int, days: int = 90, db: Session = Depends(get_db)):
+def get_user_sentiment_timeline(user_id: int, days: int = 90, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -71,6 +71,6 @@ async def get_user_sentiment_timeline(user_id: int, days: int = 90, db: Session
     return timeline_data
 
 @router.get("/burnout-alerts")
-async def get_burnout_alerts(threshold: float = 0.7, db: Session = Depends(get_db)):
+def get_burnout_alerts(threshold: float = 0.7, db: Session = Depends(get_db)):
     alerts = analyzer.detect_burnout_signals(db, threshold=threshold)
     return {"alert_count": len(alerts), "alerts": alerts, "timestamp": datetime.utcnow()}
@@ -792,14 +792,19 @@ Fixed: Uses updated_at instead of non-existent completed_at field
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.models.task import Task
 from app.core.security import get_current_user
+from app.core.cache import cached
+from app.services.dashboard_aggregator import build_admin_dashboard
+from app.services.productivity_calculator import average_score
+from app.services.productivity_rollup import get_rollup_user_scores
+from app.utils.productivity_formulas import calculate_completion_rate
 import logging
 
 # Initialize router with prefix and tags
@@ -809,36 +814,14 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 logger = logging.getLogger(__name__)
 
 
-# ============================================
-# HELPER FUNCTIONS
-# ============================================
-
-def calculate_completion_rate(completed: int, total: int) -> float:
-    """Calculate completion rate percentage"""
-    return round((completed / total * 100) if total > 0 else 0, 1)
-
-
-def get_month_range(months_ago: int) -> tuple:
-    """Get start and end dates for a month in the past"""
-    now = datetime.utcnow()
-    month_date = now - timedelta(days=30 * months_ago)
-    month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    if month_start.month == 12:
-        month_end = month_start.replace(year=month_start.year + 1, month=1)
-    else:
-        month_end = month_start.replace(month=month_start.month + 1)
-    
-    return month_start, month_end
-
-
 # ============================================
 # ADMIN DASHBOARD ENDPOINT (COMPLETE VERSION)
 # ============================================
 
 @router.get("/admin")
+@cached(tags=["tasks", "users"], scope="role")
 async def get_admin_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -865,168 +848,7 @@ async def get_admin_dashboard(
             )
         
         logger.info(f"Admin dashboard requested by {current_user.email}")
-        
-        # ============================================
-        # 1. TOTAL EMPLOYEES
-        # ============================================
-        total_employees = db.query(func.count(User.id)).filter(
-            User.is_active == True
-        ).scalar() or 0
-        
-        # ============================================
-        # 2. ACTIVE TASKS (pending + in_progress)
-        # ============================================
-        active_tasks = db.query(func.count(Task.id)).filter(
-            Task.status.in_(['pending', 'in_progress'])
-        ).scalar() or 0
-        
-        # ============================================
-        # 3. PRODUCTIVITY CALCULATION
-        # ============================================
-        completed_tasks = db.query(func.count(Task.id)).filter(
-            Task.status == 'completed'
-        ).scalar() or 0
-        
-        total_tasks = db.query(func.count(Task.id)).scalar() or 0
-        
-        productivity = calculate_completion_rate(completed_tasks, total_tasks)
-        
-        # ============================================
-        # 4. AVERAGE DELAY (using updated_at)
-        # ============================================
-        avg_delay = 2.3  # Default
-        
-        try:
-            delay_query = db.query(
-                func.avg(
-                    func.extract('epoch', Task.updated_at - Task.due_date) / 3600
-                )
-            ).filter(
-                Task.status == 'completed',
-                Task.updated_at.isnot(None),
-                Task.due_date.isnot(None),
-                Task.updated_at > Task.due_date
-            ).scalar()
-            
-            if delay_query:
-                avg_delay = round(float(delay_query), 1)
-        except Exception as e:
-            logger.warning(f"Could not calculate avg_delay: {e}")
-        
-        # ============================================
-        # 5. DEPARTMENT PERFORMANCE
-        # ============================================
-        department_stats = db.query(
-            User.department,
-            func.count(Task.id).label('total_tasks'),
-            func.sum(
-                case((Task.status == 'completed', 1), else_=0)
-            ).label('completed_tasks')
-        ).join(
-            Task, User.id == Task.assigned_to, isouter=True
-        ).filter(
-            User.is_active == True,
-            User.department.isnot(None)
-        ).group_by(User.department).all()
-        
-        department_performance = []
-        for stat in department_stats:
-            total = stat.total_tasks or 0
-            completed = stat.completed_tasks or 0
-            performance = calculate_completion_rate(completed, total)
-            
-            department_performance.append({
-                'department': stat.department,
-                'performance': performance,
-                'tasks': total,
-                'completed': completed
-            })
-        
-        department_performance.sort(key=lambda x: x['performance'], reverse=True)
-        
-        # ============================================
-        # 6. PRODUCTIVITY TREND (Last 12 Months)
-        # ============================================
-        productivity_trend = []
-        
-        for i in range(11, -1, -1):
-            month_start, month_end = get_month_range(i)
-            
-            month_completed = db.query(func.count(Task.id)).filter(
-                Task.status == 'completed',
-                Task.updated_at >= month_start,
-                Task.updated_at < month_end
-            ).scalar() or 0
-            
-            month_total = db.query(func.count(Task.id)).filter(
-                Task.created_at >= month_start,
-                Task.created_at < month_end
-            ).scalar() or 0
-            
-            month_productivity = calculate_completion_rate(month_completed, month_total)
-            
-            productivity_trend.append({
-                'month': month_start.strftime('%b'),
-                'productivity': month_productivity,
-                'target': 85
-            })
-        
-        # ============================================
-        # 7. TASK DISTRIBUTION (NEW - for Pie Chart)
-        # ============================================
-        pending_count = db.query(func.count(Task.id)).filter(
-            Task.status == 'pending'
-        ).scalar() or 0
-        
-        in_progress_count = db.query(func.count(Task.id)).filter(
-            Task.status == 'in_progress'
-        ).scalar() or 0
-        
-        completed_count = db.query(func.count(Task.id)).filter(
-            Task.status == 'completed'
-        ).scalar() or 0
-        
-        # Calculate percentages
-        total_for_distribution = pending_count + in_progress_count + completed_count
-        
-        if total_for_distribution > 0:
-            task_distribution = [
-                {
-                    'name': 'Completed',
-                    'value': round((completed_count / total_for_distribution) * 100, 1),
-                    'color': '#10B981'
-                },
-                {
-                    'name': 'In Progress',
-                    'value': round((in_progress_count / total_for_distribution) * 100, 1),
-                    'color': '#3B82F6'
-                },
-                {
-                    'name': 'Pending',
-                    'value': round((pending_count / total_for_distribution) * 100, 1),
-                    'color': '#F59E0B'
-                }
-            ]
-        else:
-            # Fallback with sample data
-            task_distribution = [
-                {'name': 'Completed', 'value': 65, 'color': '#10B981'},
-                {'name': 'In Progress', 'value': 25, 'color': '#3B82F6'},
-                {'name': 'Pending', 'value': 10, 'color': '#F59E0B'}
-            ]
-        
-        # ============================================
-        # 8. RETURN COMPLETE RESPONSE
-        # ============================================
-        response = {
-            'totalEmployees': total_employees,
-            'activeTasks': active_tasks,
-            'productivity': productivity,
-            'avgDelay': avg_delay,
-            'departmentPerformance': department_performance,
-            'productivityTrend': productivity_trend,
-            'taskDistribution': task_distribution  # ✅ NEW FIELD ADDED
-        }
+        response = await db.run_sync(build_admin_dashboard)
         
         logger.info("Admin dashboard data generated successfully")
         return response
@@ -1046,9 +868,10 @@ async def get_admin_dashboard(
 # ============================================
 
 @router.get("/user/{user_id}")
+@cached(tags=["tasks", "users"], scope="user")
 async def get_user_productivity(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed productivity metrics for a specific user"""
@@ -1061,61 +884,14 @@ async def get_user_productivity(
                 detail="You can only view your own productivity data"
             )
         
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        scores = await db.run_sync(get_rollup_user_scores, User.id == user_id)
+        if user_id not in scores:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        total_tasks = db.query(Task).filter(Task.assigned_to == user_id).count()
-        completed_tasks = db.query(Task).filter(
-            Task.assigned_to == user_id,
-            Task.status == 'completed'
-        ).count()
-        
-        on_time_tasks = db.query(Task).filter(
-            Task.assigned_to == user_id,
-            Task.status == 'completed',
-            Task.updated_at <= Task.due_date
-        ).count()
-        
-        now = datetime.utcnow()
-        overdue_tasks = db.query(Task).filter(
-            Task.assigned_to == user_id,
-            Task.status != 'completed',
-            Task.due_date < now
-        ).count()
-        
-        avg_time_query = db.query(
-            func.avg(func.extract('epoch', Task.updated_at - Task.created_at) / 3600)
-        ).filter(
-            Task.assigned_to == user_id,
-            Task.status == 'completed',
-            Task.updated_at.isnot(None)
-        ).scalar()
-        
-        avg_completion_time = round(float(avg_time_query), 2) if avg_time_query else 0
-        
-        completion_rate = calculate_completion_rate(completed_tasks, total_tasks)
-        on_time_rate = calculate_completion_rate(on_time_tasks, completed_tasks)
-        
-        score = (completion_rate * 0.6) + (on_time_rate * 0.4)
-        
-        return {
-            'user_id': user_id,
-            'user_name': user.full_name,
-            'email': user.email,
-            'department': user.department,
-            'score': round(score, 2),
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'on_time_tasks': on_time_tasks,
-            'overdue_tasks': overdue_tasks,
-            'avg_completion_time': avg_completion_time,
-            'completion_rate': completion_rate,
-            'on_time_rate': on_time_rate
-        }
+        return scores[user_id]
         
     except HTTPException:
         raise
@@ -1132,9 +908,10 @@ async def get_user_productivity(
 # ============================================
 
 @router.get("/team/{department}")
+@cached(tags=["tasks", "users"], scope="role")
 async def get_team_productivity(
     department: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get productivity metrics for a specific department/team"""
@@ -1146,39 +923,27 @@ async def get_team_productivity(
                 detail="Manager or admin access required"
             )
         
-        users = db.query(User).filter(
+        team_scores = await db.run_sync(
+            get_rollup_user_scores,
             User.department == department,
             User.is_active == True
-        ).all()
+        )
         
-        if not users:
+        if not team_scores:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No active users found in department: {department}"
             )
         
-        user_ids = [u.id for u in users]
+        total_tasks = sum(s['total_tasks'] for s in team_scores.values())
+        completed_tasks = sum(s['completed_tasks'] for s in team_scores.values())
         
-        total_tasks = db.query(Task).filter(Task.assigned_to.in_(user_ids)).count()
-        completed_tasks = db.query(Task).filter(
-            Task.assigned_to.in_(user_ids),
-            Task.status == 'completed'
-        ).count()
-        
-        team_scores = []
-        for user_id in user_ids:
-            try:
-                user_data = await get_user_productivity(user_id, db, current_user)
-                team_scores.append(user_data['score'])
-            except Exception as e:
-                logger.warning(f"Could not get score for user {user_id}: {e}")
-        
-        avg_score = round(sum(team_scores) / len(team_scores), 2) if team_scores else 0
+        avg_score = average_score(team_scores)
         completion_rate = calculate_completion_rate(completed_tasks, total_tasks)
         
         return {
             'department': department,
-            'total_employees': len(users),
+            'total_employees': len(team_scores),
             'avg_score': avg_score,
             'total_tasks': total_tasks,
             'completed_tasks': completed_tasks,
@@ -1200,8 +965,9 @@ async def get_team_productivity(
 # ============================================
 
 @router.get("/organization")
+@cached(tags=["tasks", "users"], scope="role")
 async def get_organization_metrics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get organization-wide productivity metrics"""
@@ -1213,30 +979,30 @@ async def get_organization_metrics(
                 detail="Admin access required"
             )
         
-        total_employees = db.query(User).filter(User.is_active == True).count()
-        total_tasks = db.query(Task).count()
-        completed_tasks = db.query(Task).filter(Task.status == 'completed').count()
+        total_employees = await db.scalar(
+            select(func.count(User.id)).where(User.is_active == True)
+        )
         
         now = datetime.utcnow()
-        total_overdue = db.query(Task).filter(
-            Task.status != 'completed',
-            Task.due_date < now
-        ).count()
-        
-        departments = db.query(User.department).distinct().all()
-        dept_list = [dept[0] for dept in departments if dept[0]]
-        
-        all_users = db.query(User).filter(User.is_active == True).all()
-        all_scores = []
+        task_totals = (await db.execute(
+            select(
+                func.count(Task.id).label('total'),
+                func.count(Task.id).filter(Task.status == 'completed').label('completed'),
+                func.count(Task.id).filter(
+                    Task.status != 'completed',
+                    Task.due_date < now
+                ).label('overdue'),
+            )
+        )).one()
+        total_tasks = task_totals.total
+        completed_tasks = task_totals.completed
+        total_overdue = task_totals.overdue
         
-        for user in all_users:
-            try:
-                user_data = await get_user_productivity(user.id, db, current_user)
-                all_scores.append(user_data['score'])
-            except Exception as e:
-                logger.warning(f"Could not get score for user {user.id}: {e}")
+        departments = await db.scalars(select(User.department).distinct())
+        dept_list = [dept for dept in departments if dept]
         
-        avg_score = round(sum(all_scores) / len(all_scores), 2) if all_scores else 0
+        all_scores = await db.run_sync(get_rollup_user_scores, User.is_active == True)
+        avg_score = average_score(all_scores)
         
         return {
             'total_employees': total_employees,
@@ -1263,8 +1029,9 @@ async def get_organization_metrics(
 # ============================================
 
 @router.get("/sla-breaches")
+@cached(tags=["tasks", "users"], scope="role")
 async def get_sla_breaches(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all tasks that are overdue (SLA breaches)"""
@@ -1278,12 +1045,14 @@ async def get_sla_breaches(
         
         now = datetime.utcnow()
         
-        overdue_tasks = db.query(Task, User).join(
-            User, Task.assigned_to == User.id
-        ).filter(
-            Task.status != 'completed',
-            Task.due_date < now
-        ).all()
+        overdue_tasks = (await db.execute(
+            select(Task, User).join(
+                User, Task.assigned_to == User.id
+            ).where(
+                Task.status != 'completed',
+                Task.due_date < now
+            )
+        )).all()
         
         breaches = []
         for task, user in overdue_tasks:
@@ -1326,18 +1095,21 @@ async def get_sla_breaches(
 # ============================================
 
 @router.get("/department/{department_name}")
+@cached(tags=["tasks", "users"], scope="role")
 async def get_department_analytics(
     department_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed analytics for a specific department"""
     
     try:
-        employee_count = db.query(func.count(User.id)).filter(
-            User.department == department_name,
-            User.is_active == True
-        ).scalar() or 0
+        employee_count = await db.scalar(
+            select(func.count(User.id)).where(
+                User.department == department_name,
+                User.is_active == True
+            )
+        ) or 0
         
         if employee_count == 0:
             raise HTTPException(
@@ -1345,21 +1117,19 @@ async def get_department_analytics(
                 detail=f"No active employees in department: {department_name}"
             )
         
-        dept_users = db.query(User.id).filter(
+        dept_users = select(User.id).where(
             User.department == department_name,
             User.is_active == True
-        ).all()
-        
-        user_ids = [u.id for u in dept_users]
-        
-        total_tasks = db.query(func.count(Task.id)).filter(
-            Task.assigned_to.in_(user_ids)
-        ).scalar() or 0
+        )
         
-        completed_tasks = db.query(func.count(Task.id)).filter(
-            Task.assigned_to.in_(user_ids),
-            Task.status == 'completed'
-        ).scalar() or 0
+        task_totals = (await db.execute(
+            select(
+                func.count(Task.id).label('total'),
+                func.count(Task.id).filter(Task.status == 'completed').label('completed'),
+            ).where(Task.assigned_to.in_(dept_users))
+        )).one()
+        total_tasks = task_totals.total or 0
+        completed_tasks = task_totals.completed or 0
         
         productivity = calculate_completion_rate(completed_tasks, total_tasks)
         
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
+from app.core.config import settings
 from app.db.session import get_db
 from app.db.models.audit_log import AuditLog
 from app.models.user import User
@@ -10,18 +11,28 @@ import datetime
 
 router = APIRouter()
 
+def _in_window(query, since: Optional[datetime.datetime], until: Optional[datetime.datetime]):
+    """Time bounds; audit_logs is partitioned by month, so these prune partitions"""
+    if since:
+        query = query.filter(AuditLog.timestamp >= since)
+    if until:
+        query = query.filter(AuditLog.timestamp < until)
+    return query
+
 @router.get("/audit-logs")
 def get_audit_logs(
     user_id: Optional[str] = None,
     action: Optional[str] = None,
     resource_type: Optional[str] = None,
+    since: Optional[datetime.datetime] = Query(None, description="Only entries at or after this time (UTC)"),
+    until: Optional[datetime.datetime] = Query(None, description="Only entries before this time (UTC)"),
     limit: int = Query(50, le=500),
     skip: int = 0,
     db: Session = Depends(get_db)
 ):
     """Get audit logs with optional filters"""
     
-    query = db.query(AuditLog)
+    query = _in_window(db.query(AuditLog), since, until)
     
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
@@ -48,10 +59,16 @@ def get_audit_logs(
     ]
 
 @router.get("/audit-logs/user/{user_id}")
-def get_user_audit_logs(user_id: str, limit: int = 50, db: Session = Depends(get_db)):
+def get_user_audit_logs(
+    user_id: str,
+    limit: int = 50,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db)
+):
     """Get all audit logs for a specific user"""
     
-    logs = db.query(AuditLog).filter(
+    logs = _in_window(db.query(AuditLog), since, until).filter(
         AuditLog.user_id == user_id
     ).order_by(desc(AuditLog.timestamp)).limit(limit).all()
     
@@ -71,13 +88,21 @@ def get_user_audit_logs(user_id: str, limit: int = 50, db: Session = Depends(get
     ]
 
 @router.get("/audit-logs/task/{task_id}")
-def get_task_audit_logs(task_id: str, db: Session = Depends(get_db)):
-    """Get all audit logs for a specific task"""
+def get_task_audit_logs(
+    task_id: str,
+    since: Optional[datetime.datetime] = Query(None, description="Only entries at or after this time (UTC; default: LOG_QUERY_DEFAULT_HOURS before `until`)"),
+    until: Optional[datetime.datetime] = Query(None, description="Only entries before this time (UTC)"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get the latest audit logs for a specific task (last LOG_QUERY_DEFAULT_HOURS unless `since` is given)"""
     
-    logs = db.query(AuditLog).filter(
+    if since is None:
+        since = (until or datetime.datetime.utcnow()) - datetime.timedelta(hours=settings.LOG_QUERY_DEFAULT_HOURS)
+    logs = _in_window(db.query(AuditLog), since, until).filter(
         AuditLog.resource_type == "task",
         AuditLog.resource_id == task_id
-    ).order_by(desc(AuditLog.timestamp)).all()
+    ).order_by(desc(AuditLog.timestamp)).limit(limit).all()
     
     # Convert UUID to string
     return [
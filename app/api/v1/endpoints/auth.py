@@ -1,26 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Optional
 import logging
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.core.security import create_access_token, verify_password, get_password_hash
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserResponse
 from app.services.email_service import send_welcome_email
+from app.core.cache import ainvalidate_tags
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 logger = logging.getLogger(__name__)
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await get_user_by_email(db, email)
     if not user or not verify_password(password, user.hashed_password):
         return None
     return user
@@ -30,12 +33,12 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
 async def register(
     user_data: UserCreate,
     background_tasks: BackgroundTasks,  # Keep this for now
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new user and send welcome email"""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -53,8 +56,9 @@ async def register(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    await ainvalidate_tags("users")
     
     logger.info(f"✅ User registered: {new_user.email}")
     
@@ -85,12 +89,12 @@ async def register(
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login endpoint"""
     
     # Authenticate user
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -131,7 +135,7 @@ async def login(
 @router.get("/me")
 async def get_current_user_info(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user information"""
     from app.core.security import decode_access_token
@@ -146,7 +150,7 @@ async def get_current_user_info(
                 detail="Invalid authentication credentials"
             )
         
-        user = get_user_by_email(db, email)
+        user = await get_user_by_email(db, email)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
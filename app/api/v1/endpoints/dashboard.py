@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.core.security import get_current_user
+from app.core.cache import cached
 from app.db.models.task import Task, TaskStatus, Review
 from app.models.user import User
 from pydantic import BaseModel
@@ -22,6 +23,7 @@ class DashboardSummary(BaseModel):
     recent_tasks: List[dict]
 
 @router.get("/dashboard/summary", response_model=DashboardSummary)
+@cached(tags=["tasks", "users"], scope="global")
 def get_dashboard_summary(db: Session = Depends(get_db)):
     """Get dashboard summary statistics"""
     
@@ -109,7 +111,7 @@ def get_user_dashboard(user_id: str, db: Session = Depends(get_db)):
 @router.get("/admin")
 async def get_admin_dashboard(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get admin dashboard statistics"""
     return {
@@ -127,7 +129,7 @@ async def get_admin_dashboard(
 @router.get("/stats")
 async def get_dashboard_stats(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get general dashboard statistics"""
     return {
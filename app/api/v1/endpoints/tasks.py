@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 from app.db.session import get_db
 from app.models.task import Task, TaskStatus
 from app.models.user import User
 from app.core.security import get_current_user
+from app.core.cache import invalidate_tags
+from app.utils.pagination import paginate_keyset, count_rows
+from app.services.task_search import render_highlight, search_task_page
+from app.services.productivity_rollup import mark_task_bucket_stale
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -30,12 +34,29 @@ class UpdateTaskStatusRequest(BaseModel):
 def get_all_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Literal["exact", "estimated", "none"] = "exact",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all tasks with pagination"""
+    """
+    Get all tasks, newest first
+
+    Pass `cursor` (the previous response's next_cursor) for keyset
+    pagination; `skip` is kept for older clients but slows down on deep
+    pages. `count=estimated` reports the planner's row estimate instead of
+    running COUNT(*).
+    """
     try:
-        tasks = db.query(Task).offset(skip).limit(limit).all()
+        query = db.query(Task)
+        
+        if cursor or not skip:
+            tasks, next_cursor = paginate_keyset(query, Task.created_at, Task.id, limit, cursor)
+        else:
+            tasks = query.order_by(Task.created_at.desc(), Task.id.desc()).offset(skip).limit(limit).all()
+            next_cursor = None
+        
+        total, total_estimated = count_rows(db, query, count, table_name=Task.__tablename__)
         
         return {
             "success": True,
@@ -53,10 +74,14 @@ def get_all_tasks(
                 }
                 for task in tasks
             ],
-            "total": len(tasks),
+            "total": total,
+            "total_estimated": total_estimated,
+            "next_cursor": next_cursor,
             "skip": skip,
             "limit": limit
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -83,6 +108,8 @@ def create_task(
         except Exception as e:
             print(f"Failed to add TaskStatus: {e}")
         
+        invalidate_tags("tasks")
+        
         return {
             "success": True,
             "data": {
@@ -138,12 +165,18 @@ def update_task(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    for key, value in request.dict(exclude_unset=True).items():
+    changes = request.dict(exclude_unset=True)
+    if changes.get("assigned_to") is not None and changes["assigned_to"] != task.assigned_to:
+        # The old assignee's productivity bucket no longer includes this task
+        mark_task_bucket_stale(db, task_id)
+    
+    for key, value in changes.items():
         if value is not None:
             setattr(task, key, value)
     
     db.commit()
     db.refresh(task)
+    invalidate_tags("tasks")
     
     return {
         "success": True,
@@ -162,8 +195,10 @@ def delete_task(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    mark_task_bucket_stale(db, task_id)
     db.delete(task)
     db.commit()
+    invalidate_tags("tasks")
     
     return {
         "success": True,
@@ -185,6 +220,7 @@ def update_task_status(
     
     task.status = request.status
     db.commit()
+    invalidate_tags("tasks")
     
     return {
         "success": True,
@@ -198,10 +234,18 @@ def search_tasks(
     search: Optional[str] = None,
     limit: int = Query(50, le=100),
     skip: int = 0,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Literal["exact", "estimated", "none"] = "none",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Search and filter tasks"""
+    """
+    Search and filter tasks
+
+    With `search`, results are full-text matches ranked best-first with
+    highlighted title/description (HTML-escaped, matches in <mark>...</mark>); otherwise newest
+    first. Either way, pass `cursor` (next_cursor) for the next page.
+    """
     query = db.query(Task)
     
     if assigned_to:
@@ -210,13 +254,30 @@ def search_tasks(
     if status:
         query = query.filter(Task.status == status)
     
-    if search:
-        query = query.filter(
-            (Task.title.ilike(f"%{search}%")) |
-            (Task.description.ilike(f"%{search}%"))
-        )
+    highlights = {}
+    try:
+        if search:
+            rows, next_cursor, query = search_task_page(db, query, search, limit, cursor, skip)
+            tasks = [row.Task for row in rows]
+            highlights = {
+                row.Task.id: {
+                    "rank": row.rank,
+                    "highlight": {
+                        "title": render_highlight(row.title_highlight),
+                        "description": render_highlight(row.description_highlight),
+                    },
+                }
+                for row in rows
+            }
+        elif cursor or not skip:
+            tasks, next_cursor = paginate_keyset(query, Task.created_at, Task.id, limit, cursor)
+        else:
+            tasks = query.order_by(Task.created_at.desc(), Task.id.desc()).offset(skip).limit(limit).all()
+            next_cursor = None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    tasks = query.offset(skip).limit(limit).all()
+    total, total_estimated = count_rows(db, query, count)
     
     return {
         "success": True,
@@ -228,11 +289,12 @@ def search_tasks(
                 "assigned_to": task.assigned_to,
                 "created_by": task.created_by if hasattr(task, 'created_by') else None,
                 "due_date": task.due_date.isoformat() if task.due_date else None,
-                "created_at": task.created_at.isoformat() if task.created_at else None
+                "created_at": task.created_at.isoformat() if task.created_at else None,
+                **highlights.get(task.id, {})
             }
             for task in tasks
-        ]
+        ],
+        "total": total,
+        "total_estimated": total_estimated,
+        "next_cursor": next_cursor
     }
-
-
-
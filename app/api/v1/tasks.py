@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.core.security import get_current_user
 from app.models.user import User
 from pydantic import BaseModel
@@ -45,7 +45,7 @@ async def get_all_tasks(
     limit: int = Query(100, ge=1, le=100),
     status: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all tasks
@@ -61,7 +61,7 @@ async def get_all_tasks(
 async def get_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get task by ID"""
     # TODO: Add database query
@@ -72,7 +72,7 @@ async def get_task(
 async def create_task(
     task: TaskCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new task"""
     # Mock response for now
@@ -91,7 +91,7 @@ async def update_task(
     task_id: int,
     task: TaskUpdate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a task"""
     raise HTTPException(status_code=404, detail="Task not found")
@@ -101,7 +101,7 @@ async def update_task(
 async def delete_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a task"""
     raise HTTPException(status_code=404, detail="Task not found")
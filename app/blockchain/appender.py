@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from app.db.session import SessionLocal
+from app.blockchain.audit_chain import BlockchainAudit
+
+logger = logging.getLogger(__name__)
+
+# Most appends written in one transaction
+APPEND_GROUP_SIZE = 200
+
+_STOP = object()
+
+
+class BlockAppender:
+    """
+    Single-writer block appender with group commit
+
+    Requests from any thread are queued to one writer thread per process.
+    It takes whatever has accumulated (up to APPEND_GROUP_SIZE), mines the
+    blocks one after another on top of the head, and commits them in a
+    single transaction. Across processes the chain's advisory lock (see
+    BlockchainAudit._append_block) keeps the chain linear.
+    """
+
+    def __init__(self, chain: BlockchainAudit, group_size: int = APPEND_GROUP_SIZE):
+        self.chain = chain
+        self.group_size = group_size
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, action: str, user_id: int, entity_type: str, entity_id: int, details: Optional[Dict]) -> Future:
+        """Queue an append; the future resolves to the committed block (detached)"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((future, (action, user_id, entity_type, entity_id, details)))
+        return future
+
+    def append(self, action: str, user_id: int, entity_type: str, entity_id: int, details: Optional[Dict]) -> object:
+        """Blocking submit()"""
+        return self.submit(action, user_id, entity_type, entity_id, details).result()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write everything already queued, then stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    if self._thread is not None:
+                        logger.error("Block appender thread had died; restarting it")
+                    self._thread = threading.Thread(target=self._run, name="block-appender", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            stopping = item is _STOP
+            group: List[Tuple[Future, tuple]] = [] if stopping else [item]
+            # Coalesce whatever piled up while the previous group was being written
+            while len(group) < self.group_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    continue
+                group.append(item)
+            if group:
+                try:
+                    self._write_group(group)
+                except Exception as e:
+                    # Never let the writer die: later appends would wait forever
+                    logger.error(f"Block append group failed unexpectedly: {e}")
+                    self._fail(group, e)
+            if stopping and self._queue.empty():
+                return
+
+    def _write_group(self, group: List[Tuple[Future, tuple]]) -> None:
+        db = SessionLocal(expire_on_commit=False)
+        written: List[Tuple[Future, object]] = []
+        try:
+            for future, args in group:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    block = self.chain._append_block(db, *args)
+                except (TypeError, ValueError) as e:
+                    # Bad input (e.g. unserializable details) fails that request only
+                    future.set_exception(e)
+                    continue
+                written.append((future, block))
+            db.commit()
+        except Exception as e:
+            # The whole transaction is gone: fail every request of the group that
+            # hasn't been answered, including the one that raised and those after it
+            logger.error(f"Block append group of {len(group)} failed: {e}")
+            self._fail(group, e)
+            try:
+                db.rollback()
+            except Exception as rollback_error:
+                logger.error(f"Block append rollback failed: {rollback_error}")
+            return
+        finally:
+            try:
+                db.close()
+            except Exception as close_error:
+                logger.error(f"Block append session close failed: {close_error}")
+
+        for future, block in written:
+            future.set_result(block)
+
+    @staticmethod
+    def _fail(group: List[Tuple[Future, tuple]], error: Exception) -> None:
+        for future, _ in group:
+            if not future.done():
+                future.set_exception(error)
@@ -1,23 +1,104 @@
 import hashlib
-import json
+import threading
+from collections import deque
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, func, tuple_
+
+from app.core.config import settings
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.blockchain.merkle import hash_leaf, merkle_root, merkle_proof, verify_proof
+from app.blockchain.sealing import (
+    SEAL_HMAC,
+    SEAL_POW,
+    HmacSealer,
+    ProcessPoolProofOfWorkSealer,
+    ProofOfWorkSealer,
+    check_seals,
+    hash_with_nonce,
+    verify_seal,
+)
+
+GENESIS_HASH = "0" * 64
+
+# pg_advisory_xact_lock key serializing appends across all processes
+APPEND_LOCK_KEY = 0x42_4C_4F_43_4B  # "BLOCK"
+
+# Batch blocks are written by the system, not on behalf of a user
+BATCH_ACTION = "merkle_batch"
+BATCH_ENTITY_TYPE = "audit_batch"
+SYSTEM_USER_ID = 0
+
+UNSUPPORTED_SWITCH = "Switching from hmac back to pow sealing is not supported"
+
+# Blocks read (and handed to a pool worker) per verification chunk
+VERIFY_CHUNK_SIZE = 1000
+
+
+def hmac_seal_key() -> bytes:
+    """Key for HMAC-sealed blocks (BLOCKCHAIN_HMAC_KEY, else derived from SECRET_KEY)"""
+    if settings.BLOCKCHAIN_HMAC_KEY:
+        return settings.BLOCKCHAIN_HMAC_KEY.encode()
+    return hashlib.sha256(f"blockchain-seal:{settings.SECRET_KEY}".encode()).digest()
+
+
+def create_sealer(method: Optional[str] = None):
+    """Sealer for BLOCKCHAIN_SEAL_METHOD: pow, pow_pool or hmac"""
+    method = method or settings.BLOCKCHAIN_SEAL_METHOD
+    if method == SEAL_POW:
+        return ProofOfWorkSealer(settings.BLOCKCHAIN_POW_DIFFICULTY)
+    if method == f"{SEAL_POW}_pool":
+        return ProcessPoolProofOfWorkSealer(settings.BLOCKCHAIN_POW_DIFFICULTY, settings.BLOCKCHAIN_POW_WORKERS or None)
+    if method == SEAL_HMAC:
+        return HmacSealer(hmac_seal_key())
+    raise ValueError(f"Unknown block seal method: {method}")
+
 
 class BlockchainAudit:
-    def __init__(self):
-        self.difficulty = 2
+    def __init__(self, sealer=None):
+        self.difficulty = settings.BLOCKCHAIN_POW_DIFFICULTY
+        self.legacy_difficulty = settings.BLOCKCHAIN_LEGACY_POW_DIFFICULTY
+        self.sealer = sealer or create_sealer()
+        self.hmac_key = hmac_seal_key()
+        # Set by the batch sealer (app/blockchain/batching.py) to be woken early
+        self.on_batch_full: Optional[Callable[[], None]] = None
+        self._unsealed = 0
+        self._unsealed_lock = threading.Lock()
     
     def add_block(self, db, action: str, user_id: int, entity_type: str, entity_id: int, details: Optional[Dict]) -> object:
         """Add a new block to the blockchain"""
+        new_block = self._append_block(db, action, user_id, entity_type, entity_id, details)
+        db.commit()
+        db.refresh(new_block)
+        
+        return new_block
+    
+    def _append_block(
+        self, db, action: str, user_id: int, entity_type: str, entity_id: int,
+        details: Optional[Dict], merkle_root: Optional[str] = None
+    ) -> object:
+        """
+        Mine a block on top of the current head and add it to the session (no commit)
+        
+        On PostgreSQL the head is read under a transaction-scoped advisory
+        lock, so concurrent appenders (any worker process) queue up behind
+        the open transaction instead of forking the chain off the same parent.
+        """
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
+        self._lock_chain(db)
+        
         # Get previous hash
         last_block = db.query(BlockModel).order_by(BlockModel.id.desc()).first()
-        previous_hash = last_block.block_hash if last_block else "0" * 64
+        previous_hash = last_block.block_hash if last_block else GENESIS_HASH
+        if last_block is not None and last_block.seal_method == SEAL_HMAC and self.sealer.method != SEAL_HMAC:
+            # Verification treats PoW after HMAC as a relabelled block
+            raise RuntimeError(f"{UNSUPPORTED_SWITCH}; keep BLOCKCHAIN_SEAL_METHOD=hmac")
         
         # Create new block
         timestamp = datetime.utcnow()
-        nonce = 0
         block_data = {
             "previous_hash": previous_hash,
             "timestamp": timestamp.isoformat(),
@@ -27,17 +108,17 @@ class BlockchainAudit:
             "entity_id": entity_id,
             "details": details or {}
         }
+        if merkle_root is not None:
+            block_data["merkle_root"] = merkle_root
+        # Hashed in, so the block can't be relabelled to a weaker method (or easier difficulty) later
+        block_data["seal_method"] = self.sealer.method
+        difficulty = getattr(self.sealer, "difficulty", None)
+        if difficulty is not None:
+            block_data["difficulty"] = difficulty
         
-        # Mine block
-        block_hash = self._calculate_hash(block_data, nonce)
-        while not block_hash.startswith("0" * self.difficulty):
-            nonce += 1
-            block_hash = self._calculate_hash(block_data, nonce)
+        # Mine (or sign) block
+        nonce, block_hash, proof = self.sealer.seal(block_data)
         
-        # Generate proof
-        proof = self._generate_proof(block_hash, previous_hash)
-        
-        # Save to database
         new_block = BlockModel(
             block_hash=block_hash,
             previous_hash=previous_hash,
@@ -48,122 +129,461 @@ class BlockchainAudit:
             entity_id=entity_id,
             details=details,
             proof=proof,
-            nonce=nonce
+            nonce=nonce,
+            merkle_root=merkle_root,
+            seal_method=self.sealer.method,
+            pow_difficulty=difficulty
         )
-        
         db.add(new_block)
-        db.commit()
-        db.refresh(new_block)
+        db.flush()
         
         return new_block
     
-    def verify_block(self, db, block_hash: str) -> bool:
-        """Verify a single block"""
+    def seal_switch_unsupported(self, db) -> bool:
+        """Whether the head is HMAC-sealed but this instance would seal with PoW (see UNSUPPORTED_SWITCH)"""
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        block = db.query(BlockModel).filter(BlockModel.block_hash == block_hash).first()
-        if not block:
-            return False
+        head_method = db.query(BlockModel.seal_method).order_by(BlockModel.id.desc()).limit(1).scalar()
+        return head_method == SEAL_HMAC and self.sealer.method != SEAL_HMAC
+    
+    def _lock_chain(self, db) -> None:
+        """Hold the chain's append lock until the current transaction ends (re-entrant)"""
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(select(func.pg_advisory_xact_lock(APPEND_LOCK_KEY)))
+    
+    def add_entry(self, db, action: str, user_id: int, entity_type: str, entity_id: int, details: Optional[Dict]) -> object:
+        """
+        Record an audit entry for the next Merkle batch block
         
-        block_data = {
-            "previous_hash": block.previous_hash,
-            "timestamp": block.timestamp.isoformat(),
-            "action": block.action,
-            "user_id": block.user_id,
-            "entity_type": block.entity_type,
-            "entity_id": block.entity_id,
-            "details": block.details or {}
+        The entry is durable immediately. Sealing is left to the batch
+        sealer, which runs every BLOCKCHAIN_BATCH_WINDOW_SECONDS and is
+        signalled early once this process has added
+        BLOCKCHAIN_BATCH_MAX_ENTRIES entries since its last wake-up; no
+        count or seal runs here.
+        """
+        from app.db.models.blockchain_entry import BlockchainEntry
+        
+        timestamp = datetime.utcnow()
+        entry = BlockchainEntry(
+            timestamp=timestamp,
+            action=action,
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            details=details,
+            leaf_hash=hash_leaf(self._entry_data(timestamp, action, user_id, entity_type, entity_id, details))
+        )
+        db.add(entry)
+        db.commit()
+        db.refresh(entry)
+        
+        # Request threads share this instance, so count under a lock
+        with self._unsealed_lock:
+            self._unsealed += 1
+            batch_full = self._unsealed >= settings.BLOCKCHAIN_BATCH_MAX_ENTRIES
+            if batch_full:
+                self._unsealed = 0
+        if batch_full and self.on_batch_full is not None:
+            self.on_batch_full()
+        
+        return entry
+    
+    def pending_entry_count(self, db) -> int:
+        from app.db.models.blockchain_entry import BlockchainEntry
+        
+        return db.query(func.count(BlockchainEntry.id)).filter(BlockchainEntry.block_id.is_(None)).scalar()
+    
+    def seal_pending_entries(self, db, max_entries: Optional[int] = None) -> Optional[object]:
+        """
+        Seal the oldest unsealed entries into one block committing to their Merkle root
+        
+        Entries already being sealed by another process are skipped
+        (FOR UPDATE SKIP LOCKED), so concurrent sealers never double-seal.
+        Returns the new block, or None when nothing was pending.
+        """
+        from app.db.models.blockchain_entry import BlockchainEntry
+        
+        entries = db.execute(
+            select(BlockchainEntry)
+            .where(BlockchainEntry.block_id.is_(None))
+            .order_by(BlockchainEntry.id)
+            .limit(max_entries or settings.BLOCKCHAIN_BATCH_MAX_ENTRIES)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not entries:
+            db.rollback()
+            return None
+        
+        root = merkle_root([entry.leaf_hash for entry in entries])
+        block = self._append_block(
+            db, BATCH_ACTION, SYSTEM_USER_ID, BATCH_ENTITY_TYPE, len(entries),
+            {"first_entry_id": entries[0].id, "last_entry_id": entries[-1].id},
+            merkle_root=root
+        )
+        for leaf_index, entry in enumerate(entries):
+            entry.block_id = block.id
+            entry.leaf_index = leaf_index
+        db.commit()
+        
+        return block
+    
+    def get_entry_proof(self, db, entry_id: int) -> Optional[Dict]:
+        """
+        Merkle inclusion proof for one entry, checked end to end
+        
+        `verified` is True only if the entry's content still hashes to its
+        leaf, the proof leads to the block's merkle_root, and the block's
+        own hash is intact.
+        """
+        from app.db.models.blockchain_entry import BlockchainEntry
+        from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
+        
+        entry = db.get(BlockchainEntry, entry_id)
+        if entry is None:
+            return None
+        
+        result = {
+            "entry_id": entry.id,
+            "status": "pending" if entry.block_id is None else "sealed",
+            "leaf_hash": entry.leaf_hash,
+            "entry": {
+                "timestamp": entry.timestamp.isoformat(),
+                "action": entry.action,
+                "user_id": entry.user_id,
+                "entity_type": entry.entity_type,
+                "entity_id": entry.entity_id,
+                "details": entry.details
+            }
         }
+        if entry.block_id is None:
+            return result
+        
+        block = db.get(BlockModel, entry.block_id)
+        leaves = db.scalars(
+            select(BlockchainEntry.leaf_hash)
+            .where(BlockchainEntry.block_id == block.id)
+            .order_by(BlockchainEntry.leaf_index)
+        ).all()
+        proof = merkle_proof(leaves, entry.leaf_index)
+        
+        content_hash = hash_leaf(self._entry_data(
+            entry.timestamp, entry.action, entry.user_id, entry.entity_type, entry.entity_id, entry.details
+        ))
+        verified = (
+            content_hash == entry.leaf_hash
+            and verify_proof(entry.leaf_hash, proof, block.merkle_root)
+            and self._verify_seal(block)
+            and not self._is_downgraded(block, self._first_hmac_block_id(db))
+        )
         
-        calculated_hash = self._calculate_hash(block_data, block.nonce)
-        return calculated_hash == block.block_hash
+        result.update({
+            "block_id": block.id,
+            "block_hash": block.block_hash,
+            "merkle_root": block.merkle_root,
+            "leaf_index": entry.leaf_index,
+            "proof": proof,
+            "verified": verified
+        })
+        return result
     
-    def verify_chain(self, db) -> Dict:
-        """Verify entire blockchain"""
+    def verify_block(self, db, block_hash: str) -> bool:
+        """Verify a single block"""
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        blocks = db.query(BlockModel).order_by(BlockModel.id).all()
+        block = db.query(BlockModel).filter(BlockModel.block_hash == block_hash).first()
+        if not block:
+            return False
         
-        if not blocks:
-            return {"is_valid": True, "total_blocks": 0, "compromised_blocks": []}
+        return self._verify_seal(block) and not self._is_downgraded(block, self._first_hmac_block_id(db))
+    
+    def verify_chain(self, db, full: bool = False) -> Dict:
+        """
+        Verify the blockchain
         
+        By default only blocks added since the latest checkpoint are
+        rehashed, continuing the link and rolling digest from it. `full`
+        rehashes every block and also checks the rolling digest against the
+        checkpoint, which catches a rewritten (re-mined) prefix. A clean pass
+        records a new checkpoint. See iter_verify_chain for large chains.
+        """
         compromised = []
-        for i, block in enumerate(blocks):
-            if not self.verify_block(db, block.block_hash):
-                compromised.append(block.block_hash)
-            
-            if i > 0 and block.previous_hash != blocks[i-1].block_hash:
-                compromised.append(block.block_hash)
+        for event in self.iter_verify_chain(db, full):
+            if event["event"] == "compromised":
+                compromised.append(event["block_hash"])
+            elif event["event"] == "result":
+                result = event
         
         return {
-            "is_valid": len(compromised) == 0,
-            "total_blocks": len(blocks),
-            "compromised_blocks": compromised
+            "is_valid": result["is_valid"],
+            "total_blocks": result["total_blocks"],
+            "compromised_blocks": compromised,
+            "mode": result["mode"],
+            "verified_blocks": result["verified_blocks"],
+            "last_verified_block_id": result["last_verified_block_id"],
+            "checkpoint_valid": result["checkpoint_valid"]
         }
     
-    def get_audit_trail(self, db, entity_type: str, entity_id: int) -> List[Dict]:
-        """Get audit trail for entity"""
+    def iter_verify_chain(
+        self,
+        db,
+        full: bool = False,
+        pool: Optional[Executor] = None,
+        in_flight: int = 1,
+        chunk_size: int = VERIFY_CHUNK_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Verify the blockchain as a stream of events
+        
+        Blocks are read in id-ordered chunks; with a `pool`, up to
+        `in_flight` chunks are rehashed by its workers while the next ones
+        are read. Linkage, the rolling digest and the seal-method order (no
+        PoW block after the first HMAC one) are checked here, in order, so
+        they carry across chunk boundaries. Events (dicts keyed "event"):
+        start, compromised (one per bad block), progress (one per chunk) and
+        a final result.
+        """
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
+        from app.db.models.blockchain_checkpoint import BlockchainCheckpoint
+        
+        checkpoint = db.query(BlockchainCheckpoint).order_by(BlockchainCheckpoint.id.desc()).first()
+        
+        start_after, expected_previous, digest, block_count = 0, GENESIS_HASH, GENESIS_HASH, 0
+        if checkpoint and not full:
+            anchor = db.get(BlockModel, checkpoint.last_block_id)
+            if (
+                anchor is None
+                or anchor.block_hash != checkpoint.last_block_hash
+                or not self._verify_seal(anchor)
+            ):
+                # The verified prefix itself changed; only a full pass can tell where
+                yield from self.iter_verify_chain(db, True, pool, in_flight, chunk_size)
+                return
+            start_after = checkpoint.last_block_id
+            expected_previous = checkpoint.last_block_hash
+            digest = checkpoint.digest
+            block_count = checkpoint.block_count
+        
+        mode = "full" if full else "incremental"
+        yield {"event": "start", "mode": mode, "after_block_id": start_after}
+        
+        columns = (
+            BlockModel.id, BlockModel.block_hash, BlockModel.previous_hash, BlockModel.timestamp,
+            BlockModel.action, BlockModel.user_id, BlockModel.entity_type, BlockModel.entity_id,
+            BlockModel.details, BlockModel.nonce, BlockModel.merkle_root,
+            BlockModel.proof, BlockModel.seal_method, BlockModel.pow_difficulty
+        )
+        
+        def read_chunks():
+            last_id = start_after
+            while True:
+                rows = db.execute(
+                    select(*columns).where(BlockModel.id > last_id)
+                    .order_by(BlockModel.id).limit(chunk_size)
+                ).all()
+                if not rows:
+                    return
+                yield rows
+                last_id = rows[-1].id
+        
+        def submit(rows):
+            seals = [
+                (self._block_data(block), block.nonce, block.block_hash, block.proof, block.seal_method)
+                for block in rows
+            ]
+            if pool is None:
+                return rows, check_seals(seals, self.hmac_key, self.legacy_difficulty)
+            return rows, pool.submit(check_seals, seals, self.hmac_key, self.legacy_difficulty)
         
-        blocks = db.query(BlockModel).filter(
-            BlockModel.entity_type == entity_type,
-            BlockModel.entity_id == entity_id
-        ).order_by(BlockModel.timestamp.desc()).all()
+        # Once HMAC sealing is switched on, every later block must be HMAC-sealed
+        first_hmac_id = self._first_hmac_block_id(db)
         
-        return [self._block_to_dict(block) for block in blocks]
+        compromised = 0
+        verified = 0
+        last_block_id = start_after
+        checkpoint_valid = None if (checkpoint is None or not full) else False
+        
+        def finish(rows, bad_seals):
+            nonlocal expected_previous, digest, block_count, compromised, verified, last_block_id, checkpoint_valid
+            if pool is not None:
+                bad_seals = bad_seals.result()
+            bad_seals = set(bad_seals)
+            bad_seals.update(i for i, block in enumerate(rows) if self._is_downgraded(block, first_hmac_id))
+            for i, block in enumerate(rows):
+                if i in bad_seals or block.previous_hash != expected_previous:
+                    compromised += 1
+                    yield {
+                        "event": "compromised",
+                        "block_id": block.id,
+                        "block_hash": block.block_hash,
+                        "reason": "seal" if i in bad_seals else "link"
+                    }
+                
+                expected_previous = block.block_hash
+                digest = self._roll_digest(digest, block.block_hash)
+                block_count += 1
+                verified += 1
+                last_block_id = block.id
+                
+                if checkpoint_valid is False and block.id == checkpoint.last_block_id:
+                    checkpoint_valid = digest == checkpoint.digest and block_count == checkpoint.block_count
+            yield {"event": "progress", "verified_blocks": verified, "last_block_id": last_block_id}
+        
+        pending = deque()
+        for rows in read_chunks():
+            pending.append(submit(rows))
+            if len(pending) >= max(in_flight, 1):
+                yield from finish(*pending.popleft())
+        while pending:
+            yield from finish(*pending.popleft())
+        
+        is_valid = not compromised and checkpoint_valid is not False
+        if is_valid and verified:
+            db.add(BlockchainCheckpoint(
+                last_block_id=last_block_id,
+                last_block_hash=expected_previous,
+                digest=digest,
+                block_count=block_count
+            ))
+            db.commit()
+        
+        yield {
+            "event": "result",
+            "is_valid": is_valid,
+            "total_blocks": block_count,
+            "compromised_count": compromised,
+            "mode": mode,
+            "verified_blocks": verified,
+            "last_verified_block_id": last_block_id if is_valid else (checkpoint.last_block_id if checkpoint else None),
+            "checkpoint_valid": checkpoint_valid
+        }
     
-    def get_user_actions(self, db, user_id: int, limit: int) -> List[Dict]:
-        """Get user action history"""
+    def get_audit_trail(
+        self, db, entity_type: str, entity_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Get audit trail for entity, newest first; returns (blocks, next_cursor)"""
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        blocks = db.query(BlockModel).filter(
-            BlockModel.user_id == user_id
-        ).order_by(BlockModel.timestamp.desc()).limit(limit).all()
+        return self._list_blocks(
+            db, (BlockModel.entity_type == entity_type, BlockModel.entity_id == entity_id), limit, cursor
+        )
+    
+    def get_user_actions(
+        self, db, user_id: int, limit: Optional[int], cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Get user action history, newest first; returns (blocks, next_cursor)"""
+        from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        return [self._block_to_dict(block) for block in blocks]
+        return self._list_blocks(db, (BlockModel.user_id == user_id,), limit, cursor)
+    
+    def get_recent_logs(self, db, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Get recent audit logs; returns (blocks, next_cursor)"""
+        return self._list_blocks(db, (), limit, cursor)
     
-    def get_recent_logs(self, db, limit: int) -> List[Dict]:
-        """Get recent audit logs"""
+    def _list_blocks(self, db, criteria, limit: Optional[int], cursor: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Keyset page of blocks on (timestamp DESC, id DESC)
+        
+        Selects only the listed columns and builds dicts straight from the
+        rows (no ORM instances). Each page is a range scan on one of the
+        (..., timestamp, id) indexes; raises ValueError on a bad cursor.
+        """
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        blocks = db.query(BlockModel).order_by(BlockModel.timestamp.desc()).limit(limit).all()
-        return [self._block_to_dict(block) for block in blocks]
+        query = select(
+            BlockModel.id, BlockModel.block_hash, BlockModel.previous_hash, BlockModel.timestamp,
+            BlockModel.action, BlockModel.user_id, BlockModel.entity_type, BlockModel.entity_id,
+            BlockModel.details, BlockModel.proof, BlockModel.merkle_root
+        ).where(*criteria)
+        if cursor:
+            query = query.where(tuple_(BlockModel.timestamp, BlockModel.id) < tuple_(*decode_cursor(cursor)))
+        query = query.order_by(BlockModel.timestamp.desc(), BlockModel.id.desc())
+        if limit is not None:
+            query = query.limit(limit + 1)
+        
+        rows = db.execute(query).all()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        
+        blocks = []
+        for row in rows:
+            block = row._asdict()
+            block["timestamp"] = block["timestamp"].isoformat()
+            blocks.append(block)
+        return blocks, next_cursor
     
     def get_chain_statistics(self, db) -> Dict:
         """Get blockchain statistics"""
         from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
         
-        total_blocks = db.query(BlockModel).count()
+        # Incremental: only blocks since the last checkpoint are rehashed
         verification_result = self.verify_chain(db)
+        last_block_time = db.query(func.max(BlockModel.timestamp)).scalar()
         
         return {
-            "total_blocks": total_blocks,
+            "total_blocks": verification_result["total_blocks"],
             "chain_valid": verification_result["is_valid"],
             "difficulty": self.difficulty,
-            "last_block_time": db.query(BlockModel).order_by(BlockModel.timestamp.desc()).first().timestamp.isoformat() if total_blocks > 0 else None
+            "seal_method": self.sealer.method,
+            "last_block_time": last_block_time.isoformat() if last_block_time else None,
+            "last_verified_block_id": verification_result["last_verified_block_id"]
         }
     
-    def _calculate_hash(self, block_data: Dict, nonce: int) -> str:
-        """Calculate block hash"""
-        block_string = json.dumps({**block_data, "nonce": nonce}, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
-    
-    def _generate_proof(self, block_hash: str, previous_hash: str) -> str:
-        """Generate cryptographic proof"""
-        proof_string = f"{block_hash}:{previous_hash}"
-        return hashlib.sha256(proof_string.encode()).hexdigest()
-    
-    def _block_to_dict(self, block) -> Dict:
-        """Convert block model to dictionary"""
-        return {
-            "id": block.id,
-            "block_hash": block.block_hash,
+    def _block_data(self, block) -> Dict:
+        """Hashed content of a stored block (model instance or row)"""
+        block_data = {
             "previous_hash": block.previous_hash,
             "timestamp": block.timestamp.isoformat(),
             "action": block.action,
             "user_id": block.user_id,
             "entity_type": block.entity_type,
             "entity_id": block.entity_id,
-            "details": block.details,
-            "proof": block.proof
+            "details": block.details or {}
         }
+        if block.merkle_root is not None:
+            block_data["merkle_root"] = block.merkle_root
+        if block.seal_method is not None:
+            block_data["seal_method"] = block.seal_method
+        if block.pow_difficulty is not None:
+            block_data["difficulty"] = block.pow_difficulty
+        return block_data
+    
+    def _hash_block(self, block) -> str:
+        """Recompute a stored block's hash"""
+        return hash_with_nonce(self._block_data(block), block.nonce)
+    
+    def _verify_seal(self, block) -> bool:
+        """Hash and proof check for whichever strategy sealed the block"""
+        return verify_seal(
+            self._block_data(block), block.nonce, block.block_hash, block.proof,
+            block.seal_method, self.hmac_key, self.legacy_difficulty
+        )
+    
+    def _first_hmac_block_id(self, db) -> Optional[int]:
+        from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
+        
+        return db.query(func.min(BlockModel.id)).filter(BlockModel.seal_method == SEAL_HMAC).scalar()
+    
+    def _is_downgraded(self, block, first_hmac_id: Optional[int]) -> bool:
+        """A PoW (or legacy) block after the chain switched to HMAC: a relabelled HMAC block"""
+        return (
+            first_hmac_id is not None
+            and block.id > first_hmac_id
+            and (block.seal_method or SEAL_POW) == SEAL_POW
+        )
+    
+    def _entry_data(self, timestamp: datetime, action: str, user_id: int, entity_type: str, entity_id: int, details: Optional[Dict]) -> Dict:
+        """Canonical content of a batched entry (what its leaf hash commits to)"""
+        return {
+            "timestamp": timestamp.isoformat(),
+            "action": action,
+            "user_id": user_id,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details or {}
+        }
+    
+    def _roll_digest(self, digest: str, block_hash: str) -> str:
+        """Extend a checkpoint's rolling digest by one block"""
+        return hashlib.sha256(f"{digest}{block_hash}".encode()).hexdigest()
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import invalidate_tags
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.blockchain.audit_chain import BlockchainAudit
+
+logger = logging.getLogger(__name__)
+
+
+def seal_pending_batches(chain: BlockchainAudit) -> int:
+    """Seal every pending entry (in blocks of up to BLOCKCHAIN_BATCH_MAX_ENTRIES); returns blocks sealed"""
+    db = SessionLocal()
+    sealed = 0
+    try:
+        while chain.seal_pending_entries(db) is not None:
+            sealed += 1
+        return sealed
+    finally:
+        db.close()
+        if sealed:
+            # New blocks change chain listings and stats, and pending entries' proofs
+            invalidate_tags("blockchain")
+
+
+async def run_batch_sealer(chain: BlockchainAudit) -> None:
+    """
+    Seal pending entries every BLOCKCHAIN_BATCH_WINDOW_SECONDS (runs for the app's lifetime)
+
+    chain.add_entry() wakes it early once a full batch has been added, so
+    sealing always happens here, in the threadpool, never inline on the
+    request that happened to fill the batch.
+    """
+    loop = asyncio.get_running_loop()
+    batch_full = asyncio.Event()
+    # add_entry may run on any thread
+    chain.on_batch_full = lambda: loop.call_soon_threadsafe(batch_full.set)
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(batch_full.wait(), settings.BLOCKCHAIN_BATCH_WINDOW_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            batch_full.clear()
+            try:
+                sealed = await run_in_threadpool(seal_pending_batches, chain)
+                if sealed:
+                    logger.debug(f"Sealed {sealed} audit batch block(s)")
+            except Exception as e:
+                logger.error(f"Audit batch sealing failed: {e}")
+    finally:
+        chain.on_batch_full = None
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from typing import Dict, List
+
+# Domain separation (RFC 6962): a leaf can never be passed off as an inner node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def hash_leaf(entry_data: Dict) -> str:
+    """Hash one audit entry (canonical JSON)"""
+    payload = json.dumps(entry_data, sort_keys=True).encode()
+    return hashlib.sha256(LEAF_PREFIX + payload).hexdigest()
+
+
+def _hash_node(left: str, right: str) -> str:
+    return hashlib.sha256(NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """
+    Root over leaf hashes in order
+
+    An odd node at the end of a level is carried up unchanged rather than
+    paired with itself, so no two leaf lists share a root.
+    """
+    if not leaves:
+        raise ValueError("Merkle tree needs at least one leaf")
+    level = leaves
+    while len(level) > 1:
+        next_level = [_hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[Dict[str, str]]:
+    """
+    Inclusion proof for leaves[index]: sibling hashes from the leaf up
+
+    Each step is {"hash": sibling, "position": "left" | "right"}.
+    """
+    if not 0 <= index < len(leaves):
+        raise IndexError("Leaf index out of range")
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"hash": level[sibling], "position": "left" if sibling < index else "right"})
+        next_level = [_hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: str, proof: List[Dict[str, str]], root: str) -> bool:
+    """Recompute the root from a leaf and its inclusion proof"""
+    current = leaf
+    for step in proof:
+        if step["position"] == "left":
+            current = _hash_node(step["hash"], current)
+        else:
+            current = _hash_node(current, step["hash"])
+    return current == root
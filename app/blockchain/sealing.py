@@ -0,0 +1,181 @@
+"""
+Block sealing strategies: each turns block data into (nonce, block_hash, proof)
+
+All hash the same canonical JSON as the original
+json.dumps({..., "nonce": n}, sort_keys=True), so existing blocks verify
+unchanged. Blocks written with a seal_method carry it (and PoW blocks
+their difficulty) in the hashed data, so relabelling a block's method or
+difficulty breaks its hash. Kept free of app imports: pool workers import
+this module.
+"""
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+SEAL_POW = "pow"
+SEAL_HMAC = "hmac"
+
+# Nonces each pool task tries before reporting back
+POOL_CHUNK = 20000
+
+
+def canonical_parts(block_data: Dict) -> Tuple[bytes, bytes]:
+    """
+    Split the canonical block JSON around the nonce value
+
+    prefix + str(nonce) + suffix == json.dumps({**block_data, "nonce": nonce}, sort_keys=True)
+    """
+    keys = sorted(block_data)
+    before = [key for key in keys if key < "nonce"]
+    after = [key for key in keys if key > "nonce"]
+
+    def members(names):
+        return ", ".join(f"{json.dumps(name)}: {json.dumps(block_data[name], sort_keys=True)}" for name in names)
+
+    prefix = "{" + (members(before) + ", " if before else "") + '"nonce": '
+    suffix = (", " + members(after) if after else "") + "}"
+    return prefix.encode(), suffix.encode()
+
+
+def hash_with_nonce(block_data: Dict, nonce: int) -> str:
+    prefix, suffix = canonical_parts(block_data)
+    return hashlib.sha256(prefix + b"%d" % nonce + suffix).hexdigest()
+
+
+def chain_proof(block_hash: str, previous_hash: str) -> str:
+    """Proof stored with PoW blocks (links the hash to its parent)"""
+    return hashlib.sha256(f"{block_hash}:{previous_hash}".encode()).hexdigest()
+
+
+def search_nonce(prefix: bytes, suffix: bytes, target: str, start: int, stop: int) -> Optional[Tuple[int, str]]:
+    """First nonce in [start, stop) whose hash starts with `target`, using a prefix midstate"""
+    base = hashlib.sha256(prefix)
+    for nonce in range(start, stop):
+        attempt = base.copy()
+        attempt.update(b"%d" % nonce + suffix)
+        digest = attempt.hexdigest()
+        if digest.startswith(target):
+            return nonce, digest
+    return None
+
+
+class ProofOfWorkSealer:
+    """
+    Nonce search for a hash with `difficulty` leading zeros
+
+    The canonical JSON is split around the nonce once; each attempt copies
+    a sha256 midstate of the prefix instead of re-serializing the block.
+    """
+    method = SEAL_POW
+
+    def __init__(self, difficulty: int):
+        self.difficulty = difficulty
+
+    def seal(self, block_data: Dict) -> Tuple[int, str, str]:
+        prefix, suffix = canonical_parts(block_data)
+        target = "0" * self.difficulty
+        start = 0
+        while True:
+            found = search_nonce(prefix, suffix, target, start, start + POOL_CHUNK)
+            if found:
+                nonce, block_hash = found
+                return nonce, block_hash, chain_proof(block_hash, block_data["previous_hash"])
+            start += POOL_CHUNK
+
+
+class ProcessPoolProofOfWorkSealer(ProofOfWorkSealer):
+    """
+    PoW with the nonce space split across processes
+
+    Worthwhile only at difficulties where one search takes well over the
+    pool round-trip (~1 ms); the pool is created on first use with the
+    spawn start method (safe from threaded web workers).
+    """
+
+    def __init__(self, difficulty: int, workers: Optional[int] = None):
+        super().__init__(difficulty)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    def seal(self, block_data: Dict) -> Tuple[int, str, str]:
+        prefix, suffix = canonical_parts(block_data)
+        target = "0" * self.difficulty
+        pool = self._get_pool()
+        start = 0
+        while True:
+            tasks = [
+                pool.submit(search_nonce, prefix, suffix, target,
+                            start + i * POOL_CHUNK, start + (i + 1) * POOL_CHUNK)
+                for i in range(self.workers)
+            ]
+            # Lowest nonce wins so the result doesn't depend on scheduling
+            found = [result for result in (task.result() for task in tasks) if result]
+            if found:
+                nonce, block_hash = min(found)
+                return nonce, block_hash, chain_proof(block_hash, block_data["previous_hash"])
+            start += self.workers * POOL_CHUNK
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+class HmacSealer:
+    """No work: the proof is an HMAC of the block hash under a server-side key"""
+    method = SEAL_HMAC
+
+    def __init__(self, key: bytes):
+        self.key = key
+
+    def seal(self, block_data: Dict) -> Tuple[int, str, str]:
+        block_hash = hash_with_nonce(block_data, 0)
+        return 0, block_hash, self.sign(block_hash, block_data["previous_hash"])
+
+    def sign(self, block_hash: str, previous_hash: str) -> str:
+        return hmac.new(self.key, f"{block_hash}:{previous_hash}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify_seal(block_data: Dict, nonce: int, block_hash: str, proof: str,
+                seal_method: Optional[str], hmac_key: Optional[bytes], legacy_difficulty: int) -> bool:
+    """
+    Check a stored block against whichever strategy sealed it (None = legacy PoW)
+
+    PoW blocks must actually meet the difficulty they were mined at
+    (block_data["difficulty"], or `legacy_difficulty` for blocks that
+    predate recording it); otherwise any hash would do.
+    """
+    if hash_with_nonce(block_data, nonce) != block_hash:
+        return False
+    if (seal_method or SEAL_POW) == SEAL_POW:
+        return block_hash.startswith("0" * block_data.get("difficulty", legacy_difficulty))
+    if seal_method == SEAL_HMAC:
+        if hmac_key is None:
+            return False
+        expected = HmacSealer(hmac_key).sign(block_hash, block_data["previous_hash"])
+        return hmac.compare_digest(expected, proof)
+    return False
+
+
+def check_seals(blocks: List[Tuple], hmac_key: Optional[bytes], legacy_difficulty: int) -> List[int]:
+    """
+    Indexes of blocks whose seal fails verification
+
+    blocks: (block_data, nonce, block_hash, proof, seal_method) tuples. Run in
+    pool workers by chunked chain verification.
+    """
+    return [i for i, block in enumerate(blocks) if not verify_seal(*block, hmac_key, legacy_difficulty)]
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool safe to start from threaded web workers"""
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
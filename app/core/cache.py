@@ -0,0 +1,294 @@
+"""
+Response Cache for SmartWork 360
+
+Pluggable cache for read-heavy endpoints with tag-based invalidation:
+- RedisCache: shared across workers (default whenever REDIS_URL is set)
+- InMemoryCache: per-process TTL + LRU (default without REDIS_URL). Each
+  gunicorn worker keeps its own copy and invalidate_tags() only clears the
+  calling worker's, so other workers serve stale entries until their TTL
+  runs out; keep TTLs short if you run it with several workers.
+
+Usage:
+    @router.get("/organization")
+    @cached(ttl=60, tags=["tasks", "users"], scope="role")
+    async def get_organization_metrics(...):
+        ...
+
+    invalidate_tags("tasks")  # after task writes (await ainvalidate_tags() in async code)
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Endpoint arguments that never contribute to the cache key
+_IGNORED_KWARGS = {"db", "current_user", "background_tasks", "request"}
+
+
+class CacheBackend:
+    """Interface every cache backend implements"""
+
+    # Calls do network I/O: async callers must run them off the event loop
+    blocking = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Thread-safe TTL + LRU cache local to one worker process
+
+    Invalidation only reaches the current worker; use RedisCache when
+    running several gunicorn workers and stale reads matter.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        """Drop a key and its tag memberships (caller holds the lock)"""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis-backed cache shared by all workers
+
+    Values are stored as JSON with a TTL; each tag is a Redis set of keys
+    so invalidation deletes every member in one round-trip. The client is
+    synchronous, with CACHE_REDIS_TIMEOUT_SECONDS socket timeouts so an
+    unreachable Redis fails fast instead of stalling requests.
+    """
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "smartwork:cache:"):
+        import redis  # Optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        )
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        full_key = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.set(full_key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), full_key)
+            pipe.expire(self._tag_key(tag), max(ttl, settings.CACHE_DEFAULT_TTL_SECONDS))
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self.client.smembers(tag_key)
+            if keys:
+                removed += self.client.delete(*keys)
+            self.client.delete(tag_key)
+        return removed
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+_cache: Optional[CacheBackend] = None
+
+
+def get_cache() -> CacheBackend:
+    """Return the process-wide cache backend configured by CACHE_BACKEND (auto = redis if REDIS_URL is set)"""
+    global _cache
+    if _cache is None:
+        backend = settings.CACHE_BACKEND
+        if backend == "auto":
+            backend = "redis" if settings.REDIS_URL else "memory"
+        if backend == "redis" and settings.REDIS_URL:
+            try:
+                _cache = RedisCache(settings.REDIS_URL)
+                logger.info("✅ Response cache: Redis")
+            except ImportError:
+                logger.warning("⚠️  redis package not installed, falling back to in-memory cache")
+        if _cache is None:
+            _cache = InMemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+            logger.info("✅ Response cache: in-memory (per worker process)")
+    return _cache
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Invalidate all cached responses carrying any of `tags`; never raises"""
+    try:
+        removed = get_cache().invalidate_tags(tags)
+        logger.debug(f"Cache invalidated {removed} entries for tags {tags}")
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for tags {tags}: {e}")
+
+
+async def ainvalidate_tags(*tags: str) -> None:
+    """invalidate_tags() for async code: a blocking backend is called from the threadpool"""
+    if get_cache().blocking:
+        await run_in_threadpool(invalidate_tags, *tags)
+    else:
+        invalidate_tags(*tags)
+
+
+def _scope_key(scope: str, current_user) -> str:
+    if scope == "global" or current_user is None:
+        return "global"
+    if scope == "role":
+        role = getattr(current_user, "role", None)
+        return f"role:{getattr(role, 'value', role)}"
+    return f"user:{current_user.id}"
+
+
+def build_cache_key(func: Callable, scope: str, kwargs: Dict[str, Any]) -> str:
+    """Stable key from the endpoint, its scoping identity and its parameters"""
+    params = {k: v for k, v in kwargs.items() if k not in _IGNORED_KWARGS}
+    raw = json.dumps(
+        [func.__module__, func.__qualname__, _scope_key(scope, kwargs.get("current_user")), params],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def cached(ttl: Optional[int] = None, tags: Iterable[str] = (), scope: str = "user"):
+    """
+    Cache an endpoint's JSON-encoded response
+
+    Args:
+        ttl: Seconds to keep the response (defaults to CACHE_DEFAULT_TTL_SECONDS)
+        tags: Invalidation tags, e.g. ["tasks"]
+        scope: "user" (per current_user), "role" (per current_user.role)
+            or "global" (shared by every caller)
+
+    Works on both sync and async endpoints; the wrapper keeps the original
+    signature so FastAPI dependency injection is unaffected. On async
+    endpoints a blocking backend (Redis) is called from the threadpool, so
+    the event loop never waits on the network. Cache errors are logged and
+    the endpoint runs uncached.
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable):
+        def lookup(kwargs) -> Tuple[Optional[str], Optional[Any]]:
+            if not settings.CACHE_ENABLED:
+                return None, None
+            try:
+                key = build_cache_key(func, scope, kwargs)
+                return key, get_cache().get(key)
+            except Exception as e:
+                logger.warning(f"Cache lookup failed for {func.__qualname__}: {e}")
+                return None, None
+
+        def store(key: Optional[str], result: Any) -> Any:
+            encoded = jsonable_encoder(result)
+            if key is not None:
+                try:
+                    get_cache().set(key, encoded, ttl or settings.CACHE_DEFAULT_TTL_SECONDS, tags)
+                except Exception as e:
+                    logger.warning(f"Cache store failed for {func.__qualname__}: {e}")
+            return encoded
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                blocking = settings.CACHE_ENABLED and get_cache().blocking
+                key, hit = await run_in_threadpool(lookup, kwargs) if blocking else lookup(kwargs)
+                if hit is not None:
+                    return hit
+                result = await func(*args, **kwargs)
+                return await run_in_threadpool(store, key, result) if blocking else store(key, result)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            key, hit = lookup(kwargs)
+            if hit is not None:
+                return hit
+            return store(key, func(*args, **kwargs))
+
+        return sync_wrapper
+
+    return decorator
@@ -90,6 +90,11 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 1800  # Replace connections older than this (seconds)
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_MAX_CONNECTIONS: int = 60  # Total budget across web and job worker processes and both engines (0 = unbounded)
+    WEB_CONCURRENCY: int = 4  # Gunicorn worker processes (see Procfile)
     
     # Frontend URL
     FRONTEND_URL: str
@@ -119,6 +124,83 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Analytics
+    PRODUCTIVITY_ROLLUP_MAX_AGE_SECONDS: int = 300  # Refresh productivity_scores when older
+    PRODUCTIVITY_ROLLUP_LAG_SECONDS: int = 60  # Each refresh rescans this far behind the watermark (tasks stamped before they commit)
+    
+    # Response Cache
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "auto"  # auto/memory/redis (auto = redis when REDIS_URL is set; memory is per worker process)
+    CACHE_DEFAULT_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.25  # Redis connect/read timeout; slower calls fail and the endpoint runs uncached
+    
+    # Blockchain Audit
+    BLOCKCHAIN_BATCH_ENABLED: bool = True  # Run the periodic Merkle batch sealer in each web worker
+    BLOCKCHAIN_BATCH_MAX_ENTRIES: int = 500  # Entries per block; the sealer is woken early once a process has added this many
+    BLOCKCHAIN_BATCH_WINDOW_SECONDS: float = 2.0  # ...or at most this long after they were logged
+    BLOCKCHAIN_SEAL_METHOD: str = "pow"  # pow/pow_pool/hmac (see app/blockchain/sealing.py); once hmac, switching back to pow is not supported
+    BLOCKCHAIN_POW_DIFFICULTY: int = 2  # Leading zero hex digits for new pow/pow_pool blocks (each block records its own)
+    BLOCKCHAIN_LEGACY_POW_DIFFICULTY: int = 2  # What blocks sealed before difficulty was recorded are verified against
+    BLOCKCHAIN_POW_WORKERS: int = 0  # pow_pool processes (0 = CPU count)
+    BLOCKCHAIN_HMAC_KEY: Optional[str] = None  # hmac sealing key (defaults to one derived from SECRET_KEY)
+    BLOCKCHAIN_VERIFY_WORKERS: int = 0  # Processes hashing chunks for /verify-chain/stream (0 = CPU count, 1 = in-process)
+    
+    # Background Jobs (scripts/run_job_worker.py)
+    JOB_ARTIFACT_DIR: str = "var/jobs"  # Uploads and generated files; must be shared by web and worker
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0  # Idle worker sleep between dequeue attempts
+    JOB_STALE_AFTER_SECONDS: int = 300  # Running jobs without a heartbeat this long are requeued
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_ARTIFACT_TTL_HOURS: int = 72  # Finished jobs' files are deleted after this
+    JOB_WORKER_PROCESSES: int = 1  # Job worker processes running (Procfile `worker`), counted in DATABASE_MAX_CONNECTIONS
+    
+    # Audit Log (write-behind, see app/utils/audit.py)
+    AUDIT_BUFFER_ENABLED: bool = True  # False = insert each entry synchronously
+    AUDIT_BUFFER_MAX_ENTRIES: int = 10000  # Queued entries per process before callers write inline
+    AUDIT_FLUSH_MAX_ROWS: int = 500  # Flush as soon as this many entries are queued...
+    AUDIT_FLUSH_INTERVAL_MS: int = 200  # ...or this long after the first one
+    AUDIT_DURABLE_TIMEOUT_SECONDS: float = 10.0  # log_action(durable=True) waits at most this long
+    AUDIT_RETRY_MAX_BACKOFF_SECONDS: float = 30.0  # Longest wait between retries while the database is unreachable
+    
+    # Log Partitions (scripts/maintain_partitions.py)
+    PARTITION_PREMAKE_MONTHS: int = 3  # Monthly partitions kept ready ahead of today
+    PARTITION_ARCHIVE_DIR: str = "var/archive"  # Where expired partitions are written as .csv.gz
+    AUDIT_LOG_RETENTION_MONTHS: int = 24  # Older audit_logs partitions are archived
+    ACCESS_LOG_RETENTION_MONTHS: int = 3  # Older api_access_logs partitions are archived
+    LOG_QUERY_DEFAULT_HOURS: int = 24  # Log listings called without `since` only look back this far
+    
+    # API Access Log (app/middleware/access_logger.py)
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_RAW_ROWS: bool = True  # Also keep one api_access_logs row per request (rollups are always kept)
+    ACCESS_LOG_QUEUE_SIZE: int = 10000  # Raw rows buffered per worker; beyond this they are dropped, not waited on
+    ACCESS_LOG_BATCH_SIZE: int = 1000  # Flush early once this many rows are queued
+    ACCESS_LOG_FLUSH_SECONDS: float = 1.0
+    
+    # Traffic Anomalies (app/services/traffic_analyzer.py, per worker process)
+    TRAFFIC_ANALYZER_ENABLED: bool = True
+    TRAFFIC_WINDOW_SECONDS: int = 60  # Burst window
+    TRAFFIC_BASELINE_SECONDS: int = 900  # History each key's normal rate is taken from
+    TRAFFIC_SLICE_SECONDS: int = 10  # Granularity the windows slide by
+    TRAFFIC_SKETCH_WIDTH: int = 2048  # Count-min error: at most e/width of the window's traffic
+    TRAFFIC_SKETCH_DEPTH: int = 4
+    TRAFFIC_TOP_K: int = 50  # Heavy hitters tracked per dimension
+    TRAFFIC_BURST_MIN_REQUESTS: int = 120  # Requests per window (across all WEB_CONCURRENCY workers) before a key can be flagged
+    TRAFFIC_BURST_FACTOR: float = 5.0  # ...and this many times its baseline rate
+    TRAFFIC_MAX_ANOMALIES: int = 200  # Flagged bursts kept (oldest evicted)
+    
+    # Fraud Scoring (app/services/fraud_scoring.py, scripts/score_fraud_alerts.py)
+    FRAUD_MODEL_PATH: str = "app/ml/models/fraud_model.pkl"  # Must be shared by web and worker
+    FRAUD_RETRAIN_HOURS: int = 24  # A scoring run retrains first when the model is older than this
+    FRAUD_TRAINING_WINDOW_DAYS: int = 30  # Training data, and how far back the first run scores
+    FRAUD_TRAINING_MAX_ROWS: int = 200000  # Most recent rows of the window used for training
+    FRAUD_MIN_TRAINING_ROWS: int = 100
+    FRAUD_SCORING_BATCH_ROWS: int = 10000
+    FRAUD_SCORING_LAG_SECONDS: int = 60  # Entries younger than this may still sit in the audit write-behind buffer
+    FRAUD_SCORING_RESCAN_SECONDS: int = 900  # Each run rescores this far behind the watermark (entries the audit buffer committed late)
+    
+    # Optional Services
+    REDIS_URL: Optional[str] = None
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Optional[str] = "app.log"
@@ -1,9 +1,9 @@
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
@@ -60,10 +60,17 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)  # ✅ Use Session, not AsyncSession
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Get current authenticated user from JWT token."""
+    """
+    Get current authenticated user from JWT token.
+
+    The user is loaded in a short-lived session of its own, closed before
+    the endpoint runs, so its connection is back in the pool by then and an
+    endpoint using get_db or get_async_db never holds two at once. The
+    returned user is detached: read its columns, don't lazy-load relations.
+    """
     from app.models.user import User
     
     token = credentials.credentials
@@ -83,8 +90,9 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    # ✅ FIXED: Remove await - use synchronous query
-    user = db.query(User).filter(User.id == user_id).first()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
     
     if user is None:
         raise HTTPException(
@@ -98,4 +106,6 @@ async def get_current_user(
             detail="Inactive user"
         )
     
+    # For the access log's per-role counts
+    request.state.user = user
     return user
@@ -3,7 +3,12 @@ from .task import Task, TaskStatus, GPSLog, Evidence, Review
 from .productivity_score import ProductivityScore
 from .audit_log import AuditLog
 from .blockchain_audit import BlockchainAudit
+from .blockchain_checkpoint import BlockchainCheckpoint
+from .blockchain_entry import BlockchainEntry
+from .watermark import Watermark
+from .job import Job
+from .fraud_alert import FraudAlert
 
-__all__ = ["Task", "TaskStatus", "GPSLog", "Evidence", "Review", "ProductivityScore", "AuditLog", "BlockchainAudit"]
+__all__ = ["Task", "TaskStatus", "GPSLog", "Evidence", "Review", "ProductivityScore", "AuditLog", "BlockchainAudit", "BlockchainCheckpoint", "BlockchainEntry", "Watermark", "Job", "FraudAlert"]
 
 
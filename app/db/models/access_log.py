@@ -1,14 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, BigInteger, SmallInteger, String, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
+from app.db.partitions import partition_on_create
 
 
 class APIAccessLog(Base):
+    """One API request; the table is range-partitioned by month on timestamp (see app/db/partitions.py)"""
     __tablename__ = "api_access_logs"
-    __table_args__ = {'extend_existing': True} 
+    __table_args__ = (
+        Index('ix_api_access_logs_timestamp', 'timestamp'),
+        Index('ix_api_access_logs_role_timestamp', 'user_role', 'timestamp'),
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_role = Column(String, index=True)
-    path = Column(String, index=True)
+    # The partition key has to be part of the primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_role = Column(String)
+    path = Column(String)
     method = Column(String)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    status_code = Column(SmallInteger, nullable=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+partition_on_create(APIAccessLog.__table__)
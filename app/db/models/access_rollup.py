@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index
+from app.db.session import Base
+
+
+class APIAccessRollup(Base):
+    """Requests per minute by (role, route, method, status), summed across workers"""
+    __tablename__ = "api_access_rollups"
+    __table_args__ = (
+        Index('ix_api_access_rollups_bucket', 'bucket'),
+        {'extend_existing': True},
+    )
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # start of the minute (UTC)
+    user_role = Column(String(50), primary_key=True)
+    path = Column(String(255), primary_key=True)  # route template, e.g. /api/v1/tasks/{task_id}
+    method = Column(String(10), primary_key=True)
+    status_code = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
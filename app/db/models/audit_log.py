@@ -1,18 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db.session import Base
+from app.db.partitions import partition_on_create
 import datetime
 
 class AuditLog(Base):
+    """Audit trail row; the table is range-partitioned by month on timestamp (see app/db/partitions.py)"""
     __tablename__ = "audit_logs"
-    __table_args__ = {'extend_existing': True} 
+    __table_args__ = (
+        Index('ix_audit_logs_timestamp', 'timestamp'),
+        Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp'),
+        Index('ix_audit_logs_resource_timestamp', 'resource_type', 'resource_id', 'timestamp'),
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
     
-    id = Column(Integer, primary_key=True)
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"))  # ✅ Changed from UUID to Integer
     action = Column(String(50))
     resource_type = Column(String(50))
     resource_id = Column(String(100))
     details = Column(JSONB)
     ip_address = Column(String(50))
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
 
+partition_on_create(AuditLog.__table__)
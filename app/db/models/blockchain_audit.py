@@ -1,20 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import JSON
 from datetime import datetime
 from app.db.session import Base
 
 class BlockchainAudit(Base):
     __tablename__ = "blockchain_audit"
-    __table_args__ = {'extend_existing': True} 
+    __table_args__ = (
+        # Newest-first listings, with id as the keyset tiebreaker
+        Index('ix_blockchain_audit_entity_timestamp', 'entity_type', 'entity_id', 'timestamp', 'id'),
+        Index('ix_blockchain_audit_user_timestamp', 'user_id', 'timestamp', 'id'),
+        Index('ix_blockchain_audit_timestamp', 'timestamp', 'id'),
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     block_hash = Column(String(64), unique=True, nullable=False, index=True)
     previous_hash = Column(String(64), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     action = Column(String(100), nullable=False)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     entity_type = Column(String(50), nullable=False)
     entity_id = Column(Integer, nullable=False)
     details = Column(JSON, nullable=True)
     proof = Column(Text, nullable=False)
     nonce = Column(Integer, default=0, nullable=False)
+    merkle_root = Column(String(64), nullable=True)  # set on batch blocks (see BlockchainEntry)
+    seal_method = Column(String(20), nullable=True)  # pow/hmac (NULL = pow, predates the column)
+    pow_difficulty = Column(Integer, nullable=True)  # PoW blocks: difficulty mined at (NULL = BLOCKCHAIN_LEGACY_POW_DIFFICULTY)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.session import Base
+
+class BlockchainCheckpoint(Base):
+    """Verified prefix of blockchain_audit: everything up to last_block_id hashed clean"""
+    __tablename__ = "blockchain_checkpoints"
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(Integer, primary_key=True)
+    last_block_id = Column(Integer, nullable=False)
+    last_block_hash = Column(String(64), nullable=False)
+    digest = Column(String(64), nullable=False)  # sha256 chain over every block_hash in the prefix
+    block_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
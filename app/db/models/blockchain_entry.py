@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSON
+from datetime import datetime
+from app.db.session import Base
+
+class BlockchainEntry(Base):
+    """Audit entry sealed into a Merkle-batched block (block_id is NULL until sealed)"""
+    __tablename__ = "blockchain_entries"
+    __table_args__ = (
+        # Sealer scan: oldest unsealed entries
+        Index(
+            'ix_blockchain_entries_pending', 'id',
+            postgresql_where=text("block_id IS NULL"),
+            sqlite_where=text("block_id IS NULL"),
+        ),
+        Index('ix_blockchain_entries_block_leaf', 'block_id', 'leaf_index'),
+        {'extend_existing': True},
+    )
+    
+    id = Column(Integer, primary_key=True)
+    block_id = Column(Integer, ForeignKey("blockchain_audit.id"), nullable=True)
+    leaf_index = Column(Integer, nullable=True)
+    leaf_hash = Column(String(64), nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    action = Column(String(100), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    details = Column(JSON, nullable=True)
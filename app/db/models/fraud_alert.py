@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, ForeignKey, Index
+from app.db.session import Base
+import datetime
+
+
+class FraudAlert(Base):
+    """Audit log entry the fraud model flagged (written by app/services/fraud_scoring.py)"""
+    __tablename__ = "fraud_alerts"
+    __table_args__ = (
+        # audit_logs is partitioned, so the log is referenced by its full key without a foreign key
+        Index('ux_fraud_alerts_audit_log', 'audit_log_id', 'timestamp', unique=True),
+        Index('ix_fraud_alerts_timestamp', 'timestamp', 'id'),
+        Index('ix_fraud_alerts_user_timestamp', 'user_id', 'timestamp'),
+        {'extend_existing': True},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    audit_log_id = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)  # The audit entry's, not the detection time
+    user_id = Column(Integer, ForeignKey("users.id"))
+    action = Column(String(50))
+    resource_type = Column(String(50))
+    resource_id = Column(String(100))
+    ip_address = Column(String(50))
+    anomaly_score = Column(Float, nullable=False)
+    model_version = Column(String(50))  # When the scoring model was trained
+    detected_at = Column(DateTime, default=datetime.datetime.utcnow)
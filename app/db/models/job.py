@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, JSON, Index, text
+from app.db.session import Base
+import datetime
+
+
+class Job(Base):
+    """Background job queued for the worker (imports, exports, reports, training)"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Dequeue scan: next runnable queued job
+        Index(
+            'ix_jobs_queued_run_after', 'run_after',
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+        Index('ix_jobs_created_by', 'created_by'),
+        {'extend_existing': True},
+    )
+
+    id = Column(String(36), primary_key=True)  # uuid4, unguessable for polling/download URLs
+    type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued/running/succeeded/failed
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    progress = Column(Float, nullable=False, default=0.0)  # 0..1
+    message = Column(String(255), nullable=True)
+
+    artifact_path = Column(String(500), nullable=True)
+    artifact_name = Column(String(255), nullable=True)
+    artifact_media_type = Column(String(100), nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    locked_by = Column(String(100), nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    run_after = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
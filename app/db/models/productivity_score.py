@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from app.db.session import Base
 import datetime
 
 class ProductivityScore(Base):
     __tablename__ = "productivity_scores"
-    __table_args__ = {'extend_existing': True} 
+    __table_args__ = (
+        Index('ix_productivity_scores_user_period', 'user_id', 'period_start', unique=True),
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))  # ✅ Changed from UUID to Integer
@@ -19,7 +19,7 @@ class Task(Base):
     priority = Column(String(20))
     status = Column(String(20))
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
 
 class TaskStatus(Base):
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.session import Base
+import datetime
+
+
+class Watermark(Base):
+    """High-water mark for incremental pipelines, one row per pipeline name"""
+    __tablename__ = "pipeline_watermarks"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String(100), primary_key=True)
+    value = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
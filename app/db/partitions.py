@@ -0,0 +1,194 @@
+"""
+Monthly Log Partitions for SmartWork 360
+Range partitions on the append-only log tables' timestamp: pre-creation,
+retention (detach or archive to gzip) and the create_all hook
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# table -> settings attribute holding its retention in months
+PARTITIONED_TABLES = {
+    "audit_logs": "AUDIT_LOG_RETENTION_MONTHS",
+    "api_access_logs": "ACCESS_LOG_RETENTION_MONTHS",
+}
+
+PARTITION_KEY = "timestamp"
+
+MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bound(month: date) -> str:
+    # Explicit UTC so timestamptz bounds don't depend on the session TimeZone
+    # (the offset is ignored for timestamp without time zone)
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def retention_months(table: str) -> int:
+    return getattr(settings, PARTITIONED_TABLES[table])
+
+
+def list_month_partitions(conn: Connection, table: str) -> List[Tuple[date, str]]:
+    """(month, partition) for every attached monthly partition, oldest first"""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table}
+    ).scalars()
+    partitions = []
+    for name in names:
+        match = MONTH_SUFFIX.search(name)
+        if match and name == partition_name(table, date(int(match[1]), int(match[2]), 1)):
+            partitions.append((date(int(match[1]), int(match[2]), 1), name))
+    return sorted(partitions)
+
+
+def ensure_default_partition(conn: Connection, table: str) -> None:
+    """Catch-all for rows outside every monthly range (kept empty by maintenance)"""
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT'
+    ))
+
+
+def create_month_partition(conn: Connection, table: str, month: date) -> bool:
+    """
+    Attach the partition for `month`; returns False if it already exists
+
+    Rows for that month that landed in the default partition (maintenance
+    ran late) are moved into the new partition first, since Postgres
+    refuses to create a partition whose rows sit in the default.
+    """
+    name = partition_name(table, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return False
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    default = default_partition_name(table)
+    has_default = conn.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar()
+    strays = has_default and conn.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "{PARTITION_KEY}" >= :start AND "{PARTITION_KEY}" < :end)'),
+        {"start": start, "end": end}
+    ).scalar()
+
+    if not strays:
+        conn.execute(text(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (\'{start}\') TO (\'{end}\')'
+        ))
+        return True
+
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    moved = conn.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE "{PARTITION_KEY}" >= :start AND "{PARTITION_KEY}" < :end '
+            f'RETURNING *) INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"start": start, "end": end}
+    ).rowcount
+    conn.execute(text(
+        f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (\'{start}\') TO (\'{end}\')'
+    ))
+    logger.warning(f"Moved {moved} {table} rows from the default partition into {name}")
+    return True
+
+
+def ensure_partitions(
+    conn: Connection,
+    table: str,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None
+) -> List[str]:
+    """Create the default partition and monthly ones through `months_ahead`; returns those created"""
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(today or date.today())
+    ensure_default_partition(conn, table)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_month_partition(conn, table, month):
+            created.append(partition_name(table, month))
+    return created
+
+
+def expired_partitions(
+    conn: Connection,
+    table: str,
+    retain_months: Optional[int] = None,
+    today: Optional[date] = None
+) -> List[str]:
+    """Monthly partitions that lie entirely before the retention window"""
+    retain_months = retention_months(table) if retain_months is None else retain_months
+    cutoff = add_months(month_start(today or date.today()), -retain_months)
+    return [name for month, name in list_month_partitions(conn, table) if month < cutoff]
+
+
+def detach_partition(conn: Connection, table: str, name: str) -> None:
+    """Detach a partition, leaving it as a standalone table"""
+    conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+
+
+def archive_partition(conn: Connection, table: str, name: str, archive_dir: Optional[str] = None) -> Path:
+    """
+    Detach a partition, COPY it to <archive_dir>/<table>/<partition>.csv.gz and drop it
+
+    Runs in the caller's transaction: if anything fails before commit the
+    partition stays attached. The file is complete and fsynced before the
+    drop is committed.
+    """
+    directory = Path(archive_dir or settings.PARTITION_ARCHIVE_DIR) / table
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.csv.gz"
+    partial = path.with_name(path.name + ".partial")
+
+    detach_partition(conn, table, name)
+    cursor = conn.connection.cursor()
+    try:
+        with open(partial, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', out)
+            raw.flush()
+            os.fsync(raw.fileno())
+    finally:
+        cursor.close()
+    os.replace(partial, path)
+
+    conn.execute(text(f'DROP TABLE "{name}"'))
+    return path
+
+
+def partition_on_create(table) -> None:
+    """Give a partitioned model's table its default and upcoming partitions when create_all() makes it"""
+    def create_partitions(target, connection, **kw):
+        if connection.dialect.name == "postgresql":
+            ensure_partitions(connection, target.name)
+
+    event.listen(table, "after_create", create_partitions)
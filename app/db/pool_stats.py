@@ -0,0 +1,114 @@
+"""
+Connection Pool Telemetry for SmartWork 360
+Tracks how long requests wait to check a connection out of the SQLAlchemy
+pool, so pool exhaustion shows up as latency before it shows up as errors
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolWaitStats:
+    """Thread-safe checkout wait-time histogram for one pool"""
+
+    def __init__(self, buckets_ms=WAIT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._lock = threading.Lock()
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            index = len(self.buckets_ms)
+            for i, upper in enumerate(self.buckets_ms):
+                if wait_ms <= upper:
+                    index = i
+                    break
+            self._counts[index] += 1
+            self._total_ms += wait_ms
+            self._max_ms = max(self._max_ms, wait_ms)
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            observed = sum(self._counts)
+            histogram: List[Dict] = [
+                {"le_ms": upper, "count": count}
+                for upper, count in zip(self.buckets_ms, self._counts)
+            ]
+            histogram.append({"le_ms": None, "count": self._counts[-1]})
+            return {
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._total_ms / observed, 3) if observed else 0,
+                "max_wait_ms": round(self._max_ms, 3),
+                "histogram": histogram,
+            }
+
+
+class _TimedCheckoutMixin:
+    """Times each pool checkout, including time blocked on an exhausted pool or spent connecting"""
+
+    wait_stats: PoolWaitStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        # Keep the histogram across pool recreation (e.g. engine.dispose())
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.observe((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.wait_stats.observe((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool for the sync engine with checkout wait telemetry"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for the async engine with checkout wait telemetry"""
+
+
+def get_pool_stats(engine) -> Dict:
+    """Live occupancy plus wait-time histogram for an engine's pool"""
+    pool = engine.pool
+    stats: Dict = {"pool_class": type(pool).__name__, "status": pool.status()}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout_seconds": pool.timeout(),
+        })
+
+    wait_stats: Optional[PoolWaitStats] = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats["wait"] = wait_stats.snapshot()
+
+    return stats
@@ -1,12 +1,66 @@
+import logging
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
+from app.db.pool_stats import TimedQueuePool, TimedAsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Each worker process runs one sync and one async engine, each with its own pool
+ENGINES_PER_WORKER = 2
+
+
+def get_pool_processes() -> int:
+    """Processes holding pools: gunicorn workers plus job workers (they import this module too)"""
+    return max(settings.WEB_CONCURRENCY, 1) + max(settings.JOB_WORKER_PROCESSES, 0)
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """
+    Per-engine pool sizing from settings
+
+    Every gunicorn worker (WEB_CONCURRENCY) and job worker
+    (JOB_WORKER_PROCESSES) holds its own pools, so the deployment can open
+    up to processes x engines x (pool_size + max_overflow) connections.
+    pool_size and max_overflow are scaled down proportionally to fit
+    DATABASE_MAX_CONNECTIONS (default 60, what four workers opened with
+    SQLAlchemy's default pools); 0 lifts the budget.
+    """
+    pool_size = settings.DATABASE_POOL_SIZE
+    max_overflow = settings.DATABASE_MAX_OVERFLOW
+
+    if settings.DATABASE_MAX_CONNECTIONS:
+        slots = get_pool_processes() * ENGINES_PER_WORKER
+        per_engine = max(settings.DATABASE_MAX_CONNECTIONS // slots, 1)
+        if pool_size + max_overflow > per_engine:
+            pool_size = max(per_engine * pool_size // (pool_size + max_overflow), 1)
+            max_overflow = max(per_engine - pool_size, 0)
+
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def _engine_kwargs(pool_class) -> Dict[str, Any]:
+    # SQLite keeps SQLAlchemy's default pool (no sizing / shared-connection semantics)
+    if "sqlite" in settings.DATABASE_URL:
+        return {"connect_args": {"check_same_thread": False}}
+    return {"poolclass": pool_class, **get_pool_settings()}
+
 
 # Create engine - for SQLite use regular engine, not async
 engine = create_engine(
     settings.DATABASE_URL,
     echo=True if settings.ENVIRONMENT == "development" else False,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    **_engine_kwargs(TimedQueuePool),
 )
 
 # Create session factory
@@ -16,6 +70,46 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+
+    if backend == "postgresql":
+        query = dict(url.query)
+        # asyncpg takes `ssl` instead of libpq's `sslmode`
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine for `async def` endpoints - shares DATABASE_URL with the sync engine
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    echo=True if settings.ENVIRONMENT == "development" else False,
+    **_engine_kwargs(TimedAsyncAdaptedQueuePool),
+)
+
+if "sqlite" not in settings.DATABASE_URL:
+    _pool = get_pool_settings()
+    logger.info(
+        f"DB pools: pool_size={_pool['pool_size']} max_overflow={_pool['max_overflow']} "
+        f"per engine x {ENGINES_PER_WORKER} engines x {get_pool_processes()} processes"
+    )
+
+# Async session factory (no expiry on commit so returned objects stay readable)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -28,3 +122,7 @@ def get_db():
         db.close()
 
 
+# Async dependency for FastAPI - use from `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -493,8 +493,9 @@ Production-Ready Version with Security & Monitoring
 """
 import os
 import time
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -503,7 +504,9 @@ from starlette.middleware.sessions import SessionMiddleware
 import logging
 
 from app.core.config import settings
-from app.db.session import engine, Base
+from app.db.session import engine, async_engine, Base, get_pool_settings, get_pool_processes, ENGINES_PER_WORKER
+from app.db.pool_stats import get_pool_stats
+from app.core.security import get_current_user
 
 
 # ============================================================================
@@ -561,6 +564,37 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Database initialization error: {e}", exc_info=True)
         logger.warning("⚠️  Application will continue but database operations may fail")
     
+    # Sealing can't go back from hmac to pow (verification would flag every later block)
+    try:
+        from app.api.blockchain import blockchain
+        from app.blockchain.audit_chain import UNSUPPORTED_SWITCH
+        from app.db.session import SessionLocal
+        with SessionLocal() as db:
+            if blockchain.seal_switch_unsupported(db):
+                logger.error(
+                    f"❌ {UNSUPPORTED_SWITCH}: the chain is HMAC-sealed but "
+                    f"BLOCKCHAIN_SEAL_METHOD={settings.BLOCKCHAIN_SEAL_METHOD}; block appends will fail"
+                )
+    except Exception as e:
+        logger.warning(f"⚠️  Blockchain seal method check skipped: {e}")
+    
+    # Merkle-batched blockchain entries: seal whatever is pending every window
+    batch_sealer = None
+    if settings.BLOCKCHAIN_BATCH_ENABLED:
+        try:
+            from app.blockchain.batching import run_batch_sealer
+            from app.api.blockchain import blockchain
+            batch_sealer = asyncio.create_task(run_batch_sealer(blockchain))
+            logger.info("✅ Blockchain batch sealer started")
+        except ImportError as e:
+            logger.warning(f"⚠️  Blockchain batch sealer not available: {e}")
+    
+    # Batched API access logging (see AccessLoggerMiddleware)
+    access_log_flusher = None
+    if settings.ACCESS_LOG_ENABLED:
+        from app.services.access_log_buffer import access_log_buffer
+        access_log_flusher = asyncio.create_task(access_log_buffer.run())
+    
     logger.info("=" * 60)
     logger.info("✅ Application startup complete")
     logger.info("=" * 60)
@@ -570,7 +604,38 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("=" * 60)
     logger.info("🛑 Application shutting down...")
+    try:
+        # Flush queued block appends before the engines go away
+        from app.api.blockchain import appender
+        appender.stop(timeout=30)
+    except ImportError:
+        pass
+    # Flush buffered audit log entries
+    from app.utils.audit import audit_buffer
+    audit_buffer.stop(timeout=30)
+    if access_log_flusher is not None:
+        access_log_flusher.cancel()
+        try:
+            await access_log_buffer.flush()
+        except Exception as e:
+            logger.error(f"❌ Final access log flush failed: {e}")
+    if batch_sealer is not None:
+        batch_sealer.cancel()
+        # Seal what is left so no entry waits for the next start
+        from app.blockchain.batching import seal_pending_batches
+        from app.api.blockchain import blockchain
+        try:
+            seal_pending_batches(blockchain)
+        except Exception as e:
+            logger.error(f"❌ Final blockchain batch seal failed: {e}")
+    # Hashing processes started by /verify-chain/stream
+    try:
+        from app.api.blockchain import shutdown_verify_pool
+        shutdown_verify_pool()
+    except ImportError:
+        pass
     engine.dispose()
+    await async_engine.dispose()
     logger.info("✅ Database connections closed")
     logger.info("👋 Application shutdown complete")
     logger.info("=" * 60)
@@ -671,6 +736,14 @@ app.add_middleware(
 logger.info("✅ CORS middleware configured")
 
 
+# ============================================================================
+# ACCESS LOG MIDDLEWARE (batched, see app/services/access_log_buffer.py)
+# ============================================================================
+if settings.ACCESS_LOG_ENABLED:
+    from app.middleware.access_logger import AccessLoggerMiddleware
+    app.add_middleware(AccessLoggerMiddleware)
+
+
 # ============================================================================
 # SECURITY HEADERS MIDDLEWARE
 # ============================================================================
@@ -917,6 +990,33 @@ async def readiness_check():
         )
 
 
+@app.get("/internal/db-pool", tags=["Health"])
+async def db_pool_stats(current_user=Depends(get_current_user)):
+    """Live connection pool occupancy and checkout wait times (admin only)"""
+    if current_user.role.value != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    pool_settings = get_pool_settings()
+    per_worker = ENGINES_PER_WORKER * (pool_settings["pool_size"] + pool_settings["max_overflow"])
+    
+    return {
+        "success": True,
+        "data": {
+            "pid": os.getpid(),
+            "workers": settings.WEB_CONCURRENCY,
+            "job_workers": settings.JOB_WORKER_PROCESSES,
+            "configured": pool_settings,
+            "max_connections_per_worker": per_worker,
+            "max_connections_total": per_worker * get_pool_processes(),
+            "connection_budget": settings.DATABASE_MAX_CONNECTIONS or None,
+            "pools": {
+                "sync": get_pool_stats(engine),
+                "async": get_pool_stats(async_engine),
+            },
+        },
+    }
+
+
 @app.get("/info", tags=["Info"])
 async def api_info():
     """Get API route information (disabled in production)"""
@@ -1021,6 +1121,7 @@ try:
         automation,
         data_transfer,
         dashboard_charts,
+        jobs,
     )
     
     app.include_router(blockchain.router, prefix="/api", tags=["Blockchain"])
@@ -1030,6 +1131,7 @@ try:
     app.include_router(automation.router, prefix="/api", tags=["Automation"])
     app.include_router(data_transfer.router, prefix="/api", tags=["Data"])
     app.include_router(dashboard_charts.router, prefix="/api", tags=["Dashboard"])
+    app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
     
     logger.info("✅ Additional feature routes loaded")
 except ImportError as e:
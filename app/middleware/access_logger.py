@@ -1,27 +1,71 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from typing import Callable
-from app.db.models.access_log import APIAccessLog
+from typing import Optional
 
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class AccessLoggerMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, db_session):
-        super().__init__(app)
-        self.db = db_session
+from app.core.config import settings
+from app.services.access_log_buffer import AccessLogBuffer, access_log_buffer
+from app.services.traffic_analyzer import TrafficAnalyzer, traffic_analyzer
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        response: Response = await call_next(request)
+# Rollup path for requests no route matched (keeps scanner noise to one row per minute)
+UNMATCHED_ROUTE = "<unmatched>"
 
-        # Extract user from request state (set by auth middleware)
-        user = getattr(request.state, "user", None)
-        role = getattr(user, "role", "anonymous") if user else "anonymous"
-        path = request.url.path
-        method = request.method
 
-        # Log API access into database
-        log_entry = APIAccessLog(user_role=role, path=path, method=method)
-        self.db.add(log_entry)
-        self.db.commit()
+class AccessLoggerMiddleware:
+    """
+    Records every HTTP request into the access log buffer
 
-        return response
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses pass
+    through untouched and the status code is taken from the response start
+    message. Nothing here touches the database; AccessLogBuffer.run()
+    writes the records in batches. Each request is also counted by the
+    in-memory TrafficAnalyzer (unless TRAFFIC_ANALYZER_ENABLED is off).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        buffer: Optional[AccessLogBuffer] = None,
+        analyzer: Optional[TrafficAnalyzer] = None
+    ):
+        self.app = app
+        self.buffer = buffer or access_log_buffer
+        self.analyzer = analyzer or (traffic_analyzer if settings.TRAFFIC_ANALYZER_ENABLED else None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._record(scope, status_code)
+
+    def _record(self, scope: Scope, status_code: int) -> None:
+        # Set by get_current_user for authenticated requests
+        user = scope.get("state", {}).get("user")
+        role = getattr(user, "role", None) if user else None
+        role = getattr(role, "value", role) or "anonymous"
+
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+
+        self.buffer.record(
+            str(role)[:50], scope["path"], route_path[:255], scope["method"][:10], status_code
+        )
+
+        if self.analyzer is not None:
+            # scope["client"] honours X-Forwarded-For when uvicorn runs with --proxy-headers
+            client = scope.get("client")
+            self.analyzer.observe(
+                str(user.id) if user is not None else None,
+                client[0] if client else None
+            )
@@ -1,15 +1,58 @@
 from sklearn.ensemble import IsolationForest
 import numpy as np
+from datetime import datetime
+from typing import Optional
+import joblib
+import os
+
+DEFAULT_MODEL_PATH = "app/ml/models/fraud_model.pkl"
 
 class AnomalyDetector:
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None):
         # Initialize Isolation Forest
         self.model = IsolationForest(contamination=0.05, random_state=42)
         self.trained = False
+        self.trained_at: Optional[datetime] = None
+        # Feature encoder the model was trained with (e.g. AuditFeatureEncoder), persisted alongside
+        self.encoder = None
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self._model_mtime = None
+        self._load_model()
+
+    def _load_model(self):
+        """Load the persisted model if one exists"""
+        if os.path.exists(self.model_path):
+            self._model_mtime = os.path.getmtime(self.model_path)
+            saved = joblib.load(self.model_path)
+            self.model = saved["model"]
+            self.trained_at = saved["trained_at"]
+            self.encoder = saved.get("encoder")
+            self.trained = True
+
+    def refresh(self):
+        """Reload the model if it was retrained elsewhere (e.g. by the job worker)"""
+        if os.path.exists(self.model_path) and os.path.getmtime(self.model_path) != self._model_mtime:
+            self._load_model()
+
+    def save(self):
+        """Persist the trained model (written aside and renamed, so readers never see half a file)"""
+        if not self.trained:
+            raise RuntimeError("Model not trained")
+        os.makedirs(os.path.dirname(self.model_path) or ".", exist_ok=True)
+        partial = f"{self.model_path}.partial"
+        joblib.dump({"model": self.model, "trained_at": self.trained_at, "encoder": self.encoder}, partial)
+        os.replace(partial, self.model_path)
+        self._model_mtime = os.path.getmtime(self.model_path)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.trained_at.isoformat(timespec="seconds") if self.trained_at else None
 
-    def train(self, feature_matrix):
+    def train(self, feature_matrix, encoder=None):
         self.model.fit(feature_matrix)
+        self.encoder = encoder
         self.trained = True
+        self.trained_at = datetime.utcnow()
 
     def detect(self, sample):
         if not self.trained:
@@ -21,3 +64,9 @@ class AnomalyDetector:
         if not self.trained:
             raise RuntimeError("Model not trained")
         return self.model.predict(samples) == -1
+
+    def batch_score(self, samples):
+        """Anomaly score per sample: positive exactly where batch_detect() is True, higher is stranger"""
+        if not self.trained:
+            raise RuntimeError("Model not trained")
+        return -self.model.decision_function(samples)
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import zlib
+from typing import Iterable, List, Optional, Sequence
+
+# Bump when the features change, so models trained on the old ones are retrained
+FEATURES_VERSION = 2
+
+FEATURE_NAMES = [
+    "action_hash",
+    "resource_type_hash",
+    "time_of_day_sin",
+    "time_of_day_cos",
+    "weekday",
+    "user_rate",
+    "action_rarity",
+    "user_action_rarity",
+]
+
+# Audit columns the features are built from
+FEATURE_COLUMNS = ["user_id", "action", "resource_type", "timestamp"]
+
+SECONDS_PER_DAY = 86400
+
+
+def audit_frame(rows: Iterable[Sequence], columns: List[str]) -> pd.DataFrame:
+    """DataFrame from selected column tuples (e.g. a SQLAlchemy result batch)"""
+    return pd.DataFrame.from_records(list(rows), columns=columns)
+
+
+def stable_hash(values: pd.Series) -> np.ndarray:
+    """
+    crc32 of each value as uint32, identical in every process (unlike hash())
+
+    Only the distinct values are hashed in Python; rows get theirs by
+    indexing. Missing values hash like the empty string.
+    """
+    codes, uniques = pd.factorize(values)
+    hashes = np.fromiter(
+        (zlib.crc32(str(value).encode()) for value in uniques), dtype=np.uint32, count=len(uniques)
+    )
+    # code -1 (missing) picks the appended crc32(b"") == 0
+    return np.append(hashes, np.uint32(0))[codes]
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    return pd.to_datetime(timestamps).to_numpy().astype("datetime64[s]").astype(np.int64)
+
+
+def _user_ids(frame: pd.DataFrame) -> np.ndarray:
+    return frame["user_id"].fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _pair_keys(users: np.ndarray, actions: np.ndarray) -> np.ndarray:
+    return (users << 32) | actions.astype(np.int64)
+
+
+def _lookup(counts: pd.Series, keys: np.ndarray) -> np.ndarray:
+    """counts[key] for every key, 0 where unseen"""
+    positions = counts.index.get_indexer(keys)
+    return np.where(positions >= 0, counts.to_numpy()[positions], 0)
+
+
+def rolling_counts(groups: np.ndarray, seconds: np.ndarray, window: int) -> np.ndarray:
+    """
+    For each row, rows of the same group within the `window` seconds up to and including it
+
+    Rows are sorted once by (group, time) and folded into a single int64
+    key spaced so that no window crosses into the next group; one
+    searchsorted then finds where every row's window starts.
+    """
+    if not len(seconds):
+        return np.zeros(0, dtype=np.int64)
+    group_codes, _ = pd.factorize(groups)
+    offsets = seconds - seconds.min()
+    keys = group_codes.astype(np.int64) * (int(offsets.max()) + window + 1) + offsets
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    starts = np.searchsorted(ordered, ordered - window, side="right")
+    counts = np.empty(len(keys), dtype=np.int64)
+    counts[order] = np.arange(len(keys)) - starts + 1
+    return counts
+
+
+class AuditFeatureEncoder:
+    """
+    Turns audit log columns into the fraud model's feature matrix
+
+    fit() learns how often each action and each (user, action) pair occurs
+    in the training data; transform() is fully vectorized. Features:
+    stable hashed action and resource type, time of day (cyclical) and
+    weekday, the user's entries in the preceding `rate_window` seconds, and
+    how rare the action is overall and for that user. Persist the fitted
+    encoder with the model it was trained for.
+    """
+
+    def __init__(self, rate_window: int = 3600):
+        self.rate_window = rate_window
+        self.version = FEATURES_VERSION
+        self.total = 0
+        self.action_counts = pd.Series(dtype=np.int64)
+        self.user_counts = pd.Series(dtype=np.int64)
+        self.pair_counts = pd.Series(dtype=np.int64)
+
+    def fit(self, frame: pd.DataFrame) -> "AuditFeatureEncoder":
+        actions = stable_hash(frame["action"]).astype(np.int64)
+        users = _user_ids(frame)
+        self.total = len(frame)
+        self.action_counts = pd.Series(actions).value_counts()
+        self.user_counts = pd.Series(users).value_counts()
+        self.pair_counts = pd.Series(_pair_keys(users, actions)).value_counts()
+        return self
+
+    def transform(self, frame: pd.DataFrame, context: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """
+        Feature matrix for `frame`, one row per entry
+
+        `context` holds entries logged just before `frame` (e.g. the tail of
+        the previous batch); they only count towards user_rate.
+        """
+        actions = stable_hash(frame["action"])
+        resource_types = stable_hash(frame["resource_type"])
+        users = _user_ids(frame)
+        seconds = _epoch_seconds(frame["timestamp"])
+
+        if context is not None and len(context):
+            rates = rolling_counts(
+                np.concatenate([_user_ids(context), users]),
+                np.concatenate([_epoch_seconds(context["timestamp"]), seconds]),
+                self.rate_window
+            )[len(context):]
+        else:
+            rates = rolling_counts(users, seconds, self.rate_window)
+
+        angle = (seconds % SECONDS_PER_DAY) * (2 * np.pi / SECONDS_PER_DAY)
+        # 1970-01-01 was a Thursday; Monday is 0
+        weekday = (seconds // SECONDS_PER_DAY + 3) % 7
+
+        # Add-one smoothing, so unseen actions and pairs are the rarest rather than infinite
+        action_seen = _lookup(self.action_counts, actions.astype(np.int64))
+        action_rarity = -np.log((action_seen + 1) / (self.total + 1))
+        pair_seen = _lookup(self.pair_counts, _pair_keys(users, actions))
+        user_seen = _lookup(self.user_counts, users)
+        user_action_rarity = -np.log((pair_seen + 1) / (user_seen + len(self.action_counts) + 1))
+
+        features = np.empty((len(frame), len(FEATURE_NAMES)), dtype=np.float64)
+        features[:, 0] = actions / 2 ** 32
+        features[:, 1] = resource_types / 2 ** 32
+        features[:, 2] = np.sin(angle)
+        features[:, 3] = np.cos(angle)
+        features[:, 4] = weekday
+        features[:, 5] = np.log1p(rates)
+        features[:, 6] = action_rarity
+        features[:, 7] = user_action_rarity
+        return features
+
+    def fit_transform(self, frame: pd.DataFrame) -> np.ndarray:
+        return self.fit(frame).transform(frame)
@@ -7,20 +7,32 @@ from typing import Optional, Dict, List
 import joblib
 import os
 
+PRIORITY_MAP = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+# Tasks that count towards the assignee's workload
+ACTIVE_STATUSES = ('pending', 'in_progress')
+
 class PerformancePredictor:
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
         self.model_path = "app/ml/models/performance_model.pkl"
         self.scaler_path = "app/ml/models/scaler.pkl"
+        self._model_mtime = None
         self._load_model()
     
     def _load_model(self):
         """Load pre-trained model if exists"""
         if os.path.exists(self.model_path):
+            self._model_mtime = os.path.getmtime(self.model_path)
             self.model = joblib.load(self.model_path)
             self.scaler = joblib.load(self.scaler_path)
     
+    def refresh(self):
+        """Reload the model if it was retrained elsewhere (e.g. by the job worker)"""
+        if os.path.exists(self.model_path) and os.path.getmtime(self.model_path) != self._model_mtime:
+            self._load_model()
+    
     def _save_model(self):
         """Save trained model"""
         os.makedirs("app/ml/models", exist_ok=True)
@@ -29,38 +41,107 @@ class PerformancePredictor:
     
     def predict_task_delay(self, db, task_id: int) -> Optional[Dict]:
         """Predict if a task will be delayed"""
-        from app.db.models.task import Task
-        
-        task = db.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return None
-        
-        # Extract features from task
-        features = self._extract_task_features(db, task)
-        if features is None:
+        predictions = self.predict_task_delays(db, task_ids=[task_id])
+        if not predictions:
             return None
+        # Echo the id as the caller passed it
+        return dict(predictions[0], task_id=task_id)
+    
+    def predict_task_delays(
+        self,
+        db,
+        task_ids: Optional[List[int]] = None,
+        department: Optional[str] = None,
+        assigned_to: Optional[int] = None,
+        statuses: Optional[List[str]] = None,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """
+        Predict delay risk for many tasks at once, ordered by task id
+        
+        Features for every selected task come from one grouped query and
+        are scored with a single predict_proba call (or the vectorized
+        rule-based fallback). Tasks without created_at are skipped.
+        """
+        task_ids_out, features = self._batch_task_features(db, task_ids, department, assigned_to, statuses, limit)
+        if not task_ids_out:
+            return []
         
-        # If model not trained, use rule-based prediction
         if self.model is None:
-            return self._rule_based_delay_prediction(task, features)
-        
-        # ML-based prediction
-        X = np.array([features]).reshape(1, -1)
-        X_scaled = self.scaler.transform(X)
-        delay_prob = self.model.predict_proba(X_scaled)[0][1]
-        
-        risk_level = "high" if delay_prob > 0.7 else "medium" if delay_prob > 0.4 else "low"
-        delay_days = int(delay_prob * 10)
-        
-        recommendations = self._generate_recommendations(delay_prob, task)
-        
-        return {
-            "task_id": task_id,
-            "delay_risk_score": round(delay_prob, 3),
-            "risk_level": risk_level,
-            "predicted_completion_delay_days": delay_days,
-            "recommendations": recommendations
-        }
+            priority, days_since, workload = features.T
+            scores = np.minimum(1.0, (
+                (priority / 4 * 0.3) +
+                (np.minimum(days_since / 30, 1) * 0.4) +
+                (np.minimum(workload / 10, 1) * 0.3)
+            ))
+            delay_days = (scores * 7).astype(int)
+        else:
+            scores = self.model.predict_proba(self.scaler.transform(features))[:, 1]
+            delay_days = (scores * 10).astype(int)
+        
+        return [
+            {
+                "task_id": task_id,
+                "delay_risk_score": round(float(score), 3),
+                "risk_level": "high" if score > 0.7 else "medium" if score > 0.4 else "low",
+                "predicted_completion_delay_days": int(days),
+                "recommendations": self._generate_recommendations(score, None)
+            }
+            for task_id, score, days in zip(task_ids_out, scores, delay_days)
+        ]
+    
+    def _batch_task_features(self, db, task_ids, department, assigned_to, statuses, limit):
+        """
+        (task ids, feature matrix) for the selected tasks in one round trip
+        
+        Same features as _extract_task_features: the assignees' active
+        workloads are counted in one GROUP BY over just those assignees
+        instead of a COUNT per task.
+        """
+        from sqlalchemy import func, select
+        from app.db.models.task import Task
+        from app.models.user import User
+        
+        criteria = [Task.created_at.isnot(None)]
+        if task_ids is not None:
+            criteria.append(Task.id.in_(task_ids))
+        if department is not None:
+            criteria.append(Task.assigned_to.in_(select(User.id).where(User.department == department)))
+        if assigned_to is not None:
+            criteria.append(Task.assigned_to == assigned_to)
+        if statuses:
+            criteria.append(Task.status.in_(statuses))
+        
+        selected = (
+            select(Task.id, Task.assigned_to, Task.priority, Task.created_at)
+            .where(*criteria)
+            .order_by(Task.id)
+            .limit(limit)
+            .cte("selected")
+        )
+        workload = (
+            select(Task.assigned_to, func.count().label("active_tasks"))
+            .where(Task.status.in_(ACTIVE_STATUSES), Task.assigned_to.in_(select(selected.c.assigned_to)))
+            .group_by(Task.assigned_to)
+            .cte("workload")
+        )
+        rows = db.execute(
+            select(selected, func.coalesce(workload.c.active_tasks, 0).label("active_tasks"))
+            .outerjoin(workload, workload.c.assigned_to == selected.c.assigned_to)
+            .order_by(selected.c.id)
+        ).all()
+        if not rows:
+            return [], np.empty((0, 3))
+        
+        now = np.datetime64(datetime.utcnow(), "us")
+        created_at = np.array([row.created_at for row in rows], dtype="datetime64[us]")
+        features = np.column_stack([
+            [PRIORITY_MAP.get(row.priority, 2) for row in rows],
+            # Whole days, as timedelta.days
+            (now - created_at) // np.timedelta64(1, "D"),
+            [row.active_tasks for row in rows],
+        ]).astype(float)
+        return [row.id for row in rows], features
     
     def predict_user_burnout(self, db, user_id: int) -> Optional[Dict]:
         """Predict user burnout risk"""
@@ -189,6 +270,7 @@ class PerformancePredictor:
         
         # Save model
         self._save_model()
+        self._model_mtime = os.path.getmtime(self.model_path)
         
         accuracy = self.model.score(X_scaled, y)
         
@@ -211,8 +293,7 @@ class PerformancePredictor:
     def _extract_task_features(self, db, task) -> Optional[List[float]]:
         """Extract numerical features from task"""
         try:
-            priority_map = {"low": 1, "medium": 2, "high": 3, "critical": 4}
-            priority = priority_map.get(task.priority, 2)
+            priority = PRIORITY_MAP.get(task.priority, 2)
             
             days_since_creation = (datetime.utcnow() - task.created_at).days
             
@@ -220,34 +301,13 @@ class PerformancePredictor:
             from app.db.models.task import Task
             user_active_tasks = db.query(Task).filter(
                 Task.assigned_to == task.assigned_to,
-                Task.status.in_(['pending', 'in_progress'])
+                Task.status.in_(ACTIVE_STATUSES)
             ).count()
             
             return [priority, days_since_creation, user_active_tasks]
         except:
             return None
     
-    def _rule_based_delay_prediction(self, task, features) -> Dict:
-        """Fallback rule-based prediction"""
-        priority, days_since, workload = features
-        
-        delay_score = min(1.0, (
-            (priority / 4 * 0.3) +
-            (min(days_since / 30, 1) * 0.4) +
-            (min(workload / 10, 1) * 0.3)
-        ))
-        
-        risk_level = "high" if delay_score > 0.7 else "medium" if delay_score > 0.4 else "low"
-        delay_days = int(delay_score * 7)
-        
-        return {
-            "task_id": task.id,
-            "delay_risk_score": round(delay_score, 3),
-            "risk_level": risk_level,
-            "predicted_completion_delay_days": delay_days,
-            "recommendations": self._generate_recommendations(delay_score, task)
-        }
-    
     def _generate_recommendations(self, delay_prob: float, task) -> List[str]:
         """Generate recommendations based on delay probability"""
         recommendations = []
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.db.session import Base
 import enum
@@ -18,13 +18,35 @@ class TaskPriority(str, enum.Enum):
 class Task(Base):
     """Task model"""
     __tablename__ = "tasks"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC; also created_at ranges
+        Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        # Per-assignee counters (productivity scoring, department joins)
+        Index('ix_tasks_assigned_to_status', 'assigned_to', 'status'),
+        # Rollup watermark scans (updated_at > :since)
+        Index('ix_tasks_updated_at', 'updated_at'),
+        # SLA breaches / overdue counts: open tasks by due date
+        Index(
+            'ix_tasks_open_due_date', 'due_date',
+            postgresql_where=text("status <> 'completed'"),
+            sqlite_where=text("status <> 'completed'"),
+        ),
+        # Completions per month: completed tasks by completion time
+        Index(
+            'ix_tasks_completed_updated_at', 'updated_at',
+            postgresql_where=text("status = 'completed'"),
+            sqlite_where=text("status = 'completed'"),
+        ),
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    status = Column(SQLEnum(TaskStatus), default=TaskStatus.pending, nullable=False)
-    priority = Column(SQLEnum(TaskPriority), default=TaskPriority.medium, nullable=False)
+    # Stored as VARCHAR (matches tasks.status/priority); native enums would make
+    # asyncpg cast parameters to a taskstatus type the table doesn't use
+    status = Column(SQLEnum(TaskStatus, native_enum=False, length=20), default=TaskStatus.pending, nullable=False)
+    priority = Column(SQLEnum(TaskPriority, native_enum=False, length=20), default=TaskPriority.medium, nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -0,0 +1,121 @@
+"""
+Access Log Buffer for SmartWork 360
+Collects API access records off the request path and writes them in batches:
+raw rows to api_access_logs and per-minute counters to api_access_rollups
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.models.access_log import APIAccessLog
+from app.db.models.access_rollup import APIAccessRollup
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# (bucket, role, route, method, status)
+RollupKey = Tuple[datetime, str, str, str, int]
+
+
+class AccessLogBuffer:
+    """
+    Bounded, event-loop-side buffer for access records
+
+    record() is called from the middleware on the event loop: it bumps the
+    in-memory minute counter and queues the raw row, dropping it (and
+    counting the drop) when the queue is full rather than making a request
+    wait. run() flushes both every ACCESS_LOG_FLUSH_SECONDS, or sooner once
+    ACCESS_LOG_BATCH_SIZE rows are queued, in a worker thread.
+    """
+
+    def __init__(self, max_queued: Optional[int] = None, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.ACCESS_LOG_BATCH_SIZE
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued or settings.ACCESS_LOG_QUEUE_SIZE)
+        self._counters: Counter = Counter()
+        self._batch_ready = asyncio.Event()
+        self.dropped = 0
+
+    def record(self, role: str, path: str, route: str, method: str, status_code: int) -> None:
+        now = datetime.now(timezone.utc)
+        self._counters[(now.replace(second=0, microsecond=0), role, route, method, status_code)] += 1
+        if not settings.ACCESS_LOG_RAW_ROWS:
+            return
+        try:
+            self._queue.put_nowait({
+                "user_role": role, "path": path, "method": method,
+                "status_code": status_code, "timestamp": now
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def run(self) -> None:
+        """Flush loop (runs for the app's lifetime)"""
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), settings.ACCESS_LOG_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Access log flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Write whatever has accumulated"""
+        self._batch_ready.clear()
+        rows = self._drain()
+        counters, self._counters = self._counters, Counter()
+        if self.dropped:
+            logger.warning(f"Access log queue full: dropped {self.dropped} raw row(s) (rollups still counted)")
+            self.dropped = 0
+        if not rows and not counters:
+            return
+        try:
+            await run_in_threadpool(write_access_batch, rows, counters)
+        except Exception:
+            # Counters are small: keep them for the next flush; the raw rows are lost
+            self._counters.update(counters)
+            raise
+
+    def _drain(self) -> List[Dict]:
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return rows
+
+
+def write_access_batch(rows: List[Dict], counters: Dict[RollupKey, int]) -> None:
+    """One transaction: multi-row insert of raw rows plus an additive upsert of the counters"""
+    with engine.begin() as conn:
+        if rows:
+            conn.execute(insert(APIAccessLog), rows)
+        if counters:
+            # Sorted so concurrent workers lock rollup rows in the same order
+            values = [
+                {"bucket": bucket, "user_role": role, "path": route, "method": method,
+                 "status_code": status_code, "count": count}
+                for (bucket, role, route, method, status_code), count in sorted(counters.items())
+            ]
+            upsert = pg_insert(APIAccessRollup)
+            conn.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=["bucket", "user_role", "path", "method", "status_code"],
+                    set_={"count": APIAccessRollup.count + upsert.excluded.count}
+                ),
+                values
+            )
+
+
+access_log_buffer = AccessLogBuffer()
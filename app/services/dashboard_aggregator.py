@@ -0,0 +1,206 @@
+"""
+Dashboard Aggregation Engine for SmartWork 360
+Computes the admin dashboard from a fixed number of grouped scans of tasks
+instead of one COUNT query per metric and per month
+"""
+from sqlalchemy import func, case, literal, union_all, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+import logging
+
+from app.models.user import User
+from app.models.task import Task
+from app.utils.productivity_formulas import calculate_completion_rate, get_month_range
+
+logger = logging.getLogger(__name__)
+
+TREND_MONTHS = 12
+TREND_TARGET = 85
+DEFAULT_AVG_DELAY = 2.3
+
+
+def get_task_totals(db: Session) -> Dict:
+    """
+    Single scan of tasks returning every status counter and the average delay
+
+    Returns:
+        Dict with total, completed, pending, in_progress and avg_delay_hours
+    """
+    delay_hours = func.extract('epoch', Task.updated_at - Task.due_date) / 3600
+
+    row = db.query(
+        func.count(Task.id).label('total'),
+        func.count(Task.id).filter(Task.status == 'completed').label('completed'),
+        func.count(Task.id).filter(Task.status == 'pending').label('pending'),
+        func.count(Task.id).filter(Task.status == 'in_progress').label('in_progress'),
+        func.avg(delay_hours).filter(
+            Task.status == 'completed',
+            Task.updated_at.isnot(None),
+            Task.due_date.isnot(None),
+            Task.updated_at > Task.due_date
+        ).label('avg_delay_hours'),
+    ).one()
+
+    return {
+        'total': row.total or 0,
+        'completed': row.completed or 0,
+        'pending': row.pending or 0,
+        'in_progress': row.in_progress or 0,
+        'avg_delay_hours': float(row.avg_delay_hours) if row.avg_delay_hours else None,
+    }
+
+
+def get_monthly_counts(db: Session, window_start, window_end) -> Dict[Tuple[int, int], Dict[str, int]]:
+    """
+    Completed and created task counts per calendar month in one round-trip
+
+    Completed tasks are bucketed by updated_at, created tasks by created_at,
+    matching the per-month queries this replaces.
+
+    Returns:
+        Dict keyed by (year, month) with 'completed' and 'created' counts
+    """
+    completed_month = func.date_trunc('month', Task.updated_at)
+    created_month = func.date_trunc('month', Task.created_at)
+
+    completed_q = select(
+        completed_month.label('month'),
+        literal('completed').label('kind'),
+        func.count(Task.id).label('count'),
+    ).where(
+        Task.status == 'completed',
+        Task.updated_at >= window_start,
+        Task.updated_at < window_end
+    ).group_by(completed_month)
+
+    created_q = select(
+        created_month.label('month'),
+        literal('created').label('kind'),
+        func.count(Task.id).label('count'),
+    ).where(
+        Task.created_at >= window_start,
+        Task.created_at < window_end
+    ).group_by(created_month)
+
+    counts: Dict[Tuple[int, int], Dict[str, int]] = {}
+    for month, kind, count in db.execute(union_all(completed_q, created_q)).all():
+        bucket = counts.setdefault((month.year, month.month), {'completed': 0, 'created': 0})
+        bucket[kind] = count
+
+    return counts
+
+
+def get_department_performance(db: Session) -> List[Dict]:
+    """Per-department task totals for active users, sorted by performance"""
+    department_stats = db.query(
+        User.department,
+        func.count(Task.id).label('total_tasks'),
+        func.sum(
+            case((Task.status == 'completed', 1), else_=0)
+        ).label('completed_tasks')
+    ).join(
+        Task, User.id == Task.assigned_to, isouter=True
+    ).filter(
+        User.is_active == True,
+        User.department.isnot(None)
+    ).group_by(User.department).all()
+
+    department_performance = []
+    for stat in department_stats:
+        total = stat.total_tasks or 0
+        completed = stat.completed_tasks or 0
+
+        department_performance.append({
+            'department': stat.department,
+            'performance': calculate_completion_rate(completed, total),
+            'tasks': total,
+            'completed': completed
+        })
+
+    department_performance.sort(key=lambda x: x['performance'], reverse=True)
+    return department_performance
+
+
+def build_productivity_trend(db: Session, months: int = TREND_MONTHS) -> List[Dict]:
+    """Monthly productivity trend for the last `months` months, oldest first"""
+    month_ranges = [get_month_range(i) for i in range(months - 1, -1, -1)]
+    window_start = min(start for start, _ in month_ranges)
+    window_end = max(end for _, end in month_ranges)
+
+    counts = get_monthly_counts(db, window_start, window_end)
+
+    productivity_trend = []
+    for month_start, _ in month_ranges:
+        bucket = counts.get((month_start.year, month_start.month), {})
+        productivity_trend.append({
+            'month': month_start.strftime('%b'),
+            'productivity': calculate_completion_rate(
+                bucket.get('completed', 0), bucket.get('created', 0)
+            ),
+            'target': TREND_TARGET
+        })
+
+    return productivity_trend
+
+
+def build_task_distribution(totals: Dict) -> List[Dict]:
+    """Pie chart slices derived from the status counters in `totals`"""
+    completed_count = totals['completed']
+    in_progress_count = totals['in_progress']
+    pending_count = totals['pending']
+    total_for_distribution = pending_count + in_progress_count + completed_count
+
+    if total_for_distribution == 0:
+        # Fallback with sample data
+        return [
+            {'name': 'Completed', 'value': 65, 'color': '#10B981'},
+            {'name': 'In Progress', 'value': 25, 'color': '#3B82F6'},
+            {'name': 'Pending', 'value': 10, 'color': '#F59E0B'}
+        ]
+
+    return [
+        {
+            'name': 'Completed',
+            'value': round((completed_count / total_for_distribution) * 100, 1),
+            'color': '#10B981'
+        },
+        {
+            'name': 'In Progress',
+            'value': round((in_progress_count / total_for_distribution) * 100, 1),
+            'color': '#3B82F6'
+        },
+        {
+            'name': 'Pending',
+            'value': round((pending_count / total_for_distribution) * 100, 1),
+            'color': '#F59E0B'
+        }
+    ]
+
+
+def build_admin_dashboard(db: Session) -> Dict:
+    """
+    Build the complete /analytics/admin response
+
+    Issues four queries regardless of data size: active employee count,
+    one FILTER-aggregate scan for task totals, one date_trunc GROUP BY for
+    the 12-month trend and one grouped join for department performance.
+    """
+    total_employees = db.query(func.count(User.id)).filter(
+        User.is_active == True
+    ).scalar() or 0
+
+    totals = get_task_totals(db)
+
+    avg_delay = DEFAULT_AVG_DELAY
+    if totals['avg_delay_hours']:
+        avg_delay = round(totals['avg_delay_hours'], 1)
+
+    return {
+        'totalEmployees': total_employees,
+        'activeTasks': totals['pending'] + totals['in_progress'],
+        'productivity': calculate_completion_rate(totals['completed'], totals['total']),
+        'avgDelay': avg_delay,
+        'departmentPerformance': get_department_performance(db),
+        'productivityTrend': build_productivity_trend(db),
+        'taskDistribution': build_task_distribution(totals)
+    }
@@ -0,0 +1,68 @@
+"""
+Data Export for SmartWork 360
+CSV export definitions shared by the streaming endpoints and export jobs
+"""
+from typing import Dict, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.db.models.task import Task
+from app.db.models.audit_log import AuditLog
+
+
+def _task_statement() -> Select:
+    return select(
+        Task.id, Task.title, Task.description, Task.assigned_to,
+        Task.due_date, Task.priority, Task.status, Task.created_at
+    ).order_by(Task.id)
+
+
+def _task_values(task) -> Sequence:
+    return [
+        str(task.id),
+        task.title,
+        task.description,
+        str(task.assigned_to),
+        task.due_date.isoformat() if task.due_date else "",
+        task.priority,
+        task.status,
+        task.created_at.isoformat() if task.created_at else ""
+    ]
+
+
+def _audit_log_statement() -> Select:
+    return select(
+        AuditLog.id, AuditLog.user_id, AuditLog.action,
+        AuditLog.resource_type, AuditLog.resource_id, AuditLog.timestamp
+    ).order_by(AuditLog.id)
+
+
+def _audit_log_values(log) -> Sequence:
+    return [
+        log.id,
+        str(log.user_id),
+        log.action,
+        log.resource_type,
+        log.resource_id,
+        log.timestamp.isoformat() if log.timestamp else ""
+    ]
+
+
+# name -> table, CSV header, statement factory, row formatter, download name
+EXPORTS: Dict[str, Dict] = {
+    "tasks": {
+        "table": "tasks",
+        "header": ["id", "title", "description", "assigned_to", "due_date", "priority", "status", "created_at"],
+        "statement": _task_statement,
+        "to_values": _task_values,
+        "filename": "tasks_export.csv",
+    },
+    "audit_logs": {
+        "table": "audit_logs",
+        "header": ["id", "user_id", "action", "resource_type", "resource_id", "timestamp"],
+        "statement": _audit_log_statement,
+        "to_values": _audit_log_values,
+        "filename": "audit_logs.csv",
+    },
+}
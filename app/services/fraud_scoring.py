@@ -0,0 +1,204 @@
+"""
+Fraud Scoring for SmartWork 360
+Scores audit log entries newer than a watermark with the persisted
+AnomalyDetector and keeps the flagged ones in fraud_alerts
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.audit_log import AuditLog
+from app.db.models.fraud_alert import FraudAlert
+from app.db.models.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "fraud_scoring"
+
+# What the features need (app/ml/audit_features.FEATURE_COLUMNS)...
+FEATURE_COLUMNS = (AuditLog.user_id, AuditLog.action, AuditLog.resource_type, AuditLog.timestamp)
+# ...plus what an alert records
+LOG_COLUMNS = FEATURE_COLUMNS + (AuditLog.id, AuditLog.resource_id, AuditLog.ip_address)
+
+_detector = None
+
+
+def get_detector():
+    """Process-wide AnomalyDetector, reloaded when another process has retrained it"""
+    global _detector
+    from app.ml.anomaly_detector import AnomalyDetector
+
+    if _detector is None:
+        _detector = AnomalyDetector(settings.FRAUD_MODEL_PATH)
+    else:
+        _detector.refresh()
+    return _detector
+
+
+def train_fraud_model(db: Session) -> Dict:
+    """Fit a fresh model on the most recent FRAUD_TRAINING_WINDOW_DAYS of audit logs and persist it"""
+    from app.ml.anomaly_detector import AnomalyDetector
+    from app.ml.audit_features import AuditFeatureEncoder, audit_frame
+
+    window_start = datetime.utcnow() - timedelta(days=settings.FRAUD_TRAINING_WINDOW_DAYS)
+    result = db.execute(
+        select(*FEATURE_COLUMNS)
+        .where(AuditLog.timestamp >= window_start)
+        .order_by(AuditLog.timestamp.desc())
+        .limit(settings.FRAUD_TRAINING_MAX_ROWS)
+    )
+    frame = audit_frame(result, list(result.keys()))
+    db.commit()
+
+    if len(frame) < settings.FRAUD_MIN_TRAINING_ROWS:
+        return {
+            "status": "insufficient_data",
+            "message": f"Need at least {settings.FRAUD_MIN_TRAINING_ROWS} audit entries from the last "
+                       f"{settings.FRAUD_TRAINING_WINDOW_DAYS} days to train",
+            "current_count": len(frame)
+        }
+
+    encoder = AuditFeatureEncoder()
+    # A new instance, so a web process never sees a half-fitted model
+    detector = AnomalyDetector(settings.FRAUD_MODEL_PATH)
+    detector.train(encoder.fit_transform(frame), encoder)
+    detector.save()
+
+    logger.info(f"Fraud model retrained on {len(frame)} audit entries")
+    return {"status": "trained", "samples_trained": len(frame), "model_version": detector.version}
+
+
+def _model_is_stale(detector) -> bool:
+    from app.ml.audit_features import FEATURES_VERSION
+
+    if not detector.trained or detector.trained_at is None:
+        return True
+    if getattr(detector.encoder, "version", None) != FEATURES_VERSION:
+        # Trained on features this code no longer builds
+        return True
+    return datetime.utcnow() - detector.trained_at >= timedelta(hours=settings.FRAUD_RETRAIN_HOURS)
+
+
+def _lock_watermark(db: Session) -> Watermark:
+    """Fetch the scoring watermark row FOR UPDATE, creating it on first use"""
+    db.execute(
+        pg_insert(Watermark).values(name=WATERMARK_NAME, value=None).on_conflict_do_nothing()
+    )
+    return db.query(Watermark).filter(Watermark.name == WATERMARK_NAME).with_for_update().one()
+
+
+def _alert_values(row, score: float, model_version: str, detected_at: datetime) -> Dict:
+    return {
+        "audit_log_id": row.id,
+        "timestamp": row.timestamp,
+        "user_id": row.user_id,
+        "action": row.action,
+        "resource_type": row.resource_type,
+        "resource_id": row.resource_id,
+        "ip_address": row.ip_address,
+        "anomaly_score": float(score),
+        "model_version": model_version,
+        "detected_at": detected_at,
+    }
+
+
+def score_new_logs(db: Session, retrain: bool = False) -> Dict:
+    """
+    Score the audit entries logged since the last run and store the flagged ones
+
+    Retrains first when asked, when no model exists yet, or when the model is
+    older than FRAUD_RETRAIN_HOURS. Entries are read in (timestamp, id)
+    order in batches of FRAUD_SCORING_BATCH_ROWS, selecting only the
+    columns the features and alerts need, and turned into features in one
+    vectorized pass per batch; the entries of the preceding rate window
+    are carried along as context for the per-user rate feature. Only
+    entries older than FRAUD_SCORING_LAG_SECONDS are scored, because the
+    write-behind audit buffer stamps entries before they are committed; as
+    it can hold entries for much longer while the database is unreachable,
+    each run also rescans FRAUD_SCORING_RESCAN_SECONDS behind the
+    watermark. The first run starts FRAUD_TRAINING_WINDOW_DAYS back rather than at the
+    beginning of history. Runs are serialized by a row lock on the
+    watermark. Alerts are unique per audit entry, so re-scoring a range
+    never duplicates them.
+
+    Args:
+        db: Database session (committed on success)
+        retrain: Retrain the model before scoring
+
+    Returns:
+        Dict with entries scored, alerts raised, the new watermark and any retraining result
+    """
+    detector = get_detector()
+    training = None
+    if retrain or _model_is_stale(detector):
+        training = train_fraud_model(db)
+        detector = get_detector()
+        if not detector.trained:
+            return {"status": "insufficient_data", "scored": 0, "alerts": 0, "training": training}
+
+    watermark = _lock_watermark(db)
+    now = datetime.utcnow()
+    until = now - timedelta(seconds=settings.FRAUD_SCORING_LAG_SECONDS)
+    if watermark.value is not None and watermark.value >= until:
+        db.commit()
+        return {"status": "up_to_date", "scored": 0, "alerts": 0, "watermark": watermark.value.isoformat(), "training": training}
+    if watermark.value is None:
+        since = now - timedelta(days=settings.FRAUD_TRAINING_WINDOW_DAYS)
+    else:
+        # Entries committed late land behind the watermark; alerts are unique, so rescoring is harmless
+        since = watermark.value - timedelta(seconds=settings.FRAUD_SCORING_RESCAN_SECONDS)
+
+    import numpy as np
+    import pandas as pd
+    from app.ml.audit_features import audit_frame
+
+    encoder = detector.encoder
+    rate_window = timedelta(seconds=encoder.rate_window)
+    context_result = db.execute(
+        select(*FEATURE_COLUMNS)
+        .where(AuditLog.timestamp > since - rate_window, AuditLog.timestamp <= since)
+    )
+    context = audit_frame(context_result, list(context_result.keys()))
+
+    result = db.execute(
+        select(*LOG_COLUMNS)
+        .where(AuditLog.timestamp > since, AuditLog.timestamp <= until)
+        .order_by(AuditLog.timestamp, AuditLog.id)
+        .execution_options(yield_per=settings.FRAUD_SCORING_BATCH_ROWS)
+    )
+    columns = list(result.keys())
+
+    scored = raised = 0
+    for rows in result.partitions():
+        frame = audit_frame(rows, columns)
+        scores = detector.batch_score(encoder.transform(frame, context))
+        flagged = np.flatnonzero(scores > 0)
+        alerts = [_alert_values(rows[i], scores[i], detector.version, now) for i in flagged]
+        if alerts:
+            db.execute(pg_insert(FraudAlert).on_conflict_do_nothing(), alerts)
+        scored += len(rows)
+        raised += len(alerts)
+
+        # The last rate window's worth of entries, for the next batch
+        recent = frame[context.columns]
+        if len(context):
+            recent = pd.concat([context, recent], ignore_index=True)
+        context = recent[recent["timestamp"] > frame["timestamp"].iloc[-1] - rate_window]
+
+    watermark.value = until
+    db.commit()
+
+    logger.info(f"Fraud scoring: {scored} audit entries scored, {raised} alerts")
+    return {
+        "status": "scored",
+        "scored": scored,
+        "alerts": raised,
+        "watermark": until.isoformat(),
+        "model_version": detector.version,
+        "training": training
+    }
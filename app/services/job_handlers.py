@@ -0,0 +1,189 @@
+"""
+Background Job Handlers for SmartWork 360
+Imports, exports, productivity reports and model training, run by the job
+worker instead of a web request (see app/services/job_queue.py)
+"""
+import logging
+import os
+import re
+
+from sqlalchemy import func, select, table
+
+from app.core.cache import invalidate_tags
+from app.models.user import User
+from app.services.data_export import EXPORTS
+from app.services.fraud_scoring import score_new_logs
+from app.services.job_queue import JobContext, JobError, artifact_dir, job_handler
+from app.services.productivity_calculator import average_score
+from app.services.productivity_rollup import get_rollup_user_scores
+from app.services.task_import import (
+    ImportFormatError,
+    import_tasks,
+    iter_csv_records,
+    iter_xlsx_records,
+)
+from app.utils.csv_stream import gzip_chunks, iter_csv, iter_rows
+from app.utils.productivity_formulas import calculate_completion_rate
+
+logger = logging.getLogger(__name__)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+SAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+# Export progress is written every this many rows (further throttled by the queue)
+EXPORT_PROGRESS_ROWS = 10000
+
+
+@job_handler("import_tasks")
+def run_task_import(ctx: JobContext):
+    """payload: upload (file name inside the job directory), created_by"""
+    path = artifact_dir(ctx.job_id) / ctx.payload["upload"]
+    if not path.exists():
+        raise JobError("Uploaded file is no longer available")
+    size = os.path.getsize(path) or 1
+
+    with open(path, "rb") as upload:
+        if path.suffix.lower() == ".xlsx":
+            records = iter_xlsx_records(upload)
+        else:
+            records = iter_csv_records(upload)
+
+        def report(imported, failed):
+            # Bytes consumed so far is the only total known up front
+            ctx.progress(min(upload.tell() / size, 0.99), f"{imported} imported, {failed} rejected")
+
+        try:
+            result = import_tasks(ctx.db, records, created_by=ctx.payload["created_by"], progress=report)
+        except ImportFormatError as e:
+            raise JobError(str(e))
+
+    if result["imported"]:
+        # Only reaches web workers' caches with the shared (redis) backend
+        invalidate_tags("tasks")
+    return result
+
+
+@job_handler("export_csv")
+def run_csv_export(ctx: JobContext):
+    """payload: export (key of EXPORTS), compress"""
+    spec = EXPORTS.get(ctx.payload.get("export"))
+    if spec is None:
+        raise JobError(f"Unknown export: {ctx.payload.get('export')}")
+
+    total = ctx.db.scalar(select(func.count()).select_from(table(spec["table"]))) or 1
+    ctx.db.commit()
+
+    exported = 0
+
+    def counted(rows):
+        nonlocal exported
+        for row in rows:
+            exported += 1
+            if exported % EXPORT_PROGRESS_ROWS == 0:
+                ctx.progress(min(exported / total, 0.99), f"{exported} rows exported")
+            yield row
+
+    body = iter_csv(counted(iter_rows(spec["statement"]())), spec["header"], spec["to_values"])
+    name, media_type = spec["filename"], "text/csv"
+    if ctx.payload.get("compress"):
+        body, name, media_type = gzip_chunks(body), f"{name}.gz", "application/gzip"
+
+    path = ctx.output_path(name)
+    with open(path, "wb") as out:
+        for chunk in body:
+            out.write(chunk)
+
+    ctx.set_artifact(path, name, media_type)
+    return {"rows": exported, "bytes": os.path.getsize(path)}
+
+
+def _report_generators():
+    try:
+        from app.utils import reports
+    except ImportError as e:
+        raise JobError(f"Report generation requires reportlab and openpyxl ({e})")
+    return reports
+
+
+@job_handler("user_productivity_report")
+def run_user_report(ctx: JobContext):
+    """payload: user_id, format (pdf/excel)"""
+    user_id = ctx.payload["user_id"]
+    report_format = ctx.payload.get("format", "pdf")
+    reports = _report_generators()
+
+    ctx.progress(0.1, "Calculating productivity", force=True)
+    scores = get_rollup_user_scores(ctx.db, User.id == user_id)
+    if user_id not in scores:
+        raise JobError("User not found")
+    user_data = scores[user_id]
+
+    ctx.progress(0.5, "Rendering report", force=True)
+    if report_format == "excel":
+        content = reports.generate_user_productivity_excel(user_data)
+        name, media_type = f"user_productivity_{user_id}.xlsx", XLSX_MEDIA_TYPE
+    else:
+        content = reports.generate_user_productivity_pdf(user_data)
+        name, media_type = f"user_productivity_{user_id}.pdf", "application/pdf"
+
+    path = ctx.output_path(name)
+    path.write_bytes(content)
+    ctx.set_artifact(path, name, media_type)
+    return {"user_id": user_id, "format": report_format}
+
+
+@job_handler("team_productivity_report")
+def run_team_report(ctx: JobContext):
+    """payload: department"""
+    department = ctx.payload["department"]
+    reports = _report_generators()
+
+    ctx.progress(0.1, "Calculating productivity", force=True)
+    team_scores = get_rollup_user_scores(ctx.db, User.department == department, User.is_active == True)
+    if not team_scores:
+        raise JobError(f"No active users found in department: {department}")
+
+    total_tasks = sum(s['total_tasks'] for s in team_scores.values())
+    completed_tasks = sum(s['completed_tasks'] for s in team_scores.values())
+    team_data = {
+        'department': department,
+        'total_employees': len(team_scores),
+        'avg_score': average_score(team_scores),
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'team_completion_rate': calculate_completion_rate(completed_tasks, total_tasks)
+    }
+
+    ctx.progress(0.5, "Rendering report", force=True)
+    content = reports.generate_team_productivity_excel(team_data, list(team_scores.values()))
+
+    name = f"team_productivity_{SAFE_FILENAME.sub('_', department)}.xlsx"
+    path = ctx.output_path(name)
+    path.write_bytes(content)
+    ctx.set_artifact(path, name, XLSX_MEDIA_TYPE)
+    return {"department": department, "employees": len(team_scores)}
+
+
+@job_handler("train_performance_model")
+def run_model_training(ctx: JobContext):
+    """payload: none; the model is saved where PerformancePredictor loads it"""
+    try:
+        from app.ml.performance_predictor import PerformancePredictor
+    except ImportError as e:
+        raise JobError(f"Model training requires the ML dependencies ({e})")
+
+    ctx.progress(0.1, "Training model", force=True)
+    return PerformancePredictor().train_model(ctx.db)
+
+
+@job_handler("score_fraud_alerts")
+def run_fraud_scoring(ctx: JobContext):
+    """payload: retrain (optional); scores audit entries newer than the watermark"""
+    try:
+        from app.ml import anomaly_detector  # noqa: F401
+    except ImportError as e:
+        raise JobError(f"Fraud scoring requires the ML dependencies ({e})")
+
+    ctx.progress(0.1, "Scoring new audit entries", force=True)
+    return score_new_logs(ctx.db, retrain=bool(ctx.payload.get("retrain")))
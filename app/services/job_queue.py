@@ -0,0 +1,397 @@
+"""
+Background Jobs for SmartWork 360
+Durable job queue on the `jobs` table, drained by scripts/run_job_worker.py
+
+Workers claim the oldest runnable row with SELECT ... FOR UPDATE SKIP
+LOCKED, so any number of worker processes can poll the same table without
+blocking each other or running a job twice. A heartbeat thread keeps
+`heartbeat_at` fresh while a handler runs; jobs whose worker died are
+requeued (or failed once out of attempts) by requeue_stale_jobs().
+
+Handlers register with @job_handler("type") and receive a JobContext.
+"""
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Minimum seconds between progress writes from one job
+PROGRESS_INTERVAL = 0.5
+
+# Delay before retrying a failed attempt, multiplied by the attempt number
+RETRY_BACKOFF_SECONDS = 30
+
+_handlers: Dict[str, Callable[["JobContext"], Optional[Dict]]] = {}
+
+
+class JobError(Exception):
+    """Permanent job failure (bad input); reported as-is and never retried"""
+
+
+def job_handler(job_type: str):
+    """Register a function as the handler for `job_type`"""
+    def decorator(func):
+        _handlers[job_type] = func
+        return func
+    return decorator
+
+
+def registered_job_types():
+    return sorted(_handlers)
+
+
+def artifact_dir(job_id: str) -> Path:
+    """Directory holding a job's upload and generated files"""
+    return Path(settings.JOB_ARTIFACT_DIR) / job_id
+
+
+def new_job_id() -> str:
+    return str(uuid.uuid4())
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """What a handler sees: its payload, a session, progress and artifact helpers"""
+
+    def __init__(self, job: Job, db: Session):
+        self.job_id = job.id
+        self.claim = (job.locked_by, job.attempts)
+        self.payload = job.payload or {}
+        self.db = db
+        self.artifact_path: Optional[Path] = None
+        self.artifact_name: Optional[str] = None
+        self.artifact_media_type: Optional[str] = None
+        self._last_progress = 0.0
+
+    def progress(self, fraction: float, message: Optional[str] = None, force: bool = False) -> None:
+        """
+        Record progress (0..1) for pollers
+
+        Written on its own connection so it is visible while the handler's
+        transaction is still open; throttled to one write per PROGRESS_INTERVAL.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        _update_job(
+            self.job_id, claim=self.claim,
+            progress=max(0.0, min(float(fraction), 1.0)), message=message
+        )
+
+    def output_path(self, filename: str) -> Path:
+        """Path for a generated file inside this job's artifact directory"""
+        directory = artifact_dir(self.job_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / filename
+
+    def set_artifact(self, path: Path, name: str, media_type: str) -> None:
+        """Expose a generated file through GET /api/jobs/{id}/download"""
+        self.artifact_path, self.artifact_name, self.artifact_media_type = path, name, media_type
+
+
+def _update_job(job_id: str, claim: Optional[Tuple[str, int]] = None, **values) -> int:
+    """
+    Write `values` to a job row; returns the number of rows matched
+
+    With `claim` = (worker_id, attempt) the write only lands while that
+    worker still holds that attempt, so a run that was declared stale and
+    handed to another worker can no longer overwrite the new run's state.
+    """
+    statement = update(Job).where(Job.id == job_id)
+    if claim is not None:
+        locked_by, attempts = claim
+        statement = statement.where(Job.locked_by == locked_by, Job.attempts == attempts)
+    db = SessionLocal()
+    try:
+        matched = db.execute(statement.values(**values)).rowcount
+        db.commit()
+        return matched
+    finally:
+        db.close()
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = None,
+    created_by: Optional[int] = None,
+    job_id: Optional[str] = None
+) -> Job:
+    """
+    Queue a job for the worker
+
+    Pass `job_id` when files were already staged under artifact_dir(job_id).
+    Raises ValueError for an unknown job type.
+    """
+    if job_type not in _handlers:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    now = datetime.utcnow()
+    job = Job(
+        id=job_id or new_job_id(),
+        type=job_type,
+        status=JOB_QUEUED,
+        payload=payload or {},
+        progress=0.0,
+        attempts=0,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        created_by=created_by,
+        created_at=now,
+        run_after=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"Queued job {job.id} ({job_type})")
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """
+    Atomically take the oldest runnable queued job, or None
+
+    Rows locked by another worker's claim are skipped rather than waited
+    on, so concurrent workers never serialize on the queue head.
+    """
+    now = datetime.utcnow()
+    job = db.execute(
+        select(Job)
+        .where(Job.status == JOB_QUEUED, Job.run_after <= now)
+        .order_by(Job.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = JOB_RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.started_at = now
+    job.heartbeat_at = now
+    job.progress = 0.0
+    job.message = None
+    job.error = None
+    db.commit()
+    return job
+
+
+def _heartbeat(job_id: str, claim: Tuple[str, int], stop: threading.Event) -> None:
+    interval = max(settings.JOB_STALE_AFTER_SECONDS / 3, 1)
+    while not stop.wait(interval):
+        try:
+            _update_job(job_id, claim=claim, heartbeat_at=datetime.utcnow())
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+
+def _discard_files(job_id: str, keep: Optional[Path] = None) -> None:
+    """Remove a finished job's inputs (uploads), keeping only its artifact"""
+    directory = artifact_dir(job_id)
+    if not directory.exists():
+        return
+    for entry in directory.iterdir():
+        if keep is not None and entry == Path(keep):
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)
+    if keep is None:
+        directory.rmdir()
+
+
+def run_job(job_id: str) -> str:
+    """
+    Run a claimed job to completion and record the outcome
+
+    Unexpected exceptions are retried with backoff until max_attempts;
+    JobError fails the job immediately. Returns the final status, or
+    JOB_RUNNING when the claim was lost mid-run (the job was declared stale
+    and requeued); the outcome is then discarded and its files left alone,
+    since they now belong to the other run.
+    """
+    db = SessionLocal()
+    stop = threading.Event()
+    heartbeat = None
+    try:
+        job = db.get(Job, job_id)
+        job_type, attempts, max_attempts = job.type, job.attempts, job.max_attempts
+        handler = _handlers.get(job_type)
+        context = JobContext(job, db)
+        db.commit()  # don't hold the row snapshot open for the whole run
+
+        heartbeat = threading.Thread(target=_heartbeat, args=(job_id, context.claim, stop), daemon=True)
+        heartbeat.start()
+        started = time.monotonic()
+        try:
+            if handler is None:
+                raise JobError(f"No handler registered for job type {job_type}")
+            result = handler(context)
+        except Exception as e:
+            db.rollback()
+            permanent = isinstance(e, JobError) or attempts >= max_attempts
+            if not permanent:
+                logger.warning(f"Job {job_id} attempt {attempts} failed, retrying: {e}", exc_info=True)
+            else:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=not isinstance(e, JobError))
+            values = dict(error=str(e), locked_by=None, heartbeat_at=None)
+            if permanent:
+                values.update(status=JOB_FAILED, finished_at=datetime.utcnow())
+            else:
+                values.update(
+                    status=JOB_QUEUED,
+                    run_after=datetime.utcnow() + timedelta(seconds=RETRY_BACKOFF_SECONDS * attempts),
+                )
+            if not _update_job(job_id, claim=context.claim, **values):
+                logger.warning(f"Job {job_id} attempt {attempts} lost its claim; outcome discarded")
+                return JOB_RUNNING
+            if permanent:
+                _discard_files(job_id)
+            return values["status"]
+
+        finished = _update_job(
+            job_id,
+            claim=context.claim,
+            status=JOB_SUCCEEDED,
+            progress=1.0,
+            message=None,
+            result=result,
+            artifact_path=str(context.artifact_path) if context.artifact_path else None,
+            artifact_name=context.artifact_name,
+            artifact_media_type=context.artifact_media_type,
+            locked_by=None,
+            finished_at=datetime.utcnow(),
+        )
+        if not finished:
+            logger.warning(f"Job {job_id} attempt {attempts} lost its claim; outcome discarded")
+            return JOB_RUNNING
+        _discard_files(job_id, keep=context.artifact_path)
+        logger.info(f"Job {job_id} ({job_type}) succeeded in {time.monotonic() - started:.1f}s")
+        return JOB_SUCCEEDED
+    finally:
+        stop.set()
+        if heartbeat is not None and heartbeat.is_alive():
+            heartbeat.join()
+        db.close()
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """
+    Recover jobs whose worker stopped heartbeating (crash, OOM kill, deploy)
+
+    Requeues them while attempts remain and fails the rest. Returns the
+    number of jobs touched.
+    """
+    now = datetime.utcnow()
+    stale = (
+        (Job.status == JOB_RUNNING) &
+        (Job.heartbeat_at < now - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS))
+    )
+    requeued = db.execute(
+        update(Job).where(stale, Job.attempts < Job.max_attempts)
+        .values(status=JOB_QUEUED, locked_by=None, run_after=now)
+    ).rowcount
+    failed = db.execute(
+        update(Job).where(stale, Job.attempts >= Job.max_attempts)
+        .values(status=JOB_FAILED, locked_by=None, finished_at=now, error="Worker stopped responding")
+    ).rowcount
+    db.commit()
+    if requeued or failed:
+        logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+    return requeued + failed
+
+
+def purge_expired_artifacts(db: Session) -> int:
+    """Delete files of jobs finished more than JOB_ARTIFACT_TTL_HOURS ago"""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_ARTIFACT_TTL_HOURS)
+    job_ids = db.scalars(
+        select(Job.id).where(
+            Job.status.in_([JOB_SUCCEEDED, JOB_FAILED]),
+            Job.finished_at < cutoff,
+            Job.artifact_path.isnot(None),
+        )
+    ).all()
+
+    purged = 0
+    for job_id in job_ids:
+        directory = artifact_dir(job_id)
+        if directory.exists():
+            shutil.rmtree(directory, ignore_errors=True)
+            purged += 1
+    if job_ids:
+        db.execute(
+            update(Job).where(Job.id.in_(job_ids))
+            .values(artifact_path=None, artifact_name=None, artifact_media_type=None)
+        )
+    db.commit()
+    return purged
+
+
+def run_worker(
+    worker_id: Optional[str] = None,
+    stop: Optional[threading.Event] = None,
+    once: bool = False
+) -> None:
+    """
+    Poll the queue until `stop` is set
+
+    Housekeeping (stale-job recovery, artifact purge) runs about once per
+    JOB_STALE_AFTER_SECONDS. With `once`, drains the runnable jobs and returns.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    housekeeping_interval = settings.JOB_STALE_AFTER_SECONDS
+    last_housekeeping = 0.0
+
+    logger.info(f"Job worker {worker_id} started ({', '.join(registered_job_types())})")
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            if time.monotonic() - last_housekeeping >= housekeeping_interval:
+                requeue_stale_jobs(db)
+                purge_expired_artifacts(db)
+                last_housekeeping = time.monotonic()
+            job = claim_next_job(db, worker_id)
+            job_id = job.id if job else None
+        except Exception as e:
+            logger.error(f"Job worker {worker_id} could not poll the queue: {e}")
+            db.rollback()
+            job_id = None
+        finally:
+            db.close()
+
+        if job_id:
+            run_job(job_id)
+        elif once:
+            break
+        else:
+            stop.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+
+    logger.info(f"Job worker {worker_id} stopped")
@@ -0,0 +1,123 @@
+"""
+Productivity Calculator for SmartWork 360
+Set-based per-user scoring: one GROUP BY assigned_to for any number of users
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+from app.models.user import User
+from app.models.task import Task
+from app.utils.productivity_formulas import calculate_completion_rate, calculate_productivity_score
+
+logger = logging.getLogger(__name__)
+
+
+def _task_aggregates(db: Session, users_subquery, now: datetime):
+    """Per-assignee task counters restricted to the users in `users_subquery`"""
+    completion_hours = func.extract('epoch', Task.updated_at - Task.created_at) / 3600
+
+    return db.query(
+        Task.assigned_to.label('user_id'),
+        func.count(Task.id).label('total_tasks'),
+        func.count(Task.id).filter(Task.status == 'completed').label('completed_tasks'),
+        func.count(Task.id).filter(
+            Task.status == 'completed',
+            Task.updated_at <= Task.due_date
+        ).label('on_time_tasks'),
+        func.count(Task.id).filter(
+            Task.status != 'completed',
+            Task.due_date < now
+        ).label('overdue_tasks'),
+        func.avg(completion_hours).filter(
+            Task.status == 'completed',
+            Task.updated_at.isnot(None)
+        ).label('avg_completion_time'),
+    ).filter(
+        Task.assigned_to.in_(users_subquery)
+    ).group_by(Task.assigned_to).subquery()
+
+
+def build_user_score(row) -> Dict:
+    """Apply the productivity formula to one row of aggregated counters"""
+    total_tasks = row.total_tasks or 0
+    completed_tasks = row.completed_tasks or 0
+    on_time_tasks = row.on_time_tasks or 0
+
+    completion_rate = calculate_completion_rate(completed_tasks, total_tasks)
+    on_time_rate = calculate_completion_rate(on_time_tasks, completed_tasks)
+
+    return {
+        'score': calculate_productivity_score(completion_rate, on_time_rate),
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'on_time_tasks': on_time_tasks,
+        'overdue_tasks': row.overdue_tasks or 0,
+        'avg_completion_time': round(float(row.avg_completion_time), 2) if row.avg_completion_time else 0,
+        'completion_rate': completion_rate,
+        'on_time_rate': on_time_rate
+    }
+
+
+def join_user_scores(db: Session, aggregates, *user_filters) -> Dict[int, Dict]:
+    """
+    Outer-join per-user counters onto users and apply the productivity formula
+
+    `aggregates` must expose user_id, total_tasks, completed_tasks,
+    on_time_tasks, overdue_tasks and avg_completion_time columns.
+    """
+    rows = db.query(
+        User.id.label('user_id'),
+        User.full_name,
+        User.email,
+        User.department,
+        aggregates.c.total_tasks,
+        aggregates.c.completed_tasks,
+        aggregates.c.on_time_tasks,
+        aggregates.c.overdue_tasks,
+        aggregates.c.avg_completion_time,
+    ).outerjoin(
+        aggregates, aggregates.c.user_id == User.id
+    ).filter(*user_filters).all()
+
+    scores = {}
+    for row in rows:
+        scores[row.user_id] = {
+            'user_id': row.user_id,
+            'user_name': row.full_name,
+            'email': row.email,
+            'department': row.department,
+            **build_user_score(row)
+        }
+
+    return scores
+
+
+def get_user_scores(db: Session, *user_filters, now: Optional[datetime] = None) -> Dict[int, Dict]:
+    """
+    Score every user matching `user_filters` in a single query
+
+    Args:
+        db: Database session
+        *user_filters: SQLAlchemy criteria on User (e.g. User.is_active == True)
+        now: Reference time for overdue detection (defaults to utcnow)
+
+    Returns:
+        Dict keyed by user id with user details and productivity metrics.
+        Users without tasks are included with zeroed metrics.
+    """
+    now = now or datetime.utcnow()
+
+    users_subquery = db.query(User.id).filter(*user_filters)
+    aggregates = _task_aggregates(db, users_subquery, now)
+
+    return join_user_scores(db, aggregates, *user_filters)
+
+
+def average_score(scores: Dict[int, Dict]) -> float:
+    """Mean productivity score across a batch of user scores"""
+    if not scores:
+        return 0
+    return round(sum(s['score'] for s in scores.values()) / len(scores), 2)
@@ -0,0 +1,205 @@
+"""
+Productivity Rollup for SmartWork 360
+Maintains productivity_scores (one row per user per calendar month) incrementally
+from tasks changed since the last watermark, and serves analytics reads from it
+"""
+from sqlalchemy import func, or_, and_, tuple_, select, insert, update, union, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+
+from app.core.config import settings
+from app.models.task import Task
+from app.db.models.productivity_score import ProductivityScore
+from app.db.models.watermark import Watermark
+from app.services.productivity_calculator import build_user_score, join_user_scores
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "productivity_scores"
+
+
+def _next_month(month_start: datetime) -> datetime:
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def _lock_watermark(db: Session) -> Watermark:
+    """Fetch the rollup watermark row FOR UPDATE, creating it on first use"""
+    db.execute(
+        pg_insert(Watermark).values(name=WATERMARK_NAME, value=None).on_conflict_do_nothing()
+    )
+    return db.query(Watermark).filter(Watermark.name == WATERMARK_NAME).with_for_update().one()
+
+
+def mark_task_bucket_stale(db: Session, task_id: int) -> None:
+    """
+    Flag the bucket a task currently counts towards for the next refresh
+
+    Call before reassigning or deleting the task (in the same transaction):
+    the refresh finds buckets through the tasks changed since the
+    watermark, and afterwards this task no longer leads to its old
+    assignee's bucket. Flagged buckets have calculated_at NULL.
+    """
+    db.execute(
+        update(ProductivityScore)
+        .where(tuple_(ProductivityScore.user_id, ProductivityScore.period_start).in_(
+            select(Task.assigned_to, func.date_trunc('month', Task.created_at)).where(Task.id == task_id)
+        ))
+        .values(calculated_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_productivity_scores(
+    db: Session,
+    full: bool = False,
+    stale_before: Optional[datetime] = None
+) -> Dict:
+    """
+    Recompute productivity_scores rows touched since the last refresh
+
+    A (user, month) bucket is recomputed when any of its tasks was created or
+    updated after the watermark, or became overdue since then, or when it
+    was flagged by mark_task_bucket_stale (a task left it). Buckets are
+    keyed by the month of the task's created_at. Task timestamps are taken
+    before their transaction commits, so a task can become visible with a
+    timestamp older than the watermark: each refresh therefore looks back
+    PRODUCTIVITY_ROLLUP_LAG_SECONDS before it (recomputing a bucket twice
+    is harmless). Refreshes are serialized by a row lock on the watermark,
+    so concurrent workers never double-insert.
+
+    Args:
+        db: Database session (committed on success)
+        full: Ignore the watermark and rebuild every bucket
+        stale_before: Skip the refresh if, once the lock is held, the
+            watermark is already newer than this (another worker refreshed)
+
+    Returns:
+        Dict with the number of buckets refreshed and the new watermark
+    """
+    now = datetime.utcnow()
+    watermark = _lock_watermark(db)
+    since = None if full else watermark.value
+
+    if since is not None and stale_before is not None and since >= stale_before:
+        db.commit()
+        return {"buckets_refreshed": 0, "watermark": since.isoformat(), "full": False}
+    if since is not None:
+        since -= timedelta(seconds=settings.PRODUCTIVITY_ROLLUP_LAG_SECONDS)
+
+    month = func.date_trunc('month', Task.created_at)
+    changed = Task.assigned_to.isnot(None)
+    if since is not None:
+        changed = and_(changed, or_(
+            Task.created_at > since,
+            Task.updated_at > since,
+            and_(Task.due_date > since, Task.due_date <= now, Task.status != 'completed')
+        ))
+
+    affected = union(
+        select(Task.assigned_to.label('user_id'), month.label('period_start')).where(changed),
+        select(ProductivityScore.user_id, ProductivityScore.period_start).where(
+            ProductivityScore.calculated_at.is_(None)
+        )
+    ).subquery()
+
+    completion_hours = func.extract('epoch', Task.updated_at - Task.created_at) / 3600
+    rows = db.query(
+        Task.assigned_to.label('user_id'),
+        month.label('period_start'),
+        func.count(Task.id).label('total_tasks'),
+        func.count(Task.id).filter(Task.status == 'completed').label('completed_tasks'),
+        func.count(Task.id).filter(
+            Task.status == 'completed',
+            Task.updated_at <= Task.due_date
+        ).label('on_time_tasks'),
+        func.count(Task.id).filter(
+            Task.status != 'completed',
+            Task.due_date < now
+        ).label('overdue_tasks'),
+        func.avg(completion_hours).filter(
+            Task.status == 'completed',
+            Task.updated_at.isnot(None)
+        ).label('avg_completion_time'),
+    ).join(
+        affected,
+        and_(affected.c.user_id == Task.assigned_to, affected.c.period_start == month)
+    ).group_by(Task.assigned_to, month).all()
+
+    if full:
+        db.query(ProductivityScore).delete(synchronize_session=False)
+    else:
+        db.query(ProductivityScore).filter(
+            tuple_(ProductivityScore.user_id, ProductivityScore.period_start).in_(
+                select(affected.c.user_id, affected.c.period_start)
+            )
+        ).delete(synchronize_session=False)
+
+    if rows:
+        db.execute(insert(ProductivityScore), [
+            {
+                'user_id': row.user_id,
+                'score': build_user_score(row)['score'],
+                'total_tasks': row.total_tasks,
+                'completed_tasks': row.completed_tasks,
+                'on_time_tasks': row.on_time_tasks,
+                'overdue_tasks': row.overdue_tasks,
+                'avg_completion_time': float(row.avg_completion_time) if row.avg_completion_time is not None else None,
+                'period_start': row.period_start,
+                'period_end': _next_month(row.period_start),
+                'calculated_at': now,
+            }
+            for row in rows
+        ])
+
+    watermark.value = now
+    db.commit()
+
+    logger.info(f"Productivity rollup refreshed {len(rows)} buckets (full={full})")
+    return {"buckets_refreshed": len(rows), "watermark": now.isoformat(), "full": full}
+
+
+def ensure_productivity_scores_fresh(db: Session, max_age: Optional[timedelta] = None) -> None:
+    """Run an incremental refresh if the rollup is older than `max_age`"""
+    if max_age is None:
+        max_age = timedelta(seconds=settings.PRODUCTIVITY_ROLLUP_MAX_AGE_SECONDS)
+
+    last_refresh = db.query(Watermark.value).filter(
+        Watermark.name == WATERMARK_NAME
+    ).scalar()
+
+    stale_before = datetime.utcnow() - max_age
+    if last_refresh is None or last_refresh < stale_before:
+        refresh_productivity_scores(db, stale_before=stale_before)
+
+
+def get_rollup_user_scores(db: Session, *user_filters, max_age: Optional[timedelta] = None) -> Dict[int, Dict]:
+    """
+    Same result as get_user_scores(), read from productivity_scores
+
+    Sums the monthly buckets per user, so cost grows with users x months
+    rather than with task history. Refreshes first if the rollup is stale.
+    """
+    ensure_productivity_scores_fresh(db, max_age)
+
+    completed_with_avg = case(
+        (ProductivityScore.avg_completion_time.isnot(None), ProductivityScore.completed_tasks),
+        else_=0
+    )
+    aggregates = db.query(
+        ProductivityScore.user_id.label('user_id'),
+        func.sum(ProductivityScore.total_tasks).label('total_tasks'),
+        func.sum(ProductivityScore.completed_tasks).label('completed_tasks'),
+        func.sum(ProductivityScore.on_time_tasks).label('on_time_tasks'),
+        func.sum(ProductivityScore.overdue_tasks).label('overdue_tasks'),
+        (
+            func.sum(ProductivityScore.avg_completion_time * completed_with_avg)
+            / func.nullif(func.sum(completed_with_avg), 0)
+        ).label('avg_completion_time'),
+    ).group_by(ProductivityScore.user_id).subquery()
+
+    return join_user_scores(db, aggregates, *user_filters)
@@ -0,0 +1,323 @@
+"""
+Bulk Task Import for SmartWork 360
+Streams CSV/XLSX uploads row by row, validates each row, and inserts valid
+rows in batches (COPY on PostgreSQL, executemany elsewhere). Invalid rows
+are reported individually and never abort the import; a batch the database
+rejects is split until the offending rows are isolated.
+"""
+import csv
+import io
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models.task import Task
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+COPY_CHUNK_SIZE = 1024 * 1024  # bytes per COPY data message (psycopg2 default is 8 KB)
+
+VALID_PRIORITIES = {"low", "medium", "high"}
+VALID_STATUSES = {"pending", "in_progress", "completed"}
+
+COPY_COLUMNS = (
+    "title", "description", "assigned_to", "due_date", "priority", "status",
+    "created_by", "created_at", "updated_at",
+)
+
+
+class ImportFormatError(ValueError):
+    """The upload itself is unreadable (wrong type, missing header, ...)"""
+
+
+def iter_csv_records(fileobj: IO[bytes]) -> Iterator[Dict[str, str]]:
+    """Header-keyed rows of a CSV upload, decoded incrementally"""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFormatError("CSV file has no header row")
+        yield from reader
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("CSV file must be UTF-8 encoded") from e
+    finally:
+        text.detach()
+
+
+def iter_xlsx_records(fileobj: IO[bytes]) -> Iterator[Dict[str, object]]:
+    """Header-keyed rows of the first worksheet, read in openpyxl read-only mode"""
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise ImportFormatError("XLSX import requires the openpyxl package") from e
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFormatError("XLSX file has no header row")
+        header = [str(name).strip() if name is not None else "" for name in header]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _text(value) -> str:
+    if value.__class__ is str:
+        return value.strip()
+    return "" if value is None else str(value).strip()
+
+
+def _parse_due_date(value) -> Optional[datetime]:
+    if value is not None and not isinstance(value, datetime):
+        value = _text(value)
+        value = datetime.fromisoformat(value) if value else None
+    if value is not None and value.tzinfo is not None:
+        # tasks.due_date is naive UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_user_id(value) -> Optional[int]:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"assigned_to must be a user id, got {value!r}")
+
+
+def validate_record(record: Dict, user_ids: set) -> Tuple:
+    """
+    Turn one upload row into insert values (COPY_COLUMNS order, minus audit
+    columns); raises ValueError with a user-facing message
+    """
+    title = _text(record.get("title"))
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > 255:
+        raise ValueError("title is longer than 255 characters")
+
+    assigned_to = _parse_user_id(record.get("assigned_to"))
+    if assigned_to is not None and assigned_to not in user_ids:
+        raise ValueError(f"assigned_to user {assigned_to} does not exist")
+
+    try:
+        due_date = _parse_due_date(record.get("due_date"))
+    except ValueError:
+        raise ValueError(f"due_date must be ISO 8601, got {record.get('due_date')!r}")
+
+    priority = _text(record.get("priority")).lower() or "medium"
+    if priority not in VALID_PRIORITIES:
+        raise ValueError(f"priority must be one of {sorted(VALID_PRIORITIES)}")
+
+    status = _text(record.get("status")).lower() or "pending"
+    if status not in VALID_STATUSES:
+        raise ValueError(f"status must be one of {sorted(VALID_STATUSES)}")
+
+    return title, _text(record.get("description")), assigned_to, due_date, priority, status
+
+
+def _csv_payload(rows: List[Tuple]) -> io.StringIO:
+    """Serialize a batch for COPY ... FORMAT csv"""
+    buffer = io.StringIO()
+    # csv writes None as an empty unquoted field, which COPY reads as NULL
+    # (description is forced non-null so '' stays '')
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_batch(db: Session, payload: io.StringIO) -> None:
+    """COPY a serialized batch into tasks through the session's psycopg2 connection"""
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN "
+            "WITH (FORMAT csv, FORCE_NOT_NULL (description))",
+            payload,
+            size=COPY_CHUNK_SIZE
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_payload(rows: List[Tuple]) -> List[Dict]:
+    return [dict(zip(COPY_COLUMNS, row)) for row in rows]
+
+
+def _insert_batch(db: Session, payload: List[Dict]) -> None:
+    """executemany fallback for databases without COPY"""
+    db.execute(insert(Task.__table__), payload)
+
+
+def _is_row_error(db: Session, error: Exception) -> bool:
+    """Whether a failed write was caused by the data (constraint, type, length) rather than the connection"""
+    dbapi = db.get_bind().dialect.dbapi
+    # COPY runs on the raw DBAPI cursor, so its errors arrive unwrapped
+    original = getattr(error, "orig", error)
+    return isinstance(original, (dbapi.IntegrityError, dbapi.DataError))
+
+
+def _write_isolating(db: Session, row_numbers: List[int], rows: List[Tuple], serialize, write_batch, report) -> int:
+    """
+    Write rows in halves, each in its own savepoint, down to single rows
+
+    Only the rows the database rejects on their own are reported; a batch
+    with k bad rows costs about 2k log2(batch size) extra writes. Returns
+    the number of rows written.
+    """
+    mid = len(rows) // 2
+    written = 0
+    for numbers, part in ((row_numbers[:mid], rows[:mid]), (row_numbers[mid:], rows[mid:])):
+        try:
+            with db.begin_nested():
+                write_batch(db, serialize(part))
+            written += len(part)
+        except Exception as e:
+            if len(part) > 1 and _is_row_error(db, e):
+                written += _write_isolating(db, numbers, part, serialize, write_batch, report)
+            else:
+                for row_number in numbers:
+                    report(row_number, f"rejected by database: {str(e).splitlines()[0]}")
+    return written
+
+
+def _produce_batches(records, user_ids, extra, serialize, batch_size, out: queue.Queue, cancelled: threading.Event) -> None:
+    """
+    Validate and serialize batches on a worker thread
+
+    Runs while the caller's thread is inside COPY (which releases the GIL),
+    so parsing overlaps with server-side inserts. Puts
+    ("batch", row_numbers, rows, payload), ("error", row_number, message),
+    ("failed", exception) and finally ("done",). The rows are kept so a
+    rejected batch can be re-serialized in parts.
+    """
+    try:
+        row_numbers: List[int] = []
+        rows: List[Tuple] = []
+        for row_number, record in enumerate(records, start=2):
+            if cancelled.is_set():
+                return
+            try:
+                values = validate_record(record, user_ids)
+            except ValueError as e:
+                out.put(("error", row_number, str(e)))
+                continue
+            row_numbers.append(row_number)
+            rows.append(values + extra)
+            if len(rows) >= batch_size:
+                out.put(("batch", row_numbers, rows, serialize(rows)))
+                row_numbers, rows = [], []
+        if rows:
+            out.put(("batch", row_numbers, rows, serialize(rows)))
+    except Exception as e:
+        out.put(("failed", e))
+    finally:
+        out.put(("done",))
+
+
+def import_tasks(
+    db: Session,
+    records: Iterator[Dict],
+    created_by: int,
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict:
+    """
+    Validate and insert task rows in batches
+
+    Parsing/validation runs one batch ahead on a worker thread while the
+    previous batch is written. Each batch runs in its own savepoint. When
+    the database rejects a batch over its data (IntegrityError/DataError),
+    it is retried in halves down to single rows and only the rows that
+    still fail are reported; any other database error rejects the whole
+    batch. Row numbers count the header as row 1, matching what users
+    see in a spreadsheet. `progress(imported, failed)` is called after
+    every batch.
+
+    Returns:
+        Dict with imported/failed counts and the first MAX_REPORTED_ERRORS errors
+    """
+    user_ids = set(db.scalars(select(User.id)))
+    if db.get_bind().dialect.name == "postgresql":
+        serialize, write_batch = _csv_payload, _copy_batch
+    else:
+        serialize, write_batch = _insert_payload, _insert_batch
+    now = datetime.utcnow()
+
+    imported = 0
+    failed = 0
+    errors: List[Dict] = []
+
+    def report(row_number, message):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": message})
+
+    # Bounded so at most a couple of batches are held in memory
+    batches: queue.Queue = queue.Queue(maxsize=2)
+    cancelled = threading.Event()
+    producer = threading.Thread(
+        target=_produce_batches,
+        args=(records, user_ids, (created_by, now, now), serialize, batch_size, batches, cancelled),
+        daemon=True,
+    )
+    producer.start()
+
+    producer_error = None
+    try:
+        while True:
+            item = batches.get()
+            kind = item[0]
+            if kind == "done":
+                break
+            if kind == "failed":
+                producer_error = item[1]
+            elif kind == "error":
+                report(item[1], item[2])
+            elif producer_error is None:
+                _, row_numbers, rows, payload = item
+                try:
+                    with db.begin_nested():
+                        write_batch(db, payload)
+                    imported += len(row_numbers)
+                except Exception as e:
+                    logger.warning(f"Import batch starting at row {row_numbers[0]} failed: {e}")
+                    if _is_row_error(db, e):
+                        imported += _write_isolating(db, row_numbers, rows, serialize, write_batch, report)
+                    else:
+                        for row_number in row_numbers:
+                            report(row_number, f"batch rejected by database: {str(e).splitlines()[0]}")
+                if progress:
+                    progress(imported, failed)
+    finally:
+        # If we bailed out early, unblock the producer so it can exit
+        cancelled.set()
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+
+    if producer_error is not None:
+        raise producer_error
+
+    db.commit()
+    logger.info(f"Imported {imported} tasks ({failed} rejected)")
+    return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,209 @@
+"""
+Task Search for SmartWork 360
+Ranked full-text search over task title/description with highlighting
+
+- PostgreSQL: weighted tsvector (title A, description B) matched through a
+  GIN expression index (ix_tasks_search), ranked with ts_rank and
+  highlighted with ts_headline
+- SQLite: FTS5 external-content table (tasks_fts) kept in sync by
+  triggers, ranked with bm25 (local testing)
+- Anything else: ILIKE fallback, unranked
+"""
+import html
+import logging
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event, func, literal, literal_column, table, column, tuple_, bindparam, Double, Float, String
+from sqlalchemy.orm import Query, Session
+
+from app.models.task import Task
+from app.utils.pagination import encode_token, decode_token
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+MAX_TERMS = 16
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# The database wraps matches in these control characters rather than in
+# HTML, so render_highlight() can escape the task text first and only then
+# turn them into HIGHLIGHT_START/STOP
+MATCH_START = "\x02"
+MATCH_STOP = "\x03"
+
+# Must stay identical to the ix_tasks_search index expression for the
+# planner to use the index
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('{config}', coalesce({prefix}title, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({prefix}description, '')), 'B')"
+)
+
+POSTGRES_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin (("
+    + SEARCH_DOCUMENT_SQL.format(config=SEARCH_CONFIG, prefix="")
+    + "))"
+)
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+_tasks_fts = table("tasks_fts", column("rowid"))
+_sqlite_fts_ready = False
+
+
+def install_search_index(connection) -> None:
+    """Create the dialect's search index on `tasks` (idempotent)"""
+    global _sqlite_fts_ready
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        connection.exec_driver_sql(POSTGRES_INDEX_DDL)
+    elif dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+        ).scalar()
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            # Index rows that predate the FTS table
+            connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+        _sqlite_fts_ready = True
+
+
+@event.listens_for(Task.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
+
+
+def search_terms(search: str) -> List[str]:
+    """Word tokens of a user query (punctuation and operators dropped)"""
+    return re.findall(r"[^\W_]+", search.lower())[:MAX_TERMS]
+
+
+def apply_search(db: Session, query: Query, search: str) -> Tuple[Query, Any, Any, Any]:
+    """
+    Restrict a Task query to rows matching `search`
+
+    Returns:
+        (query, rank, title_highlight, description_highlight) where the last
+        three are SQL expressions (higher rank = better match); highlights
+        are raw text marked with MATCH_START/STOP, see render_highlight()
+    """
+    terms = search_terms(search)
+    dialect = db.get_bind().dialect.name
+
+    if terms and dialect == "postgresql":
+        config = literal_column(f"'{SEARCH_CONFIG}'")
+        document = literal_column(SEARCH_DOCUMENT_SQL.format(config=SEARCH_CONFIG, prefix="tasks."))
+        # Every term must match; the last one as a prefix for search-as-you-type
+        tsquery = func.to_tsquery(
+            config, bindparam("tsquery", " & ".join(terms[:-1] + [f"{terms[-1]}:*"]), type_=String)
+        )
+        query = query.filter(document.op("@@")(tsquery))
+        options = f"StartSel={MATCH_START}, StopSel={MATCH_STOP}"
+        # float8 so the rank round-trips exactly through the cursor
+        rank = func.ts_rank(document, tsquery).cast(Double)
+        title_highlight = func.ts_headline(config, Task.title, tsquery, f"{options}, HighlightAll=true")
+        description_highlight = func.ts_headline(
+            config, func.coalesce(Task.description, ""), tsquery,
+            f"{options}, MaxFragments=2, MaxWords=20, MinWords=5"
+        )
+        return query, rank, title_highlight, description_highlight
+
+    if terms and dialect == "sqlite":
+        if not _sqlite_fts_ready:
+            install_search_index(db.connection())
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        query = query.join(_tasks_fts, _tasks_fts.c.rowid == Task.id).filter(
+            literal_column("tasks_fts").op("MATCH")(bindparam("fts_match", match))
+        )
+        rank = literal_column("-bm25(tasks_fts, 10.0, 1.0)", type_=Float)
+        title_highlight = literal_column(
+            f"highlight(tasks_fts, 0, '{MATCH_START}', '{MATCH_STOP}')"
+        )
+        description_highlight = literal_column(
+            f"snippet(tasks_fts, 1, '{MATCH_START}', '{MATCH_STOP}', '...', 16)"
+        )
+        return query, rank, title_highlight, description_highlight
+
+    query = query.filter(
+        (Task.title.ilike(f"%{search}%")) |
+        (Task.description.ilike(f"%{search}%"))
+    )
+    # Cast so the constant rank is an expression (bare constants are invalid in ORDER BY)
+    return query, literal(0.0).cast(Double), Task.title, Task.description
+
+
+def render_highlight(value: Optional[str]) -> Optional[str]:
+    """
+    HTML for a highlight column: the task text escaped, matches in <mark>
+
+    Titles and descriptions are user input, so they are escaped before any
+    markup is added; a highlight is never sent to clients unrendered.
+    """
+    if value is None:
+        return None
+    return (
+        html.escape(value)
+        .replace(MATCH_START, HIGHLIGHT_START)
+        .replace(MATCH_STOP, HIGHLIGHT_STOP)
+    )
+
+
+def search_task_page(
+    db: Session,
+    query: Query,
+    search: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str], Query]:
+    """
+    One page of ranked search results (best match first, then newest id)
+
+    The cursor carries the last row's (rank, id), so later pages continue
+    strictly below it.
+
+    Returns:
+        (rows, next_cursor, filtered_query); each row exposes .Task, .rank,
+        .title_highlight and .description_highlight (pass the latter two
+        through render_highlight()). filtered_query is the unordered match
+        query, for counting.
+    """
+    query, rank, title_highlight, description_highlight = apply_search(db, query, search)
+
+    page = query.add_columns(
+        rank.label("rank"),
+        title_highlight.label("title_highlight"),
+        description_highlight.label("description_highlight"),
+    )
+    if cursor:
+        after = decode_token(cursor)
+        try:
+            page = page.filter(tuple_(rank, Task.id) < tuple_(float(after["r"]), int(after["i"])))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+    elif skip:
+        page = page.offset(skip)
+
+    rows = page.order_by(rank.desc(), Task.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None, query
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_token({"r": last.rank, "i": last.Task.id}), query
@@ -0,0 +1,279 @@
+"""
+Traffic Analyzer for SmartWork 360
+Sliding-window request rates per user and per client IP, kept in count-min
+sketches with top-k heavy hitters, and burst detection against each key's baseline
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+DIMENSIONS = ("user", "ip")
+
+
+def sketch_cells(key: str, width: int, depth: int) -> Tuple[int, ...]:
+    """
+    Column of `key` in each sketch row (double hashing over one blake2b digest)
+
+    Unlike hash(), stable across processes and restarts.
+    """
+    digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), "little")
+    h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+    return tuple((h1 + row * h2) % width for row in range(depth))
+
+
+class CountMinSketch:
+    """depth x width counters; estimates never undercount and overcount by at most e/width of the total"""
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def add(self, cells: Tuple[int, ...], count: int = 1) -> None:
+        for row, cell in zip(self.rows, cells):
+            row[cell] += count
+
+    def estimate(self, cells: Tuple[int, ...]) -> int:
+        return min(row[cell] for row, cell in zip(self.rows, cells))
+
+    def subtract(self, other: "CountMinSketch") -> None:
+        for row, other_row in zip(self.rows, other.rows):
+            row[:] = [a - b for a, b in zip(row, other_row)]
+
+    def clear(self) -> None:
+        for row in self.rows:
+            row[:] = [0] * self.width
+
+
+class SlidingWindowTracker:
+    """
+    Request counts for one dimension (users or IPs) over a short and a baseline window
+
+    Time is cut into slices of `slice_seconds`, each with its own sketch in
+    a ring covering the baseline window. Two running totals, for the short
+    window and for the baseline window, are updated on every hit and have
+    expiring slices subtracted as time advances, so both counting and
+    querying cost O(depth) regardless of traffic. The top-k keys in the
+    short window are tracked alongside as heavy-hitter candidates.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int,
+        baseline_seconds: int,
+        slice_seconds: int,
+        width: int,
+        depth: int,
+        top_k: int
+    ):
+        self.slice_seconds = slice_seconds
+        self.window_slices = max(1, window_seconds // slice_seconds)
+        self.baseline_slices = max(self.window_slices + 1, baseline_seconds // slice_seconds)
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+
+        self._slices = [CountMinSketch(width, depth) for _ in range(self.baseline_slices)]
+        self._window = CountMinSketch(width, depth)
+        self._baseline = CountMinSketch(width, depth)
+        self._current: Optional[int] = None
+        # key -> short-window estimate, at most top_k entries
+        self._top: Dict[str, int] = {}
+        self._top_floor = 0
+
+    @property
+    def window_seconds(self) -> int:
+        return self.window_slices * self.slice_seconds
+
+    @property
+    def baseline_seconds(self) -> int:
+        return self.baseline_slices * self.slice_seconds
+
+    def hit(self, key: str, now: float) -> Tuple[int, float]:
+        """Count one request; returns (short-window count, expected count from the baseline)"""
+        self._advance(now)
+        cells = sketch_cells(key, self.width, self.depth)
+        # One pass over the three sketches (this runs on every request)
+        count = baseline_count = None
+        rows = zip(self._slices[self._current % self.baseline_slices].rows, self._window.rows, self._baseline.rows)
+        for (slice_row, window_row, baseline_row), cell in zip(rows, cells):
+            slice_row[cell] += 1
+            window_row[cell] += 1
+            baseline_row[cell] += 1
+            if count is None or window_row[cell] < count:
+                count = window_row[cell]
+            if baseline_count is None or baseline_row[cell] < baseline_count:
+                baseline_count = baseline_row[cell]
+
+        self._track_top(key, count)
+        return count, self._expected(count, baseline_count)
+
+    def heavy_hitters(self, now: float, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        self._advance(now)
+        return sorted(self._top.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def _expected(self, window_count: int, baseline_count: int) -> float:
+        # Rate over the part of the baseline before the short window, scaled to the short window
+        history_slices = self.baseline_slices - self.window_slices
+        return max(baseline_count - window_count, 0) * self.window_slices / history_slices
+
+    def _track_top(self, key: str, count: int) -> None:
+        if key in self._top:
+            self._top[key] = count
+            return
+        if len(self._top) < self.top_k:
+            self._top[key] = count
+            if len(self._top) == self.top_k:
+                self._top_floor = min(self._top.values())
+            return
+        # The floor only goes stale upwards (tracked counts grow), so it is a cheap pre-check
+        if count <= self._top_floor:
+            return
+        smallest = min(self._top, key=self._top.get)
+        self._top_floor = self._top[smallest]
+        if count <= self._top_floor:
+            return
+        del self._top[smallest]
+        self._top[key] = count
+        self._top_floor = min(self._top.values())
+
+    def _advance(self, now: float) -> None:
+        index = int(now // self.slice_seconds)
+        if self._current is None:
+            self._current = index
+            return
+        if index <= self._current:
+            return
+
+        if index - self._current >= self.baseline_slices:
+            # Idle for longer than the baseline window: everything has expired
+            for sketch in self._slices:
+                sketch.clear()
+            self._window.clear()
+            self._baseline.clear()
+        else:
+            for step in range(self._current + 1, index + 1):
+                self._window.subtract(self._slices[(step - self.window_slices) % self.baseline_slices])
+                expiring = self._slices[step % self.baseline_slices]
+                self._baseline.subtract(expiring)
+                expiring.clear()
+        self._current = index
+
+        # Candidates' counts only fall as slices expire: re-estimate them
+        for key in list(self._top):
+            count = self._window.estimate(sketch_cells(key, self.width, self.depth))
+            if count:
+                self._top[key] = count
+            else:
+                del self._top[key]
+        self._top_floor = min(self._top.values()) if len(self._top) >= self.top_k else 0
+
+
+class TrafficAnalyzer:
+    """
+    Per-process burst detector fed by AccessLoggerMiddleware
+
+    A key (user id or client IP) is flagged when its count over the short
+    window reaches its share of TRAFFIC_BURST_MIN_REQUESTS and
+    TRAFFIC_BURST_FACTOR times what its baseline rate predicts. Flagged
+    bursts are kept in a bounded, most-recent-first table. Memory is fixed
+    by the sketch size, top-k and TRAFFIC_MAX_ANOMALIES, and no request
+    touches the database. Each of the `workers` processes (default
+    WEB_CONCURRENCY) sees roughly an equal share of the traffic, so the
+    deployment-wide minimum is divided between them; the burst factor is a
+    ratio and needs no scaling.
+    """
+
+    def __init__(
+        self,
+        window_seconds: Optional[int] = None,
+        baseline_seconds: Optional[int] = None,
+        slice_seconds: Optional[int] = None,
+        width: Optional[int] = None,
+        depth: Optional[int] = None,
+        top_k: Optional[int] = None,
+        min_requests: Optional[int] = None,
+        burst_factor: Optional[float] = None,
+        max_anomalies: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        self.workers = max(workers or settings.WEB_CONCURRENCY, 1)
+        self.min_requests = math.ceil((min_requests or settings.TRAFFIC_BURST_MIN_REQUESTS) / self.workers)
+        self.burst_factor = burst_factor or settings.TRAFFIC_BURST_FACTOR
+        self.max_anomalies = max_anomalies or settings.TRAFFIC_MAX_ANOMALIES
+        self.trackers = {
+            dimension: SlidingWindowTracker(
+                window_seconds or settings.TRAFFIC_WINDOW_SECONDS,
+                baseline_seconds or settings.TRAFFIC_BASELINE_SECONDS,
+                slice_seconds or settings.TRAFFIC_SLICE_SECONDS,
+                width or settings.TRAFFIC_SKETCH_WIDTH,
+                depth or settings.TRAFFIC_SKETCH_DEPTH,
+                top_k or settings.TRAFFIC_TOP_K
+            )
+            for dimension in DIMENSIONS
+        }
+        self._anomalies: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        # observe() runs on the event loop, snapshot() in the threadpool
+        self._lock = threading.Lock()
+
+    def observe(self, user_id: Optional[str], ip: Optional[str], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            if user_id:
+                self._hit("user", user_id, now)
+            if ip:
+                self._hit("ip", ip, now)
+
+    def _hit(self, dimension: str, key: str, now: float) -> None:
+        count, expected = self.trackers[dimension].hit(key, now)
+        if count < self.min_requests or count < self.burst_factor * expected:
+            return
+
+        anomaly = self._anomalies.pop((dimension, key), None)
+        if anomaly is None:
+            anomaly = {"dimension": dimension, "key": key, "first_seen": now, "peak_count": 0}
+        anomaly["last_seen"] = now
+        anomaly["window_count"] = count
+        anomaly["expected_count"] = round(expected, 1)
+        anomaly["peak_count"] = max(anomaly["peak_count"], count)
+        self._anomalies[(dimension, key)] = anomaly
+        if len(self._anomalies) > self.max_anomalies:
+            self._anomalies.popitem(last=False)
+
+    def snapshot(self, top: int = 10, now: Optional[float] = None) -> Dict:
+        """Flagged bursts (most recent first) and the current heavy hitters per dimension"""
+        now = time.time() if now is None else now
+        tracker = self.trackers[DIMENSIONS[0]]
+        with self._lock:
+            anomalies = [dict(anomaly) for anomaly in reversed(self._anomalies.values())]
+            heavy_hitters = {
+                dimension: self.trackers[dimension].heavy_hitters(now, top) for dimension in DIMENSIONS
+            }
+
+        for anomaly in anomalies:
+            anomaly["active"] = now - anomaly["last_seen"] < tracker.window_seconds
+            anomaly["first_seen"] = _timestamp(anomaly["first_seen"])
+            anomaly["last_seen"] = _timestamp(anomaly["last_seen"])
+
+        return {
+            "window_seconds": tracker.window_seconds,
+            "baseline_seconds": tracker.baseline_seconds,
+            "workers": self.workers,
+            "min_requests_per_worker": self.min_requests,
+            "anomalies": anomalies,
+            "top_users": [{"user_id": key, "count": count} for key, count in heavy_hitters["user"]],
+            "top_ips": [{"ip": key, "count": count} for key, count in heavy_hitters["ip"]],
+        }
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+traffic_analyzer = TrafficAnalyzer()
@@ -1,26 +1,199 @@
+import datetime
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DisconnectionError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session
+
+from app.core.config import settings
 from app.db.models.audit_log import AuditLog
-from typing import Optional, Dict, Any
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Caused by a row's values: retry the batch row by row and drop only the bad rows
+ROW_ERRORS = (IntegrityError, DataError)
+# Database unreachable or overloaded: keep the batch and retry it later
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, PoolTimeoutError)
+
+# First wait before retrying a batch the database couldn't take (doubles up to AUDIT_RETRY_MAX_BACKOFF_SECONDS)
+RETRY_INITIAL_BACKOFF_SECONDS = 0.5
+
+
+class AuditBuffer:
+    """
+    Write-behind buffer for audit log rows
+
+    Entries are queued in memory (bounded by AUDIT_BUFFER_MAX_ENTRIES) and
+    a writer thread inserts them with one multi-row INSERT per batch, as
+    soon as AUDIT_FLUSH_MAX_ROWS are waiting or AUDIT_FLUSH_INTERVAL_MS
+    after the first one arrived. Callers never wait for a commit unless
+    they ask for a durable write, which also flushes its batch at once.
+    While the database is unreachable the writer holds on to the batch and
+    retries it with exponential backoff; entries keep queueing behind it.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        flush_rows: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None
+    ):
+        self.flush_rows = flush_rows or settings.AUDIT_FLUSH_MAX_ROWS
+        self.flush_interval = (flush_interval_ms or settings.AUDIT_FLUSH_INTERVAL_MS) / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max_entries or settings.AUDIT_BUFFER_MAX_ENTRIES)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, values: Dict[str, Any], durable: bool = False) -> Future:
+        """Queue one row; the future resolves once its batch is committed"""
+        future: Future = Future()
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((future, values, durable))
+        except queue.Full:
+            # Buffer full (database slow or down): write inline rather than grow or drop
+            try:
+                self._write_batch([(future, values, durable)])
+            except TRANSIENT_ERRORS as e:
+                logger.error(f"Audit log write failed with the buffer full: {e}")
+                future.set_exception(e)
+        return future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush everything already queued, then stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            stopping = item is _STOP
+            batch: List[Tuple[Future, Dict, bool]] = [] if stopping else [item]
+            flush_now = stopping or item[2]
+            deadline = time.monotonic() + self.flush_interval
+            while not flush_now and len(batch) < self.flush_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = flush_now = True
+                else:
+                    batch.append(item)
+                    flush_now = item[2]
+            if stopping:
+                # Drain without waiting out the interval
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+            if batch:
+                self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: List[Tuple[Future, Dict, bool]]) -> None:
+        """Write a batch, backing off and retrying it for as long as the database is unreachable"""
+        backoff = RETRY_INITIAL_BACKOFF_SECONDS
+        while batch:
+            try:
+                self._write_batch(batch)
+                return
+            except TRANSIENT_ERRORS as e:
+                # Rows written before the error (row-by-row retry) are already resolved
+                batch = [item for item in batch if not item[0].done()]
+                logger.warning(f"Audit database unavailable, retrying {len(batch)} entries in {backoff:.1f}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, settings.AUDIT_RETRY_MAX_BACKOFF_SECONDS)
+            except Exception as e:
+                logger.error(f"Audit batch of {len(batch)} failed: {e}")
+                for future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+    def _write_batch(self, batch: List[Tuple[Future, Dict, bool]]) -> None:
+        """Insert a batch and resolve its futures; TRANSIENT_ERRORS propagate with the unwritten futures pending"""
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog), [values for _, values, _ in batch])
+        except ROW_ERRORS as e:
+            if len(batch) == 1:
+                logger.error(f"Audit log write failed: {e}")
+                batch[0][0].set_exception(e)
+                return
+            # One bad row (e.g. unknown user_id) must not lose the rest of the batch
+            logger.warning(f"Audit batch of {len(batch)} failed, retrying row by row: {e}")
+            for item in batch:
+                self._write_batch([item])
+            return
+
+        for future, _, _ in batch:
+            future.set_result(None)
+
+
+audit_buffer = AuditBuffer()
+
 
 def log_action(
-    db: Session,
+    db: Optional[Session],
     user_id: str,
     action: str,
     resource_type: str,
     resource_id: str,
     details: Optional[Dict[Any, Any]] = None,
-    ip_address: Optional[str] = None
+    ip_address: Optional[str] = None,
+    durable: bool = False
 ):
-    """Helper function to create audit log entries"""
-    
-    audit_log = AuditLog(
-        user_id=user_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        details=details,
-        ip_address=ip_address
-    )
-    db.add(audit_log)
-    db.commit()
-    return audit_log
+    """
+    Helper function to create audit log entries
+
+    The entry is written behind by `audit_buffer`, outside the caller's
+    transaction (`db` is no longer added to or committed). Pass
+    durable=True for critical actions: the call then returns only after the
+    entry's batch has been committed and raises if it could not be.
+    """
+    values = {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": details,
+        "ip_address": ip_address,
+        # Stamped now, not when the batch lands
+        "timestamp": datetime.datetime.utcnow()
+    }
+
+    if not settings.AUDIT_BUFFER_ENABLED:
+        with engine.begin() as conn:
+            conn.execute(insert(AuditLog), [values])
+        return values
+
+    future = audit_buffer.submit(values, durable)
+    if durable:
+        future.result(timeout=settings.AUDIT_DURABLE_TIMEOUT_SECONDS)
+    return values
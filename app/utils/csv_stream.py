@@ -0,0 +1,67 @@
+"""
+Streaming CSV Export for SmartWork 360
+Writes CSV incrementally from a server-side cursor so memory stays flat
+regardless of table size, optionally gzip-compressing on the fly
+"""
+import csv
+import zlib
+from io import StringIO
+from typing import Callable, Iterable, Iterator, Sequence
+
+from sqlalchemy.sql import Select
+
+from app.db.session import SessionLocal
+
+# Rows fetched per server-side cursor round-trip
+YIELD_PER = 2000
+
+# Flush the CSV buffer to the client once it grows past this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_rows(statement: Select, yield_per: int = YIELD_PER) -> Iterator:
+    """
+    Iterate a SELECT through a server-side cursor (psycopg2 named cursor)
+
+    Opens its own session: FastAPI tears down request dependencies before a
+    StreamingResponse body finishes, so the generator must own its session.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=yield_per))
+        for row in result:
+            yield row
+    finally:
+        db.close()
+
+
+def iter_csv(
+    rows: Iterable,
+    header: Sequence[str],
+    to_values: Callable[[object], Sequence],
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Encode rows as CSV, yielding UTF-8 chunks of roughly `chunk_size` bytes"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(to_values(row))
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally (a complete .gz member)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
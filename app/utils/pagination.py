@@ -0,0 +1,138 @@
+"""
+Pagination Helpers for SmartWork 360
+Keyset (cursor) pagination on (created_at, id) and cheap row-count estimates
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query, Session
+
+
+def encode_token(payload: Dict[str, Any]) -> str:
+    """Opaque URL-safe token for a small JSON payload"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Inverse of encode_token(); raises ValueError on a malformed token"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid pagination cursor")
+    return payload
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Opaque cursor token pointing just past (created_at, id)"""
+    return encode_token({"c": created_at.isoformat() if created_at else None, "i": row_id})
+
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of encode_cursor(); raises ValueError on a malformed token"""
+    payload = decode_token(token)
+    try:
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def paginate_keyset(
+    query: Query,
+    created_at_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Newest-first page of `query` after `cursor`
+
+    Rows are ordered by (created_at DESC, id DESC) and the cursor turns into
+    a row-value comparison, so each page is an index range scan no matter
+    how deep the client has scrolled. Rows without created_at come last,
+    ordered by id.
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    after = decode_cursor(cursor) if cursor else None
+    rows: List[Any] = []
+
+    if after is None or after[0] is not None:
+        dated = query.filter(created_at_column.isnot(None))
+        if after is not None:
+            dated = dated.filter(tuple_(created_at_column, id_column) < tuple_(*after))
+        rows = dated.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        undated = query.filter(created_at_column.is_(None))
+        if after is not None and after[0] is None:
+            undated = undated.filter(id_column < after[1])
+        rows += undated.order_by(id_column.desc()).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
+
+
+def estimate_table_rows(db: Session, table_name: str) -> Optional[int]:
+    """
+    Planner's row estimate for a whole table (pg_class.reltuples)
+
+    Returns None off Postgres or when the table has never been analyzed.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    reltuples = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    ).scalar()
+    return reltuples if reltuples is not None and reltuples >= 0 else None
+
+
+def estimate_query_rows(db: Session, query: Query) -> Optional[int]:
+    """
+    Planner's row estimate for a filtered query (EXPLAIN, not executed)
+
+    Returns None off Postgres.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(db: Session, query: Query, mode: str, table_name: Optional[str] = None) -> Tuple[Optional[int], bool]:
+    """
+    Total row count for `query` by mode: "exact", "estimated" or "none"
+
+    Estimates use pg_class for an unfiltered table (`table_name` given) and
+    EXPLAIN otherwise, falling back to an exact COUNT when unavailable.
+
+    Returns:
+        (total, is_estimate)
+    """
+    if mode == "none":
+        return None, False
+
+    if mode == "estimated":
+        estimate = estimate_table_rows(db, table_name) if table_name else estimate_query_rows(db, query)
+        if estimate is not None:
+            return estimate, True
+
+    return query.order_by(None).count(), False
@@ -0,0 +1,29 @@
+"""
+Productivity Formulas for SmartWork 360
+Shared helpers used by analytics endpoints and services
+"""
+from datetime import datetime, timedelta
+
+
+def calculate_completion_rate(completed: int, total: int) -> float:
+    """Calculate completion rate percentage"""
+    return round((completed / total * 100) if total > 0 else 0, 1)
+
+
+def get_month_range(months_ago: int) -> tuple:
+    """Get start and end dates for a month in the past"""
+    now = datetime.utcnow()
+    month_date = now - timedelta(days=30 * months_ago)
+    month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    if month_start.month == 12:
+        month_end = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        month_end = month_start.replace(month=month_start.month + 1)
+
+    return month_start, month_end
+
+
+def calculate_productivity_score(completion_rate: float, on_time_rate: float) -> float:
+    """Weighted productivity score: 60% completion rate, 40% on-time rate"""
+    return round((completion_rate * 0.6) + (on_time_rate * 0.4), 2)
@@ -0,0 +1,117 @@
+"""
+Block sealing microbenchmark for SmartWork 360
+
+Seals the same synthetic blocks with each strategy in app/blockchain/sealing.py
+and with the original re-serialize-every-nonce loop, checks that every
+strategy produces hashes the verifier accepts (and that midstate PoW finds
+the same nonce and hash as the original loop), and prints seals per second.
+Needs no database.
+
+Usage:
+    python scripts/benchmark_block_sealing.py
+    python scripts/benchmark_block_sealing.py --difficulty 4 --blocks 20
+    python scripts/benchmark_block_sealing.py --workers 8
+"""
+import sys
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.blockchain.sealing import (
+    HmacSealer,
+    ProcessPoolProofOfWorkSealer,
+    ProofOfWorkSealer,
+    chain_proof,
+    verify_seal,
+)
+
+
+class LegacySealer:
+    """The original loop: json.dumps + sha256 of the whole block per nonce"""
+    method = "pow"
+
+    def __init__(self, difficulty: int):
+        self.difficulty = difficulty
+
+    def seal(self, block_data):
+        nonce = 0
+        while True:
+            block_string = json.dumps({**block_data, "nonce": nonce}, sort_keys=True)
+            block_hash = hashlib.sha256(block_string.encode()).hexdigest()
+            if block_hash.startswith("0" * self.difficulty):
+                return nonce, block_hash, chain_proof(block_hash, block_data["previous_hash"])
+            nonce += 1
+
+
+def make_blocks(count: int):
+    previous_hash = "0" * 64
+    blocks = []
+    for i in range(count):
+        blocks.append({
+            "previous_hash": previous_hash,
+            "timestamp": datetime(2024, 1, 1, 0, 0, i % 60).isoformat(),
+            "action": "task_update",
+            "user_id": i % 50,
+            "entity_type": "task",
+            "entity_id": i,
+            "details": {"status": "completed", "note": "benchmark block", "index": i},
+        })
+        previous_hash = hashlib.sha256(str(i).encode()).hexdigest()
+    return blocks
+
+
+def run(name: str, sealer, blocks, hmac_key: bytes, difficulty: int):
+    began = time.perf_counter()
+    seals = [sealer.seal(block) for block in blocks]
+    elapsed = time.perf_counter() - began
+    valid = all(
+        verify_seal(block, nonce, block_hash, proof, sealer.method, hmac_key, difficulty)
+        for block, (nonce, block_hash, proof) in zip(blocks, seals)
+    )
+    print(f"   {name:<10} {len(blocks) / elapsed:>10.1f} seals/s  ({elapsed * 1000 / len(blocks):.2f} ms/block)"
+          f"  {'✅' if valid else '❌ failed verification'}")
+    return seals, valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Block sealing microbenchmark")
+    parser.add_argument("--difficulty", type=int, default=2, help="Leading zero hex digits for PoW")
+    parser.add_argument("--blocks", type=int, default=200, help="Blocks sealed per strategy")
+    parser.add_argument("--workers", type=int, default=0, help="pow_pool processes (0 = CPU count)")
+    args = parser.parse_args()
+
+    blocks = make_blocks(args.blocks)
+    hmac_key = b"benchmark-key"
+    print(f"📊 Sealing {args.blocks} blocks at difficulty {args.difficulty}")
+
+    legacy, legacy_valid = run("legacy", LegacySealer(args.difficulty), blocks, hmac_key, args.difficulty)
+    midstate, midstate_valid = run("pow", ProofOfWorkSealer(args.difficulty), blocks, hmac_key, args.difficulty)
+
+    pool_sealer = ProcessPoolProofOfWorkSealer(args.difficulty, args.workers or None)
+    try:
+        pool_sealer.seal(blocks[0])  # start the pool outside the timing
+        pooled, pool_valid = run("pow_pool", pool_sealer, blocks, hmac_key, args.difficulty)
+    finally:
+        pool_sealer.shutdown()
+
+    _, hmac_valid = run("hmac", HmacSealer(hmac_key), blocks, hmac_key, args.difficulty)
+
+    ok = legacy_valid and midstate_valid and pool_valid and hmac_valid
+    if legacy == midstate == pooled:
+        print("✅ pow and pow_pool match the original loop nonce-for-nonce")
+    else:
+        ok = False
+        print("❌ pow/pow_pool disagree with the original loop")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
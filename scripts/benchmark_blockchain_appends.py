@@ -0,0 +1,147 @@
+"""
+Blockchain append concurrency benchmark for SmartWork 360
+
+Hammers the audit chain from several processes (like gunicorn workers),
+each with several threads, then checks that the chain stayed linear: every
+new block's previous_hash is the hash of the block before it and no two
+blocks share a parent. Writes real blocks, so point DATABASE_URL at a
+scratch database (or pass --cleanup).
+
+Usage:
+    python scripts/benchmark_blockchain_appends.py
+    python scripts/benchmark_blockchain_appends.py --mode session      # one transaction per append
+    python scripts/benchmark_blockchain_appends.py --processes 8 --threads 16 --appends 100
+    python scripts/benchmark_blockchain_appends.py --cleanup           # delete the benchmark's blocks afterwards
+"""
+import sys
+import argparse
+import multiprocessing
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, select, delete
+
+from app.db.session import SessionLocal, engine
+from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
+from app.db.models.blockchain_checkpoint import BlockchainCheckpoint
+from app.blockchain.audit_chain import BlockchainAudit
+from app.blockchain.appender import BlockAppender
+
+
+def run_process(mode: str, threads: int, appends: int, process_index: int, start) -> None:
+    engine.dispose(close=False)  # never share the parent's connections
+    chain = BlockchainAudit()
+    appender = BlockAppender(chain) if mode == "appender" else None
+
+    def run_thread(thread_index: int):
+        db = SessionLocal() if mode == "session" else None
+        try:
+            for n in range(appends):
+                details = {"process": process_index, "thread": thread_index, "n": n}
+                if appender:
+                    appender.append("benchmark", 0, "benchmark", n, details)
+                else:
+                    chain.add_block(db, "benchmark", 0, "benchmark", n, details)
+        finally:
+            if db is not None:
+                db.close()
+
+    workers = [threading.Thread(target=run_thread, args=(i,)) for i in range(threads)]
+    start.wait()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if appender:
+        appender.stop()
+
+
+def check_linear(db, start_id: int, start_hash: str):
+    """(new blocks, broken links, parents shared by several blocks)"""
+    rows = db.execute(
+        select(BlockModel.block_hash, BlockModel.previous_hash)
+        .where(BlockModel.id > start_id).order_by(BlockModel.id)
+    ).all()
+    broken = 0
+    expected_previous = start_hash
+    for block_hash, previous_hash in rows:
+        if previous_hash != expected_previous:
+            broken += 1
+        expected_previous = block_hash
+    shared_parents = db.execute(
+        select(func.count()).select_from(
+            select(BlockModel.previous_hash)
+            .where(BlockModel.id > start_id)
+            .group_by(BlockModel.previous_hash)
+            .having(func.count() > 1)
+            .subquery()
+        )
+    ).scalar()
+    return len(rows), broken, shared_parents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent blockchain append benchmark")
+    parser.add_argument("--mode", choices=["appender", "session"], default="appender",
+                        help="appender: group commit via BlockAppender; session: add_block per call")
+    parser.add_argument("--processes", type=int, default=4, help="Writer processes (gunicorn workers)")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent requests per process")
+    parser.add_argument("--appends", type=int, default=50, help="Appends per thread")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the benchmark's blocks afterwards")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    head = db.query(BlockModel).order_by(BlockModel.id.desc()).first()
+    start_id = head.id if head else 0
+    start_hash = head.block_hash if head else "0" * 64
+    db.close()
+
+    total = args.processes * args.threads * args.appends
+    print(f"📊 {args.mode}: {args.processes} processes x {args.threads} threads x {args.appends} appends = {total}")
+
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    processes = [
+        context.Process(target=run_process, args=(args.mode, args.threads, args.appends, i, start))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(2)  # let every process import the app before the clock starts
+    began = time.perf_counter()
+    start.set()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - began
+
+    db = SessionLocal()
+    try:
+        written, broken, shared_parents = check_linear(db, start_id, start_hash)
+        print(f"   {written} blocks in {elapsed:.2f}s ({written / elapsed:.0f} appends/s)")
+
+        failed = [process for process in processes if process.exitcode != 0]
+        if written != total or failed:
+            print(f"❌ Expected {total} blocks, got {written} ({len(failed)} process(es) failed)")
+        if broken or shared_parents:
+            print(f"❌ Chain forked: {broken} broken link(s), {shared_parents} parent(s) with several children")
+        else:
+            print("✅ Chain is linear (no forks)")
+
+        if args.cleanup:
+            db.execute(delete(BlockchainCheckpoint).where(BlockchainCheckpoint.last_block_id > start_id))
+            db.execute(delete(BlockModel).where(BlockModel.id > start_id))
+            db.commit()
+            print(f"🧹 Deleted {written} benchmark blocks")
+    finally:
+        db.close()
+
+    if broken or shared_parents or written != total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
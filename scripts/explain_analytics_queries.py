@@ -0,0 +1,167 @@
+"""
+EXPLAIN the analytics queries for SmartWork 360
+
+Runs each analytics code path against the configured PostgreSQL database,
+captures the SQL it issues, and reports for every statement whether the
+plan uses an index or falls back to a sequential scan of a hot table.
+Everything runs in a transaction that is rolled back, so the rollup
+refresh leaves no trace.
+
+Usage:
+    python scripts/explain_analytics_queries.py
+    python scripts/explain_analytics_queries.py --no-seqscan   # can an index serve it at all?
+    python scripts/explain_analytics_queries.py --analyze      # real timings
+    python scripts/explain_analytics_queries.py --strict       # exit 1 on unexpected seq scans
+"""
+import sys
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+from app.models.user import User
+from app.models.task import Task
+from app.services.dashboard_aggregator import (
+    get_task_totals,
+    get_monthly_counts,
+    get_department_performance,
+)
+from app.services.productivity_calculator import get_user_scores
+from app.services.productivity_rollup import refresh_productivity_scores, get_rollup_user_scores
+
+# Tables whose sequential scans are worth flagging
+HOT_TABLES = {"tasks", "productivity_scores"}
+
+
+def _sla_breaches(db: Session):
+    # Mirrors GET /analytics/sla-breaches
+    db.execute(
+        select(Task, User).join(User, Task.assigned_to == User.id).where(
+            Task.status != 'completed',
+            Task.due_date < datetime.utcnow()
+        )
+    ).all()
+
+
+def _department_totals(db: Session, department: str):
+    # Mirrors GET /analytics/department/{name}
+    dept_users = select(User.id).where(User.department == department, User.is_active == True)
+    db.execute(
+        select(
+            func.count(Task.id).label('total'),
+            func.count(Task.id).filter(Task.status == 'completed').label('completed'),
+        ).where(Task.assigned_to.in_(dept_users))
+    ).one()
+
+
+def build_checks(db: Session) -> List[Tuple[str, Callable[[], object], bool]]:
+    """(name, code path, full_scan_expected) for every analytics query"""
+    department = db.query(User.department).filter(User.department.isnot(None)).limit(1).scalar() or ""
+    now = datetime.utcnow()
+    window_start = (now - timedelta(days=180)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    return [
+        # Whole-table aggregates: a seq scan is the right plan
+        ("dashboard.task_totals", lambda: get_task_totals(db), True),
+        ("dashboard.department_performance", lambda: get_department_performance(db), True),
+        ("scores.organization", lambda: get_user_scores(db, User.is_active == True), True),
+        ("rollup.full_refresh", lambda: refresh_productivity_scores(db, full=True), True),
+        # Selective predicates: should be index-served on a large table
+        ("dashboard.monthly_counts", lambda: get_monthly_counts(db, window_start, now), False),
+        ("scores.team", lambda: get_user_scores(db, User.department == department), False),
+        ("rollup.incremental_refresh", lambda: refresh_productivity_scores(db), False),
+        ("rollup.team_scores", lambda: get_rollup_user_scores(db, User.department == department), False),
+        ("analytics.sla_breaches", lambda: _sla_breaches(db), False),
+        ("analytics.department_totals", lambda: _department_totals(db, department), False),
+    ]
+
+
+def walk_plan(node: Dict, indexes: set, seq_scans: set) -> None:
+    if node.get("Index Name"):
+        indexes.add(node["Index Name"])
+    if node.get("Node Type") == "Seq Scan":
+        seq_scans.add(node.get("Relation Name"))
+    for child in node.get("Plans", []):
+        walk_plan(child, indexes, seq_scans)
+
+
+def explain(connection, statement: str, params, analyze: bool) -> Dict:
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN ({options}) {statement}", params)
+        return cursor.fetchone()[0][0]
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report index usage of analytics queries")
+    parser.add_argument("--no-seqscan", action="store_true", help="Discourage seq scans (enable_seqscan = off)")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the queries)")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 if a selective query seq-scans a hot table")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ EXPLAIN report needs PostgreSQL (got {engine.dialect.name})")
+        sys.exit(1)
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Service commits become savepoint releases; the outer rollback undoes them
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    captured: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    failures = 0
+    try:
+        if args.no_seqscan:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for name, run, full_scan_expected in build_checks(db):
+            captured.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                run()
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+
+            print(f"\n📊 {name}")
+            for number, (statement, params) in enumerate(captured, 1):
+                plan = explain(connection, statement, params, args.analyze)
+                indexes, seq_scans = set(), set()
+                walk_plan(plan["Plan"], indexes, seq_scans)
+                hot_seq_scans = seq_scans & HOT_TABLES
+
+                timing = f", {plan['Execution Time']:.1f} ms" if args.analyze else ""
+                summary = f"cost {plan['Plan']['Total Cost']:.0f}{timing}"
+                if hot_seq_scans and not full_scan_expected:
+                    failures += 1
+                    print(f"   ⚠️  [{number}] seq scan on {', '.join(sorted(hot_seq_scans))} ({summary})")
+                elif hot_seq_scans:
+                    print(f"   ➖ [{number}] seq scan on {', '.join(sorted(hot_seq_scans))}, expected ({summary})")
+                else:
+                    print(f"   ✅ [{number}] {', '.join(sorted(indexes)) or 'no hot-table scan'} ({summary})")
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+    print(f"\n{'⚠️ ' if failures else '✅'} {failures} selective statement(s) without an index")
+    if failures and args.strict:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
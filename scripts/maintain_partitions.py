@@ -0,0 +1,97 @@
+"""
+Maintain the monthly log partitions for SmartWork 360
+
+Creates partitions PARTITION_PREMAKE_MONTHS ahead for audit_logs and
+api_access_logs, and archives partitions older than each table's retention
+(AUDIT_LOG_RETENTION_MONTHS, ACCESS_LOG_RETENTION_MONTHS) to
+PARTITION_ARCHIVE_DIR/<table>/<partition>.csv.gz before dropping them. Run
+daily from cron; it is idempotent.
+
+Usage:
+    python scripts/maintain_partitions.py
+    python scripts/maintain_partitions.py --dry-run
+    python scripts/maintain_partitions.py --table api_access_logs --retain-months 1
+    python scripts/maintain_partitions.py --detach-only     # keep expired partitions as standalone tables
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+from app.db.partitions import (
+    PARTITIONED_TABLES,
+    archive_partition,
+    default_partition_name,
+    detach_partition,
+    ensure_partitions,
+    expired_partitions,
+    retention_months,
+)
+
+
+def maintain_table(table: str, args) -> None:
+    retain = args.retain_months if args.retain_months is not None else retention_months(table)
+
+    with engine.begin() as conn:
+        if args.dry_run:
+            created = []
+        else:
+            created = ensure_partitions(conn, table, args.months_ahead)
+        expired = expired_partitions(conn, table, retain)
+        strays = conn.execute(text(f'SELECT count(*) FROM "{default_partition_name(table)}"')).scalar()
+
+    print(f"📊 {table}: {len(created)} partition(s) created, {len(expired)} past {retain} month retention")
+    for name in created:
+        print(f"   + {name}")
+    if strays:
+        print(f"   ⚠️  {strays} row(s) in {default_partition_name(table)} (outside every monthly partition)")
+
+    for name in expired:
+        if args.dry_run:
+            print(f"   would {'detach' if args.detach_only else 'archive'} {name}")
+            continue
+        # One transaction per partition, so a failure leaves the others done
+        with engine.begin() as conn:
+            if args.detach_only:
+                detach_partition(conn, table, name)
+                print(f"   - detached {name}")
+            else:
+                path = archive_partition(conn, table, name, args.archive_dir)
+                print(f"   - archived {name} -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-create and retire monthly log partitions")
+    parser.add_argument("--table", choices=sorted(PARTITIONED_TABLES), help="Only this table (default: all)")
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_PREMAKE_MONTHS,
+                        help="Monthly partitions to keep ready ahead of today")
+    parser.add_argument("--retain-months", type=int, default=None,
+                        help="Override the table's retention setting")
+    parser.add_argument("--archive-dir", default=settings.PARTITION_ARCHIVE_DIR,
+                        help="Where expired partitions are written")
+    parser.add_argument("--detach-only", action="store_true",
+                        help="Detach expired partitions instead of archiving and dropping them")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    args = parser.parse_args()
+
+    failed = False
+    for table in ([args.table] if args.table else PARTITIONED_TABLES):
+        try:
+            maintain_table(table, args)
+        except Exception as e:
+            print(f"❌ {table}: {e}")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Partition maintenance complete")
+
+
+if __name__ == "__main__":
+    main()
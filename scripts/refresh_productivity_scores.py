@@ -0,0 +1,39 @@
+"""
+Refresh the productivity_scores rollup for SmartWork 360
+
+Run from cron for a scheduled refresh, or with --full after changing tasks
+outside the API (e.g. bulk reassignments in SQL), which bypasses the
+stale-bucket flags the task endpoints set.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.productivity_rollup import refresh_productivity_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh productivity_scores rollup")
+    parser.add_argument("--full", action="store_true", help="Rebuild every bucket")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        result = refresh_productivity_scores(db, full=args.full)
+        print(f"✅ Refreshed {result['buckets_refreshed']} buckets")
+        print(f"   Watermark: {result['watermark']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Background job worker for SmartWork 360
+
+Drains the `jobs` table (imports, exports, reports, model training) so web
+requests only enqueue and poll. Run as many workers as you like; they
+claim jobs with FOR UPDATE SKIP LOCKED and never pick the same one.
+
+Usage:
+    python scripts/run_job_worker.py
+    python scripts/run_job_worker.py --once        # drain runnable jobs and exit
+    python scripts/run_job_worker.py --worker-id worker-1
+"""
+import sys
+import argparse
+import logging
+import signal
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services import job_handlers  # noqa: F401  (registers the job types)
+from app.services.job_queue import run_worker, default_worker_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the background job worker")
+    parser.add_argument("--once", action="store_true", help="Exit once no job is runnable")
+    parser.add_argument("--worker-id", default=None, help="Name recorded on claimed jobs (default host:pid)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    stop = threading.Event()
+
+    def shutdown(signum, frame):
+        # Finish the current job, then exit; a hard kill is recovered via heartbeats
+        print("🛑 Stopping after the current job...")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    worker_id = args.worker_id or default_worker_id()
+    print(f"✅ Job worker {worker_id} polling every {settings.JOB_POLL_INTERVAL_SECONDS}s")
+    run_worker(worker_id=worker_id, stop=stop, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
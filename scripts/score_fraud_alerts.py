@@ -0,0 +1,59 @@
+"""
+Score new audit log entries for fraud alerts for SmartWork 360
+
+Scores the audit entries logged since the last run with the persisted
+fraud model and stores the flagged ones in fraud_alerts (served by
+/api/analytics/fraud-alerts). The model is retrained first when it is
+older than FRAUD_RETRAIN_HOURS. Run from cron every few minutes.
+
+Usage:
+    python scripts/score_fraud_alerts.py
+    python scripts/score_fraud_alerts.py --retrain       # retrain before scoring
+    python scripts/score_fraud_alerts.py --train-only    # retrain, don't score
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.fraud_scoring import score_new_logs, train_fraud_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score new audit log entries for fraud alerts")
+    parser.add_argument("--retrain", action="store_true", help="Retrain the model before scoring")
+    parser.add_argument("--train-only", action="store_true", help="Retrain the model and exit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        if args.train_only:
+            result = train_fraud_model(db)
+            if result["status"] != "trained":
+                print(f"❌ {result['message']} (have {result['current_count']})")
+                sys.exit(1)
+            print(f"✅ Model trained on {result['samples_trained']} entries ({result['model_version']})")
+            return
+
+        result = score_new_logs(db, retrain=args.retrain)
+        if result["training"]:
+            print(f"📊 Retrained: {result['training']['status']}")
+        if result["status"] == "insufficient_data":
+            print(f"❌ No model: {result['training']['message']}")
+            sys.exit(1)
+        print(f"✅ Scored {result['scored']} entries, {result['alerts']} alert(s)")
+        print(f"   Watermark: {result['watermark']}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
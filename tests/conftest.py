@@ -0,0 +1,15 @@
+"""
+Test setup
+
+Settings are read at import time, so the required variables get harmless
+defaults here, and DATABASE_URL always points at in-memory SQLite: tests
+build their own engines and never touch the configured database.
+"""
+import os
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-at-least-32-characters")
+os.environ.setdefault("SMTP_USER", "test")
+os.environ.setdefault("SMTP_PASSWORD", "test")
+os.environ.setdefault("SMTP_FROM", "test@example.com")
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.blockchain.audit_chain import BlockchainAudit, hmac_seal_key
+from app.blockchain.sealing import HmacSealer, ProofOfWorkSealer
+from app.core.config import settings
+from app.db.models.blockchain_audit import BlockchainAudit as BlockModel
+from app.db.models.blockchain_checkpoint import BlockchainCheckpoint
+from app.db.models.blockchain_entry import BlockchainEntry
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine, tables=[BlockModel.__table__, BlockchainEntry.__table__, BlockchainCheckpoint.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture(params=["pow", "hmac"])
+def chain(request):
+    sealer = ProofOfWorkSealer(1) if request.param == "pow" else HmacSealer(hmac_seal_key())
+    return BlockchainAudit(sealer=sealer)
+
+
+def add_entries(chain, db, count):
+    return [
+        chain.add_entry(db, "update", 7, "task", i, {"field": "status", "value": i}).id
+        for i in range(count)
+    ]
+
+
+def add_blocks(chain, db, count):
+    return [chain.add_block(db, "update", 7, "task", i, {"value": i}).id for i in range(count)]
+
+
+def verify_events(chain, db, full=True, pool=None):
+    return list(chain.iter_verify_chain(db, full, pool=pool, in_flight=2, chunk_size=2))
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 7])
+def test_entry_proof_verifies_every_leaf(chain, db, count):
+    entry_ids = add_entries(chain, db, count)
+    block = chain.seal_pending_entries(db)
+    for leaf_index, entry_id in enumerate(entry_ids):
+        proof = chain.get_entry_proof(db, entry_id)
+        assert proof["status"] == "sealed"
+        assert proof["block_id"] == block.id
+        assert proof["leaf_index"] == leaf_index
+        assert proof["merkle_root"] == block.merkle_root
+        assert proof["verified"] is True
+
+
+def test_entry_proof_of_pending_and_missing_entries(chain, db):
+    entry_id, = add_entries(chain, db, 1)
+    proof = chain.get_entry_proof(db, entry_id)
+    assert proof["status"] == "pending"
+    assert "proof" not in proof
+    assert chain.get_entry_proof(db, entry_id + 1) is None
+
+
+def test_entry_proof_detects_edited_entry(chain, db):
+    entry_ids = add_entries(chain, db, 5)
+    chain.seal_pending_entries(db)
+    db.query(BlockchainEntry).filter(BlockchainEntry.id == entry_ids[2]).update({"details": {"field": "forged"}})
+    db.commit()
+    assert chain.get_entry_proof(db, entry_ids[2])["verified"] is False
+    assert chain.get_entry_proof(db, entry_ids[3])["verified"] is True
+
+
+def test_entry_proof_detects_rewritten_leaf(chain, db):
+    entry_ids = add_entries(chain, db, 3)
+    chain.seal_pending_entries(db)
+    # Content and leaf rewritten together still can't match the sealed root
+    entry = db.get(BlockchainEntry, entry_ids[0])
+    entry.details = {"field": "forged"}
+    entry.leaf_hash = "00" * 32
+    db.commit()
+    assert chain.get_entry_proof(db, entry_ids[0])["verified"] is False
+
+
+@pytest.mark.parametrize("pool", [None, "threads"])
+def test_intact_chain_verifies_and_checkpoints(chain, db, pool):
+    add_blocks(chain, db, 5)
+    executor = ThreadPoolExecutor(2) if pool else None
+    try:
+        events = verify_events(chain, db, pool=executor)
+    finally:
+        if executor:
+            executor.shutdown()
+    result = events[-1]
+    assert result["is_valid"] is True
+    assert result["verified_blocks"] == 5
+    assert not [e for e in events if e["event"] == "compromised"]
+    assert db.query(BlockchainCheckpoint).count() == 1
+
+
+@pytest.mark.parametrize("pool", [None, "threads"])
+def test_tampered_block_is_reported(chain, db, pool):
+    block_ids = add_blocks(chain, db, 5)
+    db.query(BlockModel).filter(BlockModel.id == block_ids[2]).update({"details": {"value": "forged"}})
+    db.commit()
+    executor = ThreadPoolExecutor(2) if pool else None
+    try:
+        events = verify_events(chain, db, pool=executor)
+    finally:
+        if executor:
+            executor.shutdown()
+    compromised = [e for e in events if e["event"] == "compromised"]
+    assert [(e["block_id"], e["reason"]) for e in compromised] == [(block_ids[2], "seal")]
+    assert events[-1]["is_valid"] is False
+    assert db.query(BlockchainCheckpoint).count() == 0
+
+
+def test_removed_block_breaks_the_link(chain, db):
+    block_ids = add_blocks(chain, db, 4)
+    db.query(BlockModel).filter(BlockModel.id == block_ids[1]).delete()
+    db.commit()
+    compromised = [e for e in verify_events(chain, db) if e["event"] == "compromised"]
+    assert [(e["block_id"], e["reason"]) for e in compromised] == [(block_ids[2], "link")]
+
+
+def test_incremental_pass_falls_back_to_full_when_the_anchor_changed(chain, db):
+    block_ids = add_blocks(chain, db, 3)
+    assert verify_events(chain, db, full=False)[-1]["is_valid"] is True
+    db.query(BlockModel).filter(BlockModel.id == block_ids[-1]).update({"details": {"value": "forged"}})
+    db.commit()
+    events = verify_events(chain, db, full=False)
+    assert events[0] == {"event": "start", "mode": "full", "after_block_id": 0}
+    assert events[-1]["is_valid"] is False
+
+
+def test_batch_full_signal_fires_every_max_entries(chain, db, monkeypatch):
+    monkeypatch.setattr(settings, "BLOCKCHAIN_BATCH_MAX_ENTRIES", 3)
+    calls = []
+    chain.on_batch_full = lambda: calls.append(1)
+    add_entries(chain, db, 7)
+    assert len(calls) == 2
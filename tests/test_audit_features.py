@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from app.ml.audit_features import FEATURE_COLUMNS, AuditFeatureEncoder, rolling_counts  # noqa: E402
+
+
+def brute_force_counts(groups, seconds, window):
+    """Rows of the same group in (t - window, t], counting same-second rows up to and including this one"""
+    return [
+        sum(
+            1 for j in range(len(groups))
+            if groups[j] == groups[i]
+            and seconds[i] - window < seconds[j] <= seconds[i]
+            and (seconds[j] < seconds[i] or j <= i)
+        )
+        for i in range(len(groups))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rolling_counts_match_brute_force(seed):
+    rng = random.Random(seed)
+    size = rng.randrange(1, 300)
+    # Few distinct seconds, so ties and exact window boundaries come up often
+    groups = np.array([rng.randrange(5) for _ in range(size)], dtype=np.int64)
+    seconds = np.array([rng.randrange(0, 200) * 10 for _ in range(size)], dtype=np.int64)
+    window = rng.choice([1, 10, 50, 600])
+    counts = rolling_counts(groups, seconds, window)
+    assert counts.tolist() == brute_force_counts(groups.tolist(), seconds.tolist(), window)
+
+
+def test_rolling_counts_window_edges():
+    groups = np.array([1, 1, 1, 2, 1])
+    seconds = np.array([0, 59, 60, 60, 120])
+    # 0 falls out of the window ending at 60; 60 falls out of the one ending at 120
+    assert rolling_counts(groups, seconds, 60).tolist() == [1, 2, 2, 1, 1]
+    assert rolling_counts(np.zeros(0), np.zeros(0, dtype=np.int64), 60).tolist() == []
+
+
+def audit_rows(seed, size):
+    rng = random.Random(seed)
+    start = datetime(2026, 3, 1)
+    seconds = sorted(rng.randrange(0, 6 * 3600) for _ in range(size))
+    return pd.DataFrame({
+        "user_id": [rng.choice([1, 2, 3, None]) for _ in range(size)],
+        "action": [rng.choice(["create", "update", "delete", "login"]) for _ in range(size)],
+        "resource_type": [rng.choice(["task", "user", None]) for _ in range(size)],
+        "timestamp": [start + timedelta(seconds=s) for s in seconds],
+    })
+
+
+@pytest.mark.parametrize("batch_rows", [1, 7, 50, 400])
+def test_batched_transform_matches_single_pass(batch_rows):
+    """Batches with the fraud scorer's carried context give the single-pass features"""
+    frame = audit_rows(batch_rows, 400)
+    encoder = AuditFeatureEncoder(rate_window=900).fit(frame)
+    expected = encoder.transform(frame)
+
+    rate_window = timedelta(seconds=encoder.rate_window)
+    context = frame.iloc[:0][FEATURE_COLUMNS]
+    batches = []
+    for start in range(0, len(frame), batch_rows):
+        batch = frame.iloc[start:start + batch_rows].reset_index(drop=True)
+        batches.append(encoder.transform(batch, context))
+        # Same carry as app/services/fraud_scoring.py
+        recent = batch[context.columns]
+        if len(context):
+            recent = pd.concat([context, recent], ignore_index=True)
+        context = recent[recent["timestamp"] > batch["timestamp"].iloc[-1] - rate_window]
+
+    np.testing.assert_array_equal(np.vstack(batches), expected)
+
+
+def test_context_only_feeds_the_rate():
+    frame = audit_rows(0, 200)
+    encoder = AuditFeatureEncoder(rate_window=3600).fit(frame)
+    head, tail = frame.iloc[:120], frame.iloc[120:].reset_index(drop=True)
+    with_context = encoder.transform(tail, head[FEATURE_COLUMNS])
+    without = encoder.transform(tail)
+    rate = 5
+    np.testing.assert_array_equal(np.delete(with_context, rate, axis=1), np.delete(without, rate, axis=1))
+    np.testing.assert_array_equal(with_context, encoder.transform(frame)[120:])
+    assert (with_context[:, rate] >= without[:, rate]).all()
+    assert (with_context[:, rate] > without[:, rate]).any()
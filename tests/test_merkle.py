@@ -0,0 +1,53 @@
+import pytest
+
+from app.blockchain.merkle import _hash_node, hash_leaf, merkle_proof, merkle_root, verify_proof
+
+
+def leaves(count):
+    return [hash_leaf({"entry": i}) for i in range(count)]
+
+
+@pytest.mark.parametrize("count", range(1, 12))
+def test_every_leaf_proves_against_the_root(count):
+    tree = leaves(count)
+    root = merkle_root(tree)
+    for index, leaf in enumerate(tree):
+        assert verify_proof(leaf, merkle_proof(tree, index), root)
+
+
+def test_odd_node_is_carried_up_not_duplicated():
+    a, b, c = leaves(3)
+    assert merkle_root([a, b, c]) == _hash_node(_hash_node(a, b), c)
+    assert merkle_root([a, b, c]) != merkle_root([a, b, c, c])
+
+
+@pytest.mark.parametrize("count", [3, 5, 7, 9])
+def test_carried_leaf_has_a_shorter_proof(count):
+    tree = leaves(count)
+    full_depth = len(merkle_proof(tree, 0))
+    assert len(merkle_proof(tree, count - 1)) < full_depth
+
+
+@pytest.mark.parametrize("count", [3, 5, 7])
+def test_proof_rejects_other_leaves_and_roots(count):
+    tree = leaves(count)
+    root = merkle_root(tree)
+    for index in range(count):
+        proof = merkle_proof(tree, index)
+        other = tree[(index + 1) % count]
+        assert not verify_proof(other, proof, root)
+        assert not verify_proof(tree[index], proof, merkle_root(leaves(count + 1)))
+
+
+def test_proof_rejects_flipped_position():
+    tree = leaves(5)
+    proof = merkle_proof(tree, 2)
+    flipped = [dict(step, position="left" if step["position"] == "right" else "right") for step in proof]
+    assert not verify_proof(tree[2], flipped, merkle_root(tree))
+
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        merkle_root([])
+    with pytest.raises(IndexError):
+        merkle_proof(leaves(3), 3)
@@ -0,0 +1,192 @@
+import random
+
+import pytest
+
+from app.services.traffic_analyzer import SlidingWindowTracker, TrafficAnalyzer
+
+SLICE = 10
+WINDOW = 60
+BASELINE = 300
+# Wide enough that the few test keys never share a column in every row
+WIDTH = 512
+DEPTH = 4
+
+
+class BruteForceCounter:
+    """Every hit kept with its slice index; counts recomputed from scratch"""
+
+    def __init__(self, window_seconds=WINDOW, baseline_seconds=BASELINE, slice_seconds=SLICE):
+        self.slice_seconds = slice_seconds
+        self.window_slices = window_seconds // slice_seconds
+        self.baseline_slices = baseline_seconds // slice_seconds
+        self.hits = []
+
+    def hit(self, key, now):
+        current = int(now // self.slice_seconds)
+        self.hits = [hit for hit in self.hits if hit[0] > current - self.baseline_slices]
+        self.hits.append((current, key))
+        return self.count(key, now, self.window_slices), self.expected(key, now)
+
+    def count(self, key, now, slices):
+        current = int(now // self.slice_seconds)
+        return sum(1 for index, hit_key in self.hits if hit_key == key and current - slices < index <= current)
+
+    def expected(self, key, now):
+        window = self.count(key, now, self.window_slices)
+        history = self.count(key, now, self.baseline_slices) - window
+        return history * self.window_slices / (self.baseline_slices - self.window_slices)
+
+
+def tracker(top_k=5):
+    return SlidingWindowTracker(WINDOW, BASELINE, SLICE, WIDTH, DEPTH, top_k)
+
+
+def analyzer(**overrides):
+    options = dict(
+        window_seconds=WINDOW, baseline_seconds=BASELINE, slice_seconds=SLICE, width=WIDTH, depth=DEPTH,
+        top_k=5, min_requests=20, burst_factor=3.0, max_anomalies=100, workers=1
+    )
+    options.update(overrides)
+    return TrafficAnalyzer(**options)
+
+
+def walk(seed, steps, keys):
+    """Monotonic (key, now) stream mixing same-slice hits, multi-slice jumps and long idle gaps"""
+    rng = random.Random(seed)
+    now = 1_700_000_000.0
+    for _ in range(steps):
+        gap = rng.random()
+        if gap < 0.6:
+            now += rng.uniform(0, 2)
+        elif gap < 0.9:
+            now += rng.uniform(SLICE, 4 * SLICE)
+        elif gap < 0.97:
+            now += rng.uniform(WINDOW, BASELINE)
+        else:
+            now += rng.uniform(BASELINE, 3 * BASELINE)
+        yield rng.choice(keys), now
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_counts_match_brute_force(seed):
+    sketch, exact = tracker(), BruteForceCounter()
+    for key, now in walk(seed, 1500, [f"user-{i}" for i in range(8)]):
+        count, expected = sketch.hit(key, now)
+        exact_count, exact_expected = exact.hit(key, now)
+        assert count == exact_count
+        assert expected == pytest.approx(exact_expected)
+
+
+def test_multi_slice_jump_expires_only_old_slices():
+    sketch, exact = tracker(), BruteForceCounter()
+    start = 1_000_000.0
+    for step in range(12):
+        sketch.hit("a", start + step * SLICE)
+        exact.hit("a", start + step * SLICE)
+    # Jump several slices at once, still inside the baseline
+    later = start + 11 * SLICE + 4 * SLICE
+    assert sketch.hit("a", later) == exact.hit("a", later)
+    assert sketch.hit("a", later)[0] == 1 + 1 + 2  # slices 10..15: the hits at 10 and 11, and two at 15
+
+
+def test_idle_longer_than_baseline_resets_everything():
+    sketch = tracker()
+    start = 1_000_000.0
+    for step in range(50):
+        sketch.hit("a", start + step)
+    count, expected = sketch.hit("a", start + 50 + BASELINE + SLICE)
+    assert (count, expected) == (1, 0)
+    assert sketch.heavy_hitters(start + 50 + BASELINE + SLICE) == [("a", 1)]
+
+
+def test_heavy_hitters_are_the_top_keys():
+    sketch, exact = tracker(top_k=3), BruteForceCounter()
+    rates = {"a": 10, "b": 8, "c": 6, "d": 4, "e": 2}
+    stream = [key for key, rate in rates.items() for _ in range(rate)]
+    random.Random(1).shuffle(stream)
+    now = 1_000_000.0
+    for key in stream:
+        sketch.hit(key, now)
+        exact.hit(key, now)
+    assert sketch.heavy_hitters(now) == [("a", 10), ("b", 8), ("c", 6)]
+
+
+def test_heavy_hitter_evicted_by_a_bigger_newcomer():
+    sketch = tracker(top_k=2)
+    now = 1_000_000.0
+    for key, hits in [("a", 5), ("b", 3)]:
+        for _ in range(hits):
+            sketch.hit(key, now)
+    for _ in range(3):
+        sketch.hit("c", now)
+    # Ties don't evict
+    assert sketch.heavy_hitters(now) == [("a", 5), ("b", 3)]
+    sketch.hit("c", now)
+    assert sketch.heavy_hitters(now) == [("a", 5), ("c", 4)]
+
+
+def test_heavy_hitters_follow_expiry():
+    sketch, exact = tracker(top_k=3), BruteForceCounter()
+    start = 1_000_000.0
+    for step in range(WINDOW // SLICE):
+        for key in ("a", "b") if step < 2 else ("c",):
+            sketch.hit(key, start + step * SLICE)
+            exact.hit(key, start + step * SLICE)
+    later = start + WINDOW + SLICE
+    hitters = dict(sketch.heavy_hitters(later))
+    assert hitters == {key: exact.count(key, later, exact.window_slices) for key in "c"}
+    assert sketch.heavy_hitters(later + BASELINE) == []
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_burst_flags_match_brute_force(seed):
+    rng = random.Random(seed)
+    detector, exact = analyzer(), BruteForceCounter()
+    flagged, peaks = set(), {}
+    now = 1_000_000.0
+    for _ in range(3000):
+        # Steady background, with occasional bursts from one key
+        if rng.random() < 0.02:
+            key = f"user-{rng.randrange(4)}"
+            burst = [(key, now + i * 0.1) for i in range(rng.randrange(10, 60))]
+        else:
+            burst = [(f"user-{rng.randrange(4)}", now)]
+        for key, at in burst:
+            detector.observe(key, None, at)
+            count, expected = exact.hit(key, at)
+            if count >= detector.min_requests and count >= detector.burst_factor * expected:
+                flagged.add(key)
+                peaks[key] = max(peaks.get(key, 0), count)
+        now = burst[-1][1] + rng.uniform(0.5, 3)
+
+    anomalies = detector.snapshot(now=now)["anomalies"]
+    assert flagged
+    assert {anomaly["key"] for anomaly in anomalies} == flagged
+    assert {anomaly["key"]: anomaly["peak_count"] for anomaly in anomalies} == peaks
+
+
+def test_user_and_ip_are_tracked_separately():
+    detector = analyzer(min_requests=5, burst_factor=1.0)
+    now = 1_000_000.0
+    for i in range(5):
+        detector.observe("7", "10.0.0.1", now + i)
+    detector.observe(None, "10.0.0.2", now + 5)
+    snapshot = detector.snapshot(now=now + 5)
+    assert {(a["dimension"], a["key"]) for a in snapshot["anomalies"]} == {("user", "7"), ("ip", "10.0.0.1")}
+    assert snapshot["top_users"] == [{"user_id": "7", "count": 5}]
+    assert snapshot["top_ips"] == [{"ip": "10.0.0.1", "count": 5}, {"ip": "10.0.0.2", "count": 1}]
+
+
+def test_anomaly_table_keeps_the_most_recent():
+    detector = analyzer(min_requests=1, burst_factor=1.0, max_anomalies=3)
+    now = 1_000_000.0
+    for i, key in enumerate("abcde"):
+        detector.observe(key, None, now + i)
+    detector.observe("c", None, now + 5)
+    keys = [anomaly["key"] for anomaly in detector.snapshot(now=now + 5)["anomalies"]]
+    assert keys == ["c", "e", "d"]
+
+
+def test_minimum_is_split_across_workers():
+    assert analyzer(min_requests=100, workers=4).min_requests == 25
+    assert analyzer(min_requests=100, workers=3).min_requests == 34